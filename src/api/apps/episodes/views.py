@@ -68,6 +68,7 @@ class EpisodeViewSet(viewsets.ModelViewSet):
         # Assuming there's a related Transcript model
         transcript = episode.transcript
         if transcript:
+            transcript.sync_content()
             return Response({"transcript": transcript.content})
         return Response({"error": "Transcript not found"}, status=status.HTTP_404_NOT_FOUND)
 
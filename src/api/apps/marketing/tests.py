@@ -1,7 +1,16 @@
+import json
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import TestCase
 from django.utils import timezone
 from src.api.apps.marketing.models import MarketingContent
 from src.api.apps.episodes.models import Episode
+from src.api.apps.transcripts.models import Transcript
+from src.api.services.content_generation import ContentGenerationService, get_repair_stats, normalize_hashtags
+from src.api.services.generation_cache import InMemoryGenerationCache, generation_cache_key
+from src.api.services.json_repair import loads_lenient
+from src.backend.services.transcript_condensation import TranscriptCondenser, chunk_text, estimate_tokens
 
 class MarketingContentModelTests(TestCase):
     def setUp(self):
@@ -102,6 +111,292 @@ class MarketingContentModelTests(TestCase):
         # Assert that the count of MarketingContent objects has decreased by 1
         self.assertEqual(MarketingContent.objects.count(), initial_count - 1)
 
+
+def make_section(headline="New episode", main_content="Listen now", hashtags=None):
+    return {
+        "headline": headline,
+        "main_content": main_content,
+        "hashtags": hashtags if hashtags is not None else ["#a", "#b", "#c"],
+        "cta": "Listen now",
+    }
+
+
+class MultiPlatformGenerationTests(TestCase):
+    def setUp(self):
+        """
+        Set up an episode with a transcript and a service with a stubbed API client
+        """
+        self.episode = Episode.objects.create(
+            title="Test Episode",
+            description="This is a test episode",
+            audio_file_url="https://example.com/test-audio.mp3",
+            status="published",
+            publish_date=timezone.now()
+        )
+        Transcript.objects.create(episode=self.episode, content="Hello and welcome.", language="en-US", confidence_score=0.9)
+        self.cache = InMemoryGenerationCache(timeout=60, max_entries=100)
+        with mock.patch('src.api.services.content_generation.settings'):
+            self.service = ContentGenerationService(generation_cache=self.cache)
+
+    def test_single_call_covers_all_platforms(self):
+        """
+        Test that one API call generates and stores content for every platform
+        """
+        response = json.dumps({"twitter": make_section(main_content="x" * 500), "linkedin": make_section()})
+        with mock.patch.object(self.service, 'call_openai_api', return_value=response) as call:
+            contents = self.service.generate_marketing_contents(self.episode, ["twitter", "linkedin"])
+
+        self.assertEqual(call.call_count, 1)
+        self.assertEqual(set(contents), {"twitter", "linkedin"})
+        self.assertEqual(MarketingContent.objects.filter(episode=self.episode, status="generated").count(), 2)
+        self.assertEqual(len(json.loads(contents["twitter"].content)["main_content"]), 280)
+
+    def test_invalid_section_is_regenerated_alone(self):
+        """
+        Test that only the platform whose section fails validation is requested again
+        """
+        response = json.dumps({"twitter": make_section(), "linkedin": "Not a section"})
+        retry = json.dumps(make_section(headline="Retried"))
+        with mock.patch.object(self.service, 'call_openai_api', side_effect=[response, retry]) as call:
+            contents = self.service.generate_marketing_contents(self.episode, ["twitter", "linkedin"])
+
+        self.assertEqual(call.call_count, 2)
+        self.assertEqual(json.loads(contents["linkedin"].content)["headline"], "Retried")
+        self.assertEqual(json.loads(contents["twitter"].content)["headline"], "New episode")
+
+    def test_cached_platforms_are_not_requested_again(self):
+        """
+        Test that repeating a generation is served from the cache until the episode changes
+        """
+        response = json.dumps({"twitter": make_section(), "linkedin": make_section()})
+        with mock.patch.object(self.service, 'call_openai_api', return_value=response) as call:
+            self.service.generate_marketing_contents(self.episode, ["twitter", "linkedin"])
+            self.service.generate_marketing_contents(self.episode, ["twitter", "linkedin"])
+            self.assertEqual(call.call_count, 1)
+
+            self.episode.title = "Renamed Episode"
+            self.service.generate_marketing_contents(self.episode, ["twitter", "linkedin"])
+            self.assertEqual(call.call_count, 2)
+
+        self.assertEqual(self.cache.stats()["hits"], 2)
+        self.assertEqual(MarketingContent.objects.filter(episode=self.episode).count(), 6)
+
+    def test_streamed_content_is_validated_and_saved(self):
+        """
+        Test that streamed text is relayed as it arrives and the validated result is saved last
+        """
+        text = json.dumps(make_section(main_content="x" * 500))
+        chunks = [text[start:start + 10] for start in range(0, len(text), 10)]
+        with mock.patch.object(self.service, 'llm_client') as llm_client:
+            llm_client.stream_chat_completion.return_value = iter(chunks)
+            events = list(self.service.stream_marketing_content(self.episode, "twitter"))
+
+        self.assertEqual([payload for event, payload in events[:-1]], chunks)
+        event, content = events[-1]
+        self.assertEqual(event, "content")
+        self.assertEqual(content.platform, "twitter")
+        self.assertEqual(len(json.loads(content.content)["main_content"]), 280)
+        self.assertEqual(MarketingContent.objects.filter(episode=self.episode, status="generated").count(), 1)
+
+
+
+class GeneratedContentRepairTests(TestCase):
+    def setUp(self):
+        """
+        Set up a service with a stubbed API client and a local cache for the repair counters
+        """
+        with mock.patch('src.api.services.content_generation.settings'):
+            self.service = ContentGenerationService(generation_cache=InMemoryGenerationCache(timeout=60, max_entries=10))
+        self.cache = LocMemCache("generation-repair-tests", {})
+        self.cache.clear()
+        patcher = mock.patch("src.api.services.content_generation.cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_truncated_json_is_closed(self):
+        """
+        Test that fences, trailing commas and a cut-off response are repaired
+        """
+        self.assertEqual(loads_lenient('```json\n{"a": [1, 2,],}\n```'), ({"a": [1, 2]}, True))
+        self.assertEqual(loads_lenient('{"a": "text", "b": "cut o'), ({"a": "text", "b": "cut o"}, True))
+        self.assertEqual(loads_lenient('{"a": "text", "b":'), ({"a": "text"}, True))
+        with self.assertRaises(ValueError):
+            loads_lenient("No JSON at all")
+
+    def test_valid_json_around_prose_is_kept_whole(self):
+        """
+        Test that valid JSON is decoded as it is, whatever prose surrounds it
+        """
+        self.assertEqual(loads_lenient('{"a": "x, y"} Let me know if you need changes.'), ({"a": "x, y"}, True))
+        self.assertEqual(loads_lenient('Sure! Here is the post: {"a": [1, 2]}. Enjoy [sic]'), ({"a": [1, 2]}, True))
+        self.assertEqual(loads_lenient('Options [below]: {"a": {"b": "}"}} Thanks'), ({"a": {"b": "}"}}, True))
+
+    def test_hashtags_are_coerced_padded_and_trimmed(self):
+        """
+        Test that hashtags always come out as three distinct tags
+        """
+        self.assertEqual(normalize_hashtags("#Podcast, growth"), ["#Podcast", "#growth", "#newepisode"])
+        self.assertEqual(normalize_hashtags(["#a", "b c", "#d", "#e"]), ["#a", "#bc", "#d"])
+
+    def test_repairable_response_is_not_regenerated(self):
+        """
+        Test that a fenced response with a hashtag string is used without another call
+        """
+        section = make_section()
+        section["hashtags"] = "#a #b"
+        content = f"Here it is:\n```json\n{json.dumps(section)}\n```"
+        with mock.patch.object(self.service, 'call_openai_api') as call:
+            parsed = self.service.parse_generated_content(content, "twitter", "prompt")
+
+        call.assert_not_called()
+        self.assertEqual(parsed["hashtags"], ["#a", "#b", "#podcast"])
+        self.assertEqual(get_repair_stats()["avoided_regenerations"], 1)
+
+    def test_only_missing_fields_are_requested(self):
+        """
+        Test that a response missing its call-to-action only asks for that field
+        """
+        section = make_section()
+        del section["cta"]
+        with mock.patch.object(self.service, 'call_openai_api', return_value='{"cta": "Subscribe"}') as call:
+            parsed = self.service.parse_generated_content(json.dumps(section), "twitter", "prompt")
+
+        self.assertEqual(call.call_count, 1)
+        self.assertIn("Generate only the missing fields: cta", call.call_args[0][0])
+        self.assertEqual(parsed["cta"], "Subscribe")
+        self.assertEqual(get_repair_stats(), {
+            "repaired_responses": 0, "fields_requested": 1, "avoided_regenerations": 1,
+        })
+
+
+class GenerationCacheTests(TestCase):
+    def test_key_depends_on_every_input(self):
+        """
+        Test that changing any part of a request changes its cache key
+        """
+        base = ("Title", "Description", "Transcript text", "twitter", "gpt-3.5-turbo", 1)
+        keys = {generation_cache_key(*base)}
+        for index, value in enumerate(["Other", "Other", "Other text", "linkedin", "gpt-4", 2]):
+            keys.add(generation_cache_key(*(base[:index] + (value,) + base[index + 1:])))
+        self.assertEqual(len(keys), 7)
+        self.assertEqual(generation_cache_key(*base), generation_cache_key(*base[:3], "Twitter", *base[4:]))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Test that the cache keeps at most max_entries, dropping the least recently used
+        """
+        cache = InMemoryGenerationCache(timeout=60, max_entries=2)
+        cache.set("a", make_section())
+        cache.set("b", make_section())
+        cache.get("a")
+        cache.set("c", make_section())
+
+        self.assertEqual(set(cache.get_many(["a", "b", "c"])), {"a", "c"})
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_expired_entries_are_misses(self):
+        """
+        Test that entries are not served after their timeout
+        """
+        cache = InMemoryGenerationCache(timeout=60, max_entries=10)
+        cache.set("a", make_section())
+        with mock.patch('src.api.services.generation_cache.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(cache.get("a"))
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (0, 1, 0))
+
+    def test_hits_renew_the_timeout(self):
+        """
+        Test that an entry expires timeout seconds after its last use, and is then no longer counted
+        """
+        cache = InMemoryGenerationCache(timeout=60, max_entries=10)
+        with mock.patch('src.api.services.generation_cache.time.monotonic') as monotonic:
+            monotonic.return_value = 0
+            cache.set("a", make_section())
+            cache.set("b", make_section())
+            monotonic.return_value = 50
+            self.assertIsNotNone(cache.get("a"))
+            monotonic.return_value = 100
+            self.assertEqual(cache.stats()["entries"], 1)
+            self.assertIsNotNone(cache.get("a"))
+            monotonic.return_value = 200
+            self.assertEqual(cache.stats()["entries"], 0)
+
+
+class FakeLLMClient:
+    """
+    Records chat_completions calls and answers each request with a long summary
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def chat_completions(self, model, conversations, **params):
+        self.calls.append((len(conversations), params["max_tokens"]))
+        return [{"choices": [{"message": {"content": "A summary sentence. " * 400}}]} for _ in conversations]
+
+
+class TranscriptCondenserTests(TestCase):
+    def setUp(self):
+        """
+        Set up a condenser with a fake client and a local cache
+        """
+        self.client = FakeLLMClient()
+        self.condenser = TranscriptCondenser(
+            llm_client=self.client, model="gpt-3.5-turbo", brief_tokens=400, chunk_tokens=2500, strategy="llm"
+        )
+        self.cache = LocMemCache("transcript-condensation-tests", {})
+        patcher = mock.patch("src.backend.services.transcript_condensation.cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unpunctuated_transcript_is_chunked_under_budget(self):
+        """
+        Test that transcripts without sentence breaks are split at word boundaries
+        """
+        chunks = chunk_text(" ".join(["word"] * 20000), 2500)
+        self.assertEqual(len(chunks), 10)
+        self.assertTrue(all(estimate_tokens(chunk) <= 2500 for chunk in chunks))
+
+    def test_long_transcript_is_condensed_once_per_version(self):
+        """
+        Test that the full transcript is mapped in parallel, reduced within budget and cached
+        """
+        content = "This episode covers many topics. " * 3000
+
+        brief = self.condenser.get_brief(content)
+        self.assertLessEqual(estimate_tokens(brief), 400)
+        self.assertEqual(self.client.calls[0][0], len(chunk_text(content, 2500)))
+        self.assertEqual(self.client.calls[-1], (1, 400))
+
+        calls = len(self.client.calls)
+        self.assertEqual(self.condenser.get_brief(content), brief)
+        self.assertEqual(len(self.client.calls), calls)
+
+        self.condenser.get_brief(content + " One more sentence.")
+        self.assertGreater(len(self.client.calls), calls)
+
+    def test_extractive_brief_makes_no_api_calls(self):
+        """
+        Test that the extractive strategy selects salient sentences locally, within budget
+        """
+        condenser = TranscriptCondenser(brief_tokens=100, strategy="extractive")
+        filler = " ".join(f"We talked about topic number {index} for a while." for index in range(300))
+        content = f"{filler} Podcast marketing grows the audience. Growing a podcast audience takes marketing. {filler}"
+
+        brief = condenser.get_brief(content)
+        self.assertLessEqual(estimate_tokens(brief), 100)
+        self.assertIn("Podcast marketing grows the audience.", brief)
+        self.assertEqual(self.client.calls, [])
+
+    def test_short_transcript_is_used_as_is(self):
+        """
+        Test that transcripts within the budget are not condensed
+        """
+        self.assertEqual(self.condenser.get_brief("Hello and welcome."), "Hello and welcome.")
+        self.assertEqual(self.client.calls, [])
+
 # Human tasks:
 # 1. Implement additional test cases for edge cases and error handling
 # 2. Add integration tests for marketing content generation functionality
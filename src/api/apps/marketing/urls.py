@@ -1,5 +1,8 @@
 from django.urls import path
-from .views import MarketingContentListCreateView, MarketingContentRetrieveUpdateDestroyView, generate_marketing_content
+from .views import (
+    MarketingContentListCreateView, MarketingContentRetrieveUpdateDestroyView, generate_marketing_content,
+    generation_cache_stats, generation_repair_stats, stream_marketing_content,
+)
 
 app_name = 'marketing'
 
@@ -7,6 +10,9 @@ urlpatterns = [
     path('content/', MarketingContentListCreateView.as_view(), name='marketing-content-list-create'),
     path('content/<int:pk>/', MarketingContentRetrieveUpdateDestroyView.as_view(), name='marketing-content-detail'),
     path('generate/', generate_marketing_content, name='generate-marketing-content'),
+    path('generate/stream/', stream_marketing_content, name='stream-marketing-content'),
+    path('generate/cache-stats/', generation_cache_stats, name='generation-cache-stats'),
+    path('generate/repair-stats/', generation_repair_stats, name='generation-repair-stats'),
 ]
 
 # Human Tasks:
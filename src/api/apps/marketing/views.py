@@ -1,9 +1,18 @@
+import json
+import logging
+
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
+from src.api.apps.episodes.models import Episode
 from .models import MarketingContent
 from .serializers import MarketingContentSerializer
 from src.api.services import content_generation
+from src.api.services.generation_cache import get_generation_cache
+
+logger = logging.getLogger(__name__)
 
 class MarketingContentListCreateView(generics.ListCreateAPIView):
     """
@@ -69,6 +78,78 @@ def generate_marketing_content(request, episode_id):
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets clients ask for text/event-stream; the streamed body is written by the view itself
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data)
+
+
+def server_sent_event(event, data):
+    """
+    Formats one server-sent event with a JSON payload
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def stream_marketing_content(request):
+    """
+    Function to generate marketing content for an episode and platform, streamed as server-sent events
+
+    The response starts immediately. Generated text is sent in 'token' events as the model
+    produces it, then the validated and saved content is sent in a 'content' event, or the
+    failure in an 'error' event.
+    """
+    episode_id = request.data.get('episode_id')
+    platform = request.data.get('platform')
+    if not episode_id or not platform:
+        return Response({"error": "episode_id and platform are required"}, status=400)
+    try:
+        episode = Episode.objects.get(id=episode_id)
+    except Episode.DoesNotExist:
+        return Response({"error": "Episode not found"}, status=404)
+
+    def events():
+        # A comment flushes the headers through proxies before the first token arrives
+        yield ": generating\n\n"
+        try:
+            for event, payload in content_generation.ContentGenerationService().stream_marketing_content(episode, platform):
+                if event == 'token':
+                    yield server_sent_event('token', {"text": payload})
+                else:
+                    yield server_sent_event('content', MarketingContentSerializer(payload).data)
+        except Exception as e:
+            logger.error(f"Error streaming marketing content for episode {episode.id}: {str(e)}")
+            yield server_sent_event('error', {"error": str(e)})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def generation_cache_stats(request):
+    """
+    Function to report the hit rate and size of the generation result cache
+    """
+    return Response(get_generation_cache().stats())
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def generation_repair_stats(request):
+    """
+    Function to report how many generated responses were repaired instead of regenerated
+    """
+    return Response(content_generation.get_repair_stats())
+
 # Human tasks:
 # TODO: Implement proper error handling for content generation failures
 # TODO: Add pagination to the MarketingContentListCreateView if needed
@@ -0,0 +1,211 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Cue grouping limits, following common subtitle guidelines
+MAX_CUE_DURATION = 6.0
+MAX_CUE_CHARS = 84  # Two lines of 42 characters
+MAX_WORD_GAP = 1.5
+SENTENCE_ENDINGS = ('.', '?', '!')
+
+EXPORT_CONTENT_TYPES = {
+    'txt': 'text/plain; charset=utf-8',
+    'srt': 'application/x-subrip; charset=utf-8',
+    'vtt': 'text/vtt; charset=utf-8',
+}
+
+
+def iter_cues(transcript, max_duration=MAX_CUE_DURATION, max_chars=MAX_CUE_CHARS, max_gap=MAX_WORD_GAP):
+    """
+    Groups the words of a transcript into readable subtitle cues.
+
+    A cue is closed when adding the next word would exceed the duration or character
+    limit, when there is a long pause, or after a word that ends a sentence.
+
+    Args:
+        transcript (Transcript | TranscriptSegment): The transcript or segment to group.
+        max_duration (float): Maximum length of a cue in seconds.
+        max_chars (int): Maximum number of characters in a cue.
+        max_gap (float): Pause in seconds that always starts a new cue.
+
+    Yields:
+        tuple: (start_time, end_time, text) of each cue.
+    """
+    packed = transcript.word_timestamps
+    if packed is None:
+        return
+
+    content = transcript.content
+    starts = packed.starts.tolist()
+    ends = packed.ends.tolist()
+    cue_words = []
+    cue_start = cue_end = 0.0
+    cue_chars = 0
+
+    for index, (start, end) in enumerate(zip(starts, ends)):
+        word = packed.word(index, content)
+        if not word:
+            continue
+        if cue_words and (
+            end - cue_start > max_duration
+            or cue_chars + 1 + len(word) > max_chars
+            or start - cue_end > max_gap
+        ):
+            yield cue_start, cue_end, ' '.join(cue_words)
+            cue_words = []
+
+        if not cue_words:
+            cue_start = start
+            cue_chars = len(word)
+        else:
+            cue_chars += 1 + len(word)
+        cue_words.append(word)
+        cue_end = end
+
+        if word.endswith(SENTENCE_ENDINGS):
+            yield cue_start, cue_end, ' '.join(cue_words)
+            cue_words = []
+
+    if cue_words:
+        yield cue_start, cue_end, ' '.join(cue_words)
+
+
+def format_timestamp(seconds, separator=','):
+    """
+    Formats time in seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT).
+    """
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def format_srt(cues):
+    """
+    Formats cues as SubRip subtitles, one cue at a time.
+    """
+    for number, (start, end, text) in enumerate(cues, start=1):
+        yield f"{number}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n\n"
+
+
+def format_vtt(cues):
+    """
+    Formats cues as WebVTT subtitles, one cue at a time.
+    """
+    yield "WEBVTT\n\n"
+    for start, end, text in cues:
+        yield f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{text}\n\n"
+
+
+def render_srt(transcript):
+    """
+    Renders a transcript as SubRip subtitles, one cue at a time.
+    """
+    return format_srt(iter_cues(transcript))
+
+
+def render_vtt(transcript):
+    """
+    Renders a transcript as WebVTT subtitles, one cue at a time.
+    """
+    return format_vtt(iter_cues(transcript))
+
+
+def render_txt(transcript):
+    """
+    Renders a transcript as plain text.
+    """
+    yield transcript.content
+    yield "\n"
+
+
+RENDERERS = {
+    'txt': render_txt,
+    'srt': render_srt,
+    'vtt': render_vtt,
+}
+
+CUE_FORMATTERS = {
+    'srt': format_srt,
+    'vtt': format_vtt,
+}
+
+
+def export_cache_key(transcript, export_format):
+    """
+    Returns the render cache key for a transcript version and format.
+    """
+    return f"transcript-export:{transcript.pk}:{transcript.version}:{export_format}"
+
+
+def segment_cues_cache_key(segment):
+    """
+    Returns the cue cache key for a segment version.
+    """
+    return f"transcript-segment-cues:{segment.pk}:{segment.version}"
+
+
+def iter_segment_cues(segments):
+    """
+    Yields the cues of consecutive segments, grouping only segments missing from the cue cache.
+
+    Keys include the segment version, so an edit re-renders just the segments it touched.
+
+    Args:
+        segments (list): TranscriptSegments in order.
+
+    Yields:
+        tuple: (start_time, end_time, text) of each cue.
+    """
+    keys = [segment_cues_cache_key(segment) for segment in segments]
+    cached = cache.get_many(keys)
+    rendered = {}
+    for key, segment in zip(keys, segments):
+        cues = cached.get(key)
+        if cues is None:
+            cues = rendered[key] = list(iter_cues(segment))
+        yield from cues
+    if rendered:
+        cache.set_many(rendered, settings.TRANSCRIPT_EXPORT_CACHE_TIMEOUT)
+
+
+def render_segments(segments, export_format):
+    """
+    Renders consecutive segments, reusing the cues cached per segment version.
+    """
+    if export_format == 'txt':
+        yield ' '.join(segment.content for segment in segments)
+        yield "\n"
+    else:
+        yield from CUE_FORMATTERS[export_format](iter_segment_cues(segments))
+
+
+def stream_export(transcript, export_format):
+    """
+    Streams a rendered transcript, serving it from the render cache when possible.
+
+    Renders are cached whole once streamed completely, keyed by transcript version so
+    that edits never serve stale output. On a miss, segmented transcripts are rendered
+    from cues cached per segment version, so an edit re-renders just the segments it
+    touched.
+
+    Args:
+        transcript (Transcript): The transcript to export.
+        export_format (str): One of 'txt', 'srt' or 'vtt'.
+
+    Yields:
+        str: Consecutive parts of the rendered file.
+    """
+    key = export_cache_key(transcript, export_format)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    segments = list(transcript.segments.all())
+    renderer = render_segments(segments, export_format) if segments else RENDERERS[export_format](transcript)
+    parts = []
+    for part in renderer:
+        parts.append(part)
+        yield part
+    cache.set(key, ''.join(parts), settings.TRANSCRIPT_EXPORT_CACHE_TIMEOUT)
@@ -1,7 +1,77 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 
-class Transcript(models.Model):
+from .exporters import render_srt
+from .segments import SegmentVersionConflict, align_words, segments_changed, split_into_segments
+from .text_edits import distribute_content
+from .timestamps import PackedTimestamps, pack_timestamps
+
+
+class PackedTimestampsMixin:
+    """
+    Word-level timestamp accessors for models with 'content' and 'packed_timestamps' fields.
+    """
+
+    @property
+    def word_timestamps(self):
+        """
+        Returns a zero-copy view over the packed word-level timestamps, or None if there are none.
+        """
+        if not self.packed_timestamps:
+            return None
+        cached = getattr(self, '_word_timestamps', None)
+        if cached is None or cached[0] is not self.packed_timestamps:
+            cached = (self.packed_timestamps, PackedTimestamps(self.packed_timestamps))
+            self._word_timestamps = cached
+        return cached[1]
+
+    @property
+    def timestamps(self):
+        """
+        Returns the word-level timestamps as a list of dicts with 'word', 'start_time' and 'end_time'.
+        """
+        packed = self.word_timestamps
+        return packed.to_list(self.content) if packed is not None else []
+
+    @timestamps.setter
+    def timestamps(self, words):
+        """
+        Packs word-level timestamps against the current content.
+        """
+        self.packed_timestamps = pack_timestamps(words or [], self.content or '')
+
+    def get_duration(self):
+        """
+        Returns the duration of the transcript based on timestamps.
+        """
+        packed = self.word_timestamps
+        return packed.duration if packed is not None else 0.0
+
+    def get_word_at(self, seconds):
+        """
+        Returns the word spoken at the given time, or None if no word covers it.
+        """
+        packed = self.word_timestamps
+        if packed is None:
+            return None
+        index = packed.word_index_at(seconds)
+        if index is None:
+            return None
+        return {
+            'word': packed.word(index, self.content),
+            'start_time': round(float(packed.starts[index]), 3),
+            'end_time': round(float(packed.ends[index]), 3),
+        }
+
+    def generate_srt(self):
+        """
+        Generates an SRT format subtitle file from the transcript, grouping words into readable cues.
+        """
+        return ''.join(render_srt(self))
+
+
+class Transcript(PackedTimestampsMixin, models.Model):
     """
     Model representing a transcript for a podcast episode in the Podcast Marketing Automation platform.
     """
@@ -15,8 +85,16 @@ class Transcript(models.Model):
     content = models.TextField(help_text="The full text content of the transcript.")
     language = models.CharField(max_length=10, help_text="The language code of the transcript (e.g., 'en-US').")
     confidence_score = models.FloatField(help_text="The confidence score of the transcription accuracy.")
-    timestamps = models.JSONField(help_text="JSON field containing word-level timestamps.")
+    packed_timestamps = models.BinaryField(
+        null=True, blank=True, editable=False,
+        help_text="Word-level timestamps packed as float32 start/end arrays plus offsets into content."
+    )
+    content_stale = models.BooleanField(
+        default=False,
+        help_text="Set when segments were edited after content was last rebuilt from them."
+    )
     status = models.CharField(max_length=20, choices=TRANSCRIPT_STATUS_CHOICES, default='pending')
+    version = models.PositiveIntegerField(default=1, help_text="Incremented on every save; keys caches of derived artifacts.")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -28,11 +106,13 @@ class Transcript(models.Model):
 
     def save(self, *args, **kwargs):
         """
-        Custom save method to update timestamps.
+        Custom save method to update timestamps and the version.
         """
         self.updated_at = timezone.now()
         if not self.id:
             self.created_at = timezone.now()
+        else:
+            self.version += 1
         super().save(*args, **kwargs)
 
     def get_word_count(self):
@@ -41,38 +121,168 @@ class Transcript(models.Model):
         """
         return len(self.content.split())
 
-    def get_duration(self):
+    def build_segments(self):
         """
-        Returns the duration of the transcript based on timestamps.
+        Splits the content into editable segments, replacing any existing ones.
         """
-        if not self.timestamps:
-            return 0.0
-        last_timestamp = max(word['end_time'] for word in self.timestamps)
-        return float(last_timestamp)
+        segments = [
+            TranscriptSegment(transcript=self, position=position, **fields)
+            for position, fields in enumerate(split_into_segments(self.content or '', self.word_timestamps))
+        ]
+        with transaction.atomic():
+            self.segments.all().delete()
+            TranscriptSegment.objects.bulk_create(segments)
+        return segments
 
-    def generate_srt(self):
+    def update_segments(self, edits):
+        """
+        Applies edits to individual segments without rewriting the rest of the transcript.
+
+        Only the edited segment rows are written; the full content is marked stale and
+        rebuilt on demand by sync_content. Segments whose text is unchanged keep their version.
+
+        Args:
+            edits (list): Dicts with 'position', 'content' and optionally the 'version'
+                the edit was based on, which is checked for concurrent edits.
+
+        Returns:
+            list: The segments that changed.
+
+        Raises:
+            TranscriptSegment.DoesNotExist: If a position does not exist.
+            SegmentVersionConflict: If a segment changed since the version the edit was based on.
+        """
+        edits = {edit['position']: edit for edit in edits}
+        if not self.segments.exists():
+            self.build_segments()
+
+        with transaction.atomic():
+            segments = list(self.segments.select_for_update().filter(position__in=edits))
+            missing = set(edits) - {segment.position for segment in segments}
+            if missing:
+                raise TranscriptSegment.DoesNotExist(f"No segments at positions {sorted(missing)}")
+
+            changed = []
+            now = timezone.now()
+            for segment in segments:
+                edit = edits[segment.position]
+                if edit.get('version') is not None and edit['version'] != segment.version:
+                    raise SegmentVersionConflict(segment.position, edit['version'], segment.version)
+                if edit['content'] == segment.content:
+                    continue
+                words = align_words(segment.timestamps, edit['content'])
+                segment.content = edit['content']
+                segment.timestamps = words
+                segment.version += 1
+                segment.updated_at = now
+                changed.append(segment)
+
+            if changed:
+                TranscriptSegment.objects.bulk_update(changed, ['content', 'packed_timestamps', 'version', 'updated_at'])
+                Transcript.objects.filter(pk=self.pk).update(content_stale=True, version=F('version') + 1, updated_at=now)
+                transaction.on_commit(lambda: segments_changed.send(
+                    sender=Transcript,
+                    transcript=self,
+                    segments=changed,
+                    start_time=min(segment.start_time for segment in changed),
+                    end_time=max(segment.end_time for segment in changed),
+                ))
+
+        self.refresh_from_db(fields=['content_stale', 'version', 'updated_at'])
+        return changed
+
+    def replace_content(self, new_content):
+        """
+        Applies a whole-text edit by updating only the segments whose text changed.
+
+        Args:
+            new_content (str): The edited full text.
+
+        Returns:
+            list: The segments that changed.
+        """
+        segments = list(self.segments.all()) or self.build_segments()
+        if not segments:
+            self.content = new_content
+            self.save()
+            return self.build_segments()
+
+        texts = distribute_content([segment.content for segment in segments], new_content)
+        return self.update_segments([
+            {'position': segment.position, 'content': text}
+            for segment, text in zip(segments, texts)
+            if text != ' '.join(segment.content.split())
+        ])
+
+    def sync_content(self):
+        """
+        Rebuilds content and packed_timestamps from the segments if edits have made them stale.
+
+        Many segment edits are folded into a single rewrite of the full text, done only
+        when a reader needs it. The version is not incremented, as the text is unchanged.
+        """
+        self.refresh_from_db(fields=['content_stale', 'version'])
+        if not self.content_stale:
+            return
+        segments = list(self.segments.all())
+        self.content = ' '.join(segment.content for segment in segments)
+        self.timestamps = [word for segment in segments for word in segment.timestamps]
+        self.content_stale = False
+        Transcript.objects.filter(pk=self.pk, version=self.version).update(
+            content=self.content, packed_timestamps=self.packed_timestamps, content_stale=False
+        )
+
+
+class TranscriptSegment(PackedTimestampsMixin, models.Model):
+    """
+    Model representing an independently editable span of a transcript.
+    """
+    transcript = models.ForeignKey(Transcript, on_delete=models.CASCADE, related_name='segments')
+    position = models.PositiveIntegerField(help_text="Index of the segment within the transcript.")
+    start_time = models.FloatField()
+    end_time = models.FloatField()
+    content = models.TextField(blank=True)
+    packed_timestamps = models.BinaryField(
+        null=True, blank=True, editable=False,
+        help_text="Word-level timestamps of the segment, packed against its content."
+    )
+    version = models.PositiveIntegerField(default=1, help_text="Incremented on every edit of the segment.")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['transcript', 'position'], name='unique_transcript_segment_position'),
+        ]
+
+    def __str__(self):
         """
-        Generates an SRT format subtitle file from the transcript.
+        Returns a string representation of the TranscriptSegment.
         """
-        srt_content = []
-        for i, word in enumerate(self.timestamps, start=1):
-            start_time = self._format_time(word['start_time'])
-            end_time = self._format_time(word['end_time'])
-            srt_content.append(f"{i}\n{start_time} --> {end_time}\n{word['word']}\n\n")
-        return ''.join(srt_content)
+        return f"Segment {self.position} of transcript {self.transcript_id} (v{self.version})"
+
+
+class TranscriptionCacheEntry(models.Model):
+    """
+    Model caching a recognizer result by the digest of the audio bytes and recognition config.
+    """
+    cache_key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the audio bytes and recognition config.")
+    content = models.TextField()
+    language = models.CharField(max_length=10)
+    confidence_score = models.FloatField()
+    packed_timestamps = models.BinaryField(null=True, blank=True)
+    size_bytes = models.PositiveIntegerField(help_text="Approximate storage cost of the entry, used for eviction.")
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now, db_index=True)
 
-    @staticmethod
-    def _format_time(seconds):
+    def __str__(self):
         """
-        Formats time in seconds to SRT time format (HH:MM:SS,mmm).
+        Returns a string representation of the TranscriptionCacheEntry.
         """
-        hours, remainder = divmod(float(seconds), 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = int((seconds % 1) * 1000)
-        return f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d},{milliseconds:03d}"
+        return f"Transcription cache entry {self.cache_key[:12]}"
 
 # Human tasks:
 # 1. Define the specific status options for the 'status' field (e.g., 'pending', 'completed', 'failed')
-# 2. Determine the structure and required fields for the 'timestamps' JSONField
-# 3. Implement logic for handling different languages in the transcript
-# 4. Decide on the threshold for an acceptable confidence score
\ No newline at end of file
+# 2. Implement logic for handling different languages in the transcript
+# 3. Decide on the threshold for an acceptable confidence score
\ No newline at end of file
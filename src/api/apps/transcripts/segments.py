@@ -0,0 +1,124 @@
+import bisect
+import difflib
+import re
+
+from django.dispatch import Signal
+
+from .timestamps import pack_timestamps
+
+# Segments close at the first sentence ending after the minimum length and never exceed the maximum
+SEGMENT_MIN_SECONDS = 10.0
+SEGMENT_MAX_SECONDS = 30.0
+SEGMENT_MIN_CHARS = 300  # Limits for transcripts without word timestamps
+SEGMENT_MAX_CHARS = 1000
+SENTENCE_ENDINGS = ('.', '?', '!')
+TOKEN_PATTERN = re.compile(r'\S+')
+
+# Sent once segment edits are committed, with the transcript, the edited segments and the
+# start_time/end_time range they cover, so derived artifacts can invalidate only that range.
+segments_changed = Signal()
+
+
+class SegmentVersionConflict(Exception):
+    """
+    Raised when a segment edit was based on an outdated version of the segment.
+    """
+
+    def __init__(self, position, expected_version, current_version):
+        self.position = position
+        self.expected_version = expected_version
+        self.current_version = current_version
+        super().__init__(
+            f"Segment {position} is at version {current_version}, but the edit was based on version {expected_version}"
+        )
+
+
+def split_into_segments(content, packed=None):
+    """
+    Splits transcript content into segments of a few sentences each.
+
+    Args:
+        content (str): The transcript text.
+        packed (PackedTimestamps): Word timestamps packed against the content, if any.
+
+    Returns:
+        list: Dicts with 'start_time', 'end_time', 'content' and 'packed_timestamps'.
+    """
+    tokens = [(match.start(), match.end()) for match in TOKEN_PATTERN.finditer(content)]
+    token_words = [[] for _ in tokens]
+    timed = packed is not None and len(packed) > 0
+    if timed and tokens:
+        token_starts = [start for start, _ in tokens]
+        for index, offset in enumerate(packed.offsets.tolist()):
+            word = packed.word(index, content)
+            if word:
+                token_words[max(bisect.bisect_right(token_starts, offset) - 1, 0)].append({
+                    'word': word,
+                    'start_time': round(float(packed.starts[index]), 3),
+                    'end_time': round(float(packed.ends[index]), 3),
+                })
+
+    segments = []
+    first = 0
+    segment_start = None
+    last_end = 0.0
+    for index, (start, end) in enumerate(tokens):
+        if timed:
+            for word in token_words[index]:
+                segment_start = word['start_time'] if segment_start is None else segment_start
+                last_end = max(last_end, word['end_time'])
+            length = last_end - segment_start if segment_start is not None else 0.0
+            minimum, maximum = SEGMENT_MIN_SECONDS, SEGMENT_MAX_SECONDS
+        else:
+            length = end - tokens[first][0]
+            minimum, maximum = SEGMENT_MIN_CHARS, SEGMENT_MAX_CHARS
+
+        if index == len(tokens) - 1 or length >= maximum or (length >= minimum and content[end - 1] in SENTENCE_ENDINGS):
+            words = [word for i in range(first, index + 1) for word in token_words[i]]
+            text = content[tokens[first][0]:end]
+            start_time = segment_start if segment_start is not None else last_end
+            segments.append({
+                'start_time': start_time,
+                'end_time': max(last_end, start_time),
+                'content': text,
+                'packed_timestamps': pack_timestamps(words, text) if timed else None,
+            })
+            first, segment_start = index + 1, None
+    return segments
+
+
+def align_words(old_words, new_content):
+    """
+    Carries word timestamps over to edited text.
+
+    Unchanged words keep their times. Replacement words share the time span of the
+    words they replace, and inserted words get a zero-length span at the insertion point.
+
+    Args:
+        old_words (list): Word dicts with 'word', 'start_time' and 'end_time', in order.
+        new_content (str): The edited text.
+
+    Returns:
+        list: Word dicts for the tokens of the new text.
+    """
+    new_tokens = new_content.split()
+    matcher = difflib.SequenceMatcher(None, [word['word'] for word in old_words], new_tokens, autojunk=False)
+    words = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            words.extend(dict(old_words[i1 + k], word=new_tokens[j1 + k]) for k in range(j2 - j1))
+            continue
+        if tag == 'delete':
+            continue
+        if i2 > i1:
+            span_start, span_end = old_words[i1]['start_time'], old_words[i2 - 1]['end_time']
+        else:
+            span_start = span_end = words[-1]['end_time'] if words else (old_words[i1]['start_time'] if old_words else 0.0)
+        step = (span_end - span_start) / (j2 - j1)
+        for k in range(j2 - j1):
+            words.append({
+                'word': new_tokens[j1 + k],
+                'start_time': round(span_start + k * step, 3),
+                'end_time': round(span_start + (k + 1) * step, 3),
+            })
+    return words
@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from apps.transcripts.models import Transcript
+from apps.transcripts.models import Transcript, TranscriptSegment
 
 class TranscriptSerializer(serializers.ModelSerializer):
+    timestamps = serializers.ListField(child=serializers.DictField())
     word_count = serializers.SerializerMethodField()
     duration = serializers.SerializerMethodField()
 
@@ -28,8 +29,8 @@ class TranscriptSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Timestamps must be a list.")
 
         for timestamp in data['timestamps']:
-            if not isinstance(timestamp, dict) or 'start' not in timestamp or 'end' not in timestamp:
-                raise serializers.ValidationError("Each timestamp must be a dictionary with 'start' and 'end' keys.")
+            if not all(key in timestamp for key in ('word', 'start_time', 'end_time')):
+                raise serializers.ValidationError("Each timestamp must be a dictionary with 'word', 'start_time' and 'end_time' keys.")
 
         return data
 
@@ -46,7 +47,10 @@ class TranscriptSerializer(serializers.ModelSerializer):
         instance.episode = validated_data.get('episode', instance.episode)
         instance.content = validated_data.get('content', instance.content)
         instance.timestamps = validated_data.get('timestamps', instance.timestamps)
+        instance.content_stale = False
         instance.save()
+        # A full replacement invalidates every segment
+        instance.build_segments()
         return instance
 
     def get_word_count(self, obj):
@@ -61,6 +65,31 @@ class TranscriptSerializer(serializers.ModelSerializer):
         """
         return obj.get_duration()
 
+class TranscriptSegmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TranscriptSegment
+        fields = ['position', 'start_time', 'end_time', 'content', 'version', 'updated_at']
+        read_only_fields = fields
+
+
+class SegmentEditSerializer(serializers.Serializer):
+    position = serializers.IntegerField(min_value=0)
+    content = serializers.CharField(allow_blank=True, trim_whitespace=False)
+    version = serializers.IntegerField(min_value=1, required=False, help_text="Version the edit was based on.")
+
+
+class TranscriptSegmentPatchSerializer(serializers.Serializer):
+    segments = SegmentEditSerializer(many=True, allow_empty=False)
+
+    def validate_segments(self, value):
+        """
+        Rejects several edits of the same segment in one request.
+        """
+        positions = [edit['position'] for edit in value]
+        if len(positions) != len(set(positions)):
+            raise serializers.ValidationError("Each segment can only be edited once per request.")
+        return value
+
 # Human tasks:
 # 1. Define the specific fields to be included in the serializer (Required)
 # 2. Determine which fields should be read-only (Required)
@@ -1,7 +1,19 @@
 from django.test import TestCase
 from django.utils import timezone
-from apps.transcripts.models import Transcript
+import io
+import sys
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase
+from apps.transcripts.models import Transcript, TranscriptionCacheEntry
+from apps.transcripts.exporters import iter_cues, render_vtt, stream_export
+from apps.transcripts.segments import align_words, split_into_segments
+from apps.transcripts.text_edits import distribute_content
+from apps.transcripts.timestamps import PackedTimestamps, pack_timestamps
 from apps.episodes.models import Episode
+from services.recognizers import GoogleSpeechRecognizer
+from services.transcription_cache import AudioDigest, TranscriptionResultCache
 
 class TranscriptModelTests(TestCase):
     def setUp(self):
@@ -57,10 +69,14 @@ class TranscriptModelTests(TestCase):
     def test_generate_srt(self):
         """Test the generate_srt method of the Transcript model"""
         self.transcript.content = "This is a test."
-        self.transcript.start_time = 0
-        self.transcript.end_time = 5
+        self.transcript.timestamps = [
+            {"word": "This", "start_time": 0.0, "end_time": 1.0},
+            {"word": "is", "start_time": 1.0, "end_time": 2.0},
+            {"word": "a", "start_time": 2.0, "end_time": 3.0},
+            {"word": "test.", "start_time": 3.0, "end_time": 5.0},
+        ]
         self.transcript.save()
-        expected_srt = "1\n00:00:00,000 --> 00:00:05,000\nThis is a test."
+        expected_srt = "1\n00:00:00,000 --> 00:00:05,000\nThis is a test.\n\n"
         self.assertEqual(self.transcript.generate_srt(), expected_srt)
 
     def test_transcript_language(self):
@@ -89,6 +105,179 @@ class TranscriptModelTests(TestCase):
             self.transcript.status = "invalid_status"
             self.transcript.save()
 
+class PackedTimestampsTests(SimpleTestCase):
+    def setUp(self):
+        """Set up packed timestamps for a short transcript"""
+        self.content = "hello brave new world"
+        self.words = [
+            {"word": "brave", "start_time": 0.5, "end_time": 0.9},
+            {"word": "hello", "start_time": 0.0, "end_time": 0.4},
+            {"word": "new", "start_time": 1.0, "end_time": 1.2},
+            {"word": "world", "start_time": 1.3, "end_time": 1.8},
+        ]
+        self.packed = PackedTimestamps(memoryview(pack_timestamps(self.words, self.content)))
+
+    def test_round_trip(self):
+        """Test that packed timestamps expand back to the sorted word list"""
+        self.assertEqual(len(self.packed), 4)
+        self.assertEqual(self.packed.to_list(self.content), sorted(self.words, key=lambda word: word["start_time"]))
+
+    def test_duration(self):
+        """Test that the duration is read from the header"""
+        self.assertEqual(self.packed.duration, 1.8)
+
+    def test_word_index_at(self):
+        """Test binary-search lookup of the word at a given time"""
+        self.assertEqual(self.packed.word(self.packed.word_index_at(1.5), self.content), "world")
+        self.assertIsNone(self.packed.word_index_at(0.45))
+        self.assertIsNone(self.packed.word_index_at(-1.0))
+
+    def test_transcript_properties(self):
+        """Test that the Transcript model packs timestamps against its content"""
+        transcript = Transcript(content=self.content, timestamps=self.words)
+        self.assertEqual(transcript.get_duration(), 1.8)
+        self.assertEqual(transcript.get_word_at(0.6)["word"], "brave")
+        self.assertEqual(len(transcript.timestamps), 4)
+
+
+class TranscriptExportTests(SimpleTestCase):
+    def setUp(self):
+        """Set up an unsaved transcript with two sentences and a long pause"""
+        words = "Welcome to the show. Today we talk about growth".split()
+        times = [0.0, 0.4, 0.6, 0.8, 1.5, 1.9, 2.2, 2.5, 6.0]
+        self.transcript = Transcript(
+            content=" ".join(words),
+            timestamps=[{"word": w, "start_time": t, "end_time": t + 0.3} for w, t in zip(words, times)],
+        )
+
+    def test_iter_cues_groups_words(self):
+        """Test that cues break after sentences and long pauses"""
+        cues = [text for _, _, text in iter_cues(self.transcript)]
+        self.assertEqual(cues, ["Welcome to the show.", "Today we talk about", "growth"])
+
+    def test_iter_cues_respects_char_limit(self):
+        """Test that no cue exceeds the character limit"""
+        for _, _, text in iter_cues(self.transcript, max_chars=12):
+            self.assertLessEqual(len(text), 12)
+
+    def test_render_vtt(self):
+        """Test the WebVTT header and timestamp format"""
+        vtt = "".join(render_vtt(self.transcript))
+        self.assertTrue(vtt.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:01.100\nWelcome to the show.\n\n"))
+
+    def test_segmented_export_uses_render_cache(self):
+        """Test that a segmented transcript is rendered once per version"""
+        segments = [SimpleNamespace(pk=1, version=1, content="Welcome to the show."),
+                    SimpleNamespace(pk=2, version=1, content="Today we talk about growth")]
+        transcript = SimpleNamespace(pk=9001, version=1, segments=mock.Mock(all=mock.Mock(return_value=segments)))
+
+        self.assertEqual("".join(stream_export(transcript, "txt")), "Welcome to the show. Today we talk about growth\n")
+        self.assertEqual("".join(stream_export(transcript, "txt")), "Welcome to the show. Today we talk about growth\n")
+        self.assertEqual(transcript.segments.all.call_count, 1)
+
+        transcript.version = 2
+        "".join(stream_export(transcript, "txt"))
+        self.assertEqual(transcript.segments.all.call_count, 2)
+
+
+class TranscriptSegmentTests(SimpleTestCase):
+    def setUp(self):
+        """Set up a transcript of two sentences spanning 24 seconds"""
+        words = "One two three four. Five six seven eight.".split()
+        self.transcript = Transcript(
+            content=" ".join(words),
+            timestamps=[{"word": w, "start_time": i * 3.0, "end_time": i * 3.0 + 1.0} for i, w in enumerate(words)],
+        )
+
+    def test_split_into_segments(self):
+        """Test that segments close at the first sentence ending after the minimum length"""
+        segments = split_into_segments(self.transcript.content, self.transcript.word_timestamps)
+        self.assertEqual([segment["content"] for segment in segments], ["One two three four.", "Five six seven eight."])
+        self.assertEqual((segments[1]["start_time"], segments[1]["end_time"]), (12.0, 22.0))
+
+        segments = split_into_segments("Short. " * 100)
+        self.assertTrue(all(len(segment["content"]) <= 1000 for segment in segments))
+        self.assertEqual(" ".join(segment["content"] for segment in segments), ("Short. " * 100).strip())
+
+    def test_align_words_keeps_unchanged_times(self):
+        """Test that edited words take over the span of the words they replace"""
+        old = self.transcript.timestamps[:4]
+        words = align_words(old, "One 2 three four.")
+        self.assertEqual([w["word"] for w in words], ["One", "2", "three", "four."])
+        self.assertEqual(words[0], old[0])
+        self.assertEqual((words[1]["start_time"], words[1]["end_time"]), (3.0, 4.0))
+        self.assertEqual(words[3], old[3])
+
+    def test_distribute_content_touches_only_changed_segments(self):
+        """Test that a whole-text edit is mapped back onto the segments it changes"""
+        texts = ["One two three four.", "Five six seven eight.", "Nine ten."]
+        new_texts = distribute_content(texts, "One two three four. Five 6 seven eight. Nine ten.")
+        self.assertEqual(new_texts, ["One two three four.", "Five 6 seven eight.", "Nine ten."])
+        self.assertEqual([old == new for old, new in zip(texts, new_texts)], [True, False, True])
+
+
+class TranscriptionResultCacheTests(TestCase):
+    def setUp(self):
+        """Set up a cache with a small size budget"""
+        self.cache = TranscriptionResultCache(max_bytes=200)
+
+    def test_digest_depends_on_audio_and_config(self):
+        """Test that the cache key changes with the audio bytes and recognition config"""
+        audio = io.BytesIO(b"audio" * 1000)
+        key = AudioDigest.from_file(audio, 16000, "en-US", "default")
+        self.assertEqual(audio.tell(), 0)
+        self.assertEqual(key, AudioDigest.from_file(audio, 16000, "en-US", "default"))
+        self.assertNotEqual(key, AudioDigest.from_file(audio, 16000, "es-ES", "default"))
+        self.assertNotEqual(key, AudioDigest.from_file(io.BytesIO(b"other"), 16000, "en-US", "default"))
+
+    def test_get_counts_hits_and_misses(self):
+        """Test that lookups update the hit and miss counters"""
+        self.assertIsNone(self.cache.get("missing"))
+        self.cache.set("key", "hello world", "en-US", 0.9, [{"word": "hello", "start_time": 0.0, "end_time": 0.5}])
+        cached = self.cache.get("key")
+
+        self.assertEqual(cached["content"], "hello world")
+        self.assertEqual(cached["confidence_score"], 0.9)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(TranscriptionCacheEntry.objects.get(cache_key="key").hit_count, 1)
+
+    def test_set_evicts_least_recently_used(self):
+        """Test that entries beyond the size budget are evicted oldest first"""
+        self.cache.set("first", "a" * 90, "en-US", 0.9, [])
+        self.cache.set("second", "b" * 90, "en-US", 0.9, [])
+        self.cache.get("first")
+        self.cache.set("third", "c" * 90, "en-US", 0.9, [])
+
+        remaining = set(TranscriptionCacheEntry.objects.values_list("cache_key", flat=True))
+        self.assertEqual(remaining, {"first", "third"})
+
+
+class GoogleSpeechRecognizerTests(SimpleTestCase):
+    def test_long_audio_is_streamed_in_windows(self):
+        """Test that each window of audio gets its own stream and word times are offset by its start"""
+        speech = mock.MagicMock()
+        speech.StreamingRecognizeRequest.side_effect = lambda audio_content: audio_content
+        windows = []
+
+        def streaming_recognize(config, requests):
+            windows.append(b"".join(requests))
+            word = SimpleNamespace(word=f"w{len(windows)}", start_time=timedelta(seconds=1), end_time=timedelta(seconds=2))
+            result = SimpleNamespace(is_final=True, alternatives=[SimpleNamespace(words=[word], confidence=0.9)])
+            return [SimpleNamespace(results=[result])]
+
+        client = mock.Mock(streaming_recognize=streaming_recognize)
+        google = mock.Mock(cloud=mock.Mock(speech=speech))
+        with mock.patch.dict(sys.modules, {"google": google, "google.cloud": google.cloud, "google.cloud.speech": speech}):
+            recognizer = GoogleSpeechRecognizer(client=client)
+        # 25 seconds of 8 kHz audio in uneven chunks, in 10-second windows of 1-second requests
+        audio = bytes(range(256)) * 1562 + b"\x00" * 128
+        words = recognizer.recognize_stream([audio[:7000], audio[7000:]], 8000, request_bytes=16000, window_seconds=10)
+
+        self.assertEqual([len(window) for window in windows], [160000, 160000, 80000])
+        self.assertEqual(b"".join(windows), audio)
+        self.assertEqual([(word["word"], word["start_time"]) for word in words], [("w1", 1.0), ("w2", 11.0), ("w3", 21.0)])
+
 # TODO: Define specific test cases for edge cases and error handling scenarios
 # TODO: Implement integration tests with the Episode model
 # TODO: Add performance tests for methods dealing with large transcripts
@@ -0,0 +1,30 @@
+import difflib
+
+
+def distribute_content(segment_texts, new_content):
+    """
+    Maps an edited full text onto existing segments, so only the segments it touches change.
+
+    Kept free of Django imports, as the raw SQL models in src/database use it as well.
+
+    Args:
+        segment_texts (list): Current text of each segment, in order.
+        new_content (str): The edited full text.
+
+    Returns:
+        list: The new text of each segment, whitespace-normalized.
+    """
+    owners = [position for position, text in enumerate(segment_texts) for _ in text.split()]
+    old_tokens = [token for text in segment_texts for token in text.split()]
+    new_tokens = new_content.split()
+    assigned = [[] for _ in segment_texts]
+
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for k in range(i2 - i1):
+                assigned[owners[i1 + k]].append(new_tokens[j1 + k])
+        elif j2 > j1:
+            owner = owners[i1] if i1 < len(owners) else (owners[-1] if owners else 0)
+            assigned[owner].extend(new_tokens[j1:j2])
+    return [' '.join(tokens) for tokens in assigned]
@@ -0,0 +1,122 @@
+import numpy as np
+
+# Blob layout (little-endian):
+#   header   uint32 word count, float32 duration
+#   starts   float32[count]  word start times in seconds, ascending
+#   ends     float32[count]  word end times in seconds
+#   offsets  uint32[count]   character offset of each word in the transcript content
+#   lengths  uint32[count]   character length of each word in the transcript content
+HEADER_DTYPE = np.dtype([('count', '<u4'), ('duration', '<f4')])
+TIME_DTYPE = np.dtype('<f4')
+OFFSET_DTYPE = np.dtype('<u4')
+NOT_IN_CONTENT = np.iinfo(OFFSET_DTYPE).max
+
+
+def pack_timestamps(words, content):
+    """
+    Packs word-level timestamps into a compact binary blob.
+
+    Each word is located in the content, scanning forward from the previous match,
+    so the blob stores character offsets instead of copies of the words.
+
+    Args:
+        words (list): Dicts with 'word', 'start_time' and 'end_time'.
+        content (str): The transcript text the words belong to.
+
+    Returns:
+        bytes: The packed representation.
+    """
+    words = sorted(words, key=lambda word: float(word['start_time']))
+    count = len(words)
+    starts = np.fromiter((word['start_time'] for word in words), dtype=TIME_DTYPE, count=count)
+    ends = np.fromiter((word['end_time'] for word in words), dtype=TIME_DTYPE, count=count)
+    offsets = np.full(count, NOT_IN_CONTENT, dtype=OFFSET_DTYPE)
+    lengths = np.zeros(count, dtype=OFFSET_DTYPE)
+
+    position = 0
+    for i, word in enumerate(words):
+        found = content.find(word['word'], position)
+        if found >= 0:
+            offsets[i] = found
+            lengths[i] = len(word['word'])
+            position = found + len(word['word'])
+
+    header = np.array([(count, ends.max() if count else 0.0)], dtype=HEADER_DTYPE)
+    return b''.join(array.tobytes() for array in (header, starts, ends, offsets, lengths))
+
+
+class PackedTimestamps:
+    """
+    Read-only view over a packed timestamp blob.
+
+    The arrays are NumPy views onto the blob itself, so loading is zero-copy.
+    """
+
+    def __init__(self, blob):
+        """
+        Wraps a blob produced by pack_timestamps.
+
+        Args:
+            blob (bytes | memoryview): The packed representation.
+        """
+        header = np.frombuffer(blob, dtype=HEADER_DTYPE, count=1)[0]
+        count = int(header['count'])
+        self.duration = round(float(header['duration']), 3)
+
+        position = HEADER_DTYPE.itemsize
+        self.starts = np.frombuffer(blob, dtype=TIME_DTYPE, count=count, offset=position)
+        position += self.starts.nbytes
+        self.ends = np.frombuffer(blob, dtype=TIME_DTYPE, count=count, offset=position)
+        position += self.ends.nbytes
+        self.offsets = np.frombuffer(blob, dtype=OFFSET_DTYPE, count=count, offset=position)
+        position += self.offsets.nbytes
+        self.lengths = np.frombuffer(blob, dtype=OFFSET_DTYPE, count=count, offset=position)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def word_index_at(self, seconds):
+        """
+        Finds the word spoken at a given time with a binary search.
+
+        Args:
+            seconds (float): Time from the start of the episode.
+
+        Returns:
+            int | None: Index of the word, or None if no word covers that time.
+        """
+        index = int(np.searchsorted(self.starts, seconds, side='right')) - 1
+        if index < 0 or seconds > self.ends[index]:
+            return None
+        return index
+
+    def word(self, index, content):
+        """
+        Returns the text of a word.
+
+        Args:
+            index (int): Index of the word.
+            content (str): The transcript text the blob was packed against.
+
+        Returns:
+            str: The word, or an empty string if it was not found in the content.
+        """
+        offset = int(self.offsets[index])
+        if offset == NOT_IN_CONTENT:
+            return ''
+        return content[offset:offset + int(self.lengths[index])]
+
+    def to_list(self, content):
+        """
+        Expands the blob back into word dicts.
+
+        Args:
+            content (str): The transcript text the blob was packed against.
+
+        Returns:
+            list: Dicts with 'word', 'start_time' and 'end_time', rounded to milliseconds.
+        """
+        return [
+            {'word': self.word(i, content), 'start_time': round(float(start), 3), 'end_time': round(float(end), 3)}
+            for i, (start, end) in enumerate(zip(self.starts.tolist(), self.ends.tolist()))
+        ]
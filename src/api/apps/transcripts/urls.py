@@ -3,6 +3,7 @@ from apps.transcripts.views import (
     TranscriptListCreateView,
     TranscriptDetailView,
     TranscriptGenerateView,
+    TranscriptSegmentsView,
     TranscriptDownloadView
 )
 
@@ -12,6 +13,7 @@ urlpatterns = [
     path('', TranscriptListCreateView.as_view(), name='transcript-list-create'),
     path('<int:pk>/', TranscriptDetailView.as_view(), name='transcript-detail'),
     path('generate/<int:episode_id>/', TranscriptGenerateView.as_view(), name='transcript-generate'),
+    path('<int:pk>/segments/', TranscriptSegmentsView.as_view(), name='transcript-segments'),
     path('<int:pk>/download/', TranscriptDownloadView.as_view(), name='transcript-download'),
 ]
 
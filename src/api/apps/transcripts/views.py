@@ -1,8 +1,11 @@
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Transcript
-from .serializers import TranscriptSerializer
+from .exporters import EXPORT_CONTENT_TYPES, stream_export
+from .models import Transcript, TranscriptSegment
+from .segments import SegmentVersionConflict
+from .serializers import TranscriptSegmentPatchSerializer, TranscriptSegmentSerializer, TranscriptSerializer
 from apps.episodes.models import Episode
 from services.transcription import transcription_service
 
@@ -44,6 +47,14 @@ class TranscriptDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TranscriptSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_object(self):
+        """
+        Returns the transcript with any pending segment edits folded into its content.
+        """
+        transcript = super().get_object()
+        transcript.sync_content()
+        return transcript
+
     def get(self, request, *args, **kwargs):
         """
         Retrieves a specific transcript.
@@ -87,6 +98,51 @@ class TranscriptGenerateView(APIView):
 
         return Response({"message": "Transcript generation initiated"}, status=status.HTTP_202_ACCEPTED)
 
+class TranscriptSegmentsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Lists the segments of a transcript, optionally only those overlapping ?start=&end= (seconds).
+        """
+        segments = TranscriptSegment.objects.filter(transcript_id=pk)
+        try:
+            if 'start' in request.query_params:
+                segments = segments.filter(end_time__gte=float(request.query_params['start']))
+            if 'end' in request.query_params:
+                segments = segments.filter(start_time__lte=float(request.query_params['end']))
+        except ValueError:
+            return Response({"error": "start and end must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(TranscriptSegmentSerializer(segments, many=True).data)
+
+    def patch(self, request, pk):
+        """
+        Edits individual segments, writing only the segments that changed.
+        """
+        try:
+            transcript = Transcript.objects.get(pk=pk)
+        except Transcript.DoesNotExist:
+            return Response({"error": "Transcript not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = TranscriptSegmentPatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            changed = transcript.update_segments(serializer.validated_data['segments'])
+        except TranscriptSegment.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except SegmentVersionConflict as e:
+            return Response(
+                {"error": str(e), "position": e.position, "current_version": e.current_version},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response({
+            "version": transcript.version,
+            "segments": TranscriptSegmentSerializer(changed, many=True).data,
+        })
+
 class TranscriptDownloadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -101,19 +157,14 @@ class TranscriptDownloadView(APIView):
 
         format = request.query_params.get('format', 'txt')
         
-        if format not in ['txt', 'srt', 'vtt']:
+        if format not in EXPORT_CONTENT_TYPES:
             return Response({"error": "Invalid format specified"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # TODO: Implement the logic to generate the transcript in the requested format
-        # This is a placeholder implementation
-        content = f"Transcript content in {format} format"
-        
-        response = Response(content, content_type='text/plain')
+        response = StreamingHttpResponse(stream_export(transcript, format), content_type=EXPORT_CONTENT_TYPES[format])
         response['Content-Disposition'] = f'attachment; filename="transcript.{format}"'
         return response
 
 # TODO: Implement proper error handling and logging for all views
 # TODO: Add authentication and permission checks for all views
 # TODO: Implement rate limiting for transcript generation to prevent abuse
-# TODO: Add support for different transcript formats in the TranscriptDownloadView
 # TODO: Implement caching for frequently accessed transcripts
\ No newline at end of file
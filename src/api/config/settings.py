@@ -101,10 +101,42 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/media/'
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
+# Cache settings
+REDIS_URL = env('REDIS_URL', default='redis://localhost:6379/1')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+}
+
 # Celery settings
 CELERY_BROKER_URL = env('CELERY_BROKER_URL')
 CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND')
 
+# Transcription settings
+TRANSCRIPTION_RECOGNIZER = env('TRANSCRIPTION_RECOGNIZER', default='google')
+TRANSCRIPTION_RECOGNIZER_OPTIONS = env.json('TRANSCRIPTION_RECOGNIZER_OPTIONS', default={})
+TRANSCRIPTION_CACHE_MAX_BYTES = env.int('TRANSCRIPTION_CACHE_MAX_BYTES', default=512 * 1024 * 1024)
+TRANSCRIPT_EXPORT_CACHE_TIMEOUT = env.int('TRANSCRIPT_EXPORT_CACHE_TIMEOUT', default=24 * 60 * 60)
+
+# Content generation settings
+LLM_API_BASE = env('LLM_API_BASE', default='https://api.openai.com/v1')
+LLM_MAX_CONCURRENCY = env.int('LLM_MAX_CONCURRENCY', default=32)
+LLM_TIMEOUT_SECONDS = env.float('LLM_TIMEOUT_SECONDS', default=60.0)
+LLM_RATE_LIMITER_BACKEND = env('LLM_RATE_LIMITER_BACKEND', default='redis')  # Empty to disable
+LLM_REQUESTS_PER_MINUTE = env.int('LLM_REQUESTS_PER_MINUTE', default=3500)
+LLM_TOKENS_PER_MINUTE = env.int('LLM_TOKENS_PER_MINUTE', default=90000)
+LLM_RATE_LIMIT_BURST_SECONDS = env.float('LLM_RATE_LIMIT_BURST_SECONDS', default=1.0)
+TRANSCRIPT_BRIEF_STRATEGY = env('TRANSCRIPT_BRIEF_STRATEGY', default='extractive')
+TRANSCRIPT_CONDENSATION_MODEL = env('TRANSCRIPT_CONDENSATION_MODEL', default='gpt-3.5-turbo')
+TRANSCRIPT_BRIEF_MAX_TOKENS = env.int('TRANSCRIPT_BRIEF_MAX_TOKENS', default=400)
+TRANSCRIPT_CHUNK_TOKENS = env.int('TRANSCRIPT_CHUNK_TOKENS', default=2500)
+TRANSCRIPT_BRIEF_CACHE_TIMEOUT = env.int('TRANSCRIPT_BRIEF_CACHE_TIMEOUT', default=30 * 24 * 60 * 60)
+GENERATION_CACHE_BACKEND = env('GENERATION_CACHE_BACKEND', default='redis')
+GENERATION_CACHE_TIMEOUT = env.int('GENERATION_CACHE_TIMEOUT', default=7 * 24 * 60 * 60)
+GENERATION_CACHE_MAX_ENTRIES = env.int('GENERATION_CACHE_MAX_ENTRIES', default=10000)
+
 # Google Cloud credentials
 GOOGLE_CLOUD_CREDENTIALS = env('GOOGLE_CLOUD_CREDENTIALS')
 
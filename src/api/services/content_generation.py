@@ -1,25 +1,104 @@
 import logging
 import json
-import openai
+import re
+from typing import Any, Dict, Iterator, List, Tuple
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from src.api.apps.episodes.models import Episode
 from src.api.apps.transcripts.models import Transcript
 from src.api.apps.marketing.models import MarketingContent
+from src.api.services.generation_cache import GenerationCache, generation_cache_key, get_generation_cache
+from src.api.services.json_repair import loads_lenient
+from src.backend.services.llm_client import LLMClient, chat_completion_text, get_llm_client
+from src.backend.services.transcript_condensation import TranscriptCondenser
 
 logger = logging.getLogger(__name__)
 
+# Generation limits
+HEADLINE_MAX_CHARS = 100
+PLATFORM_MAX_CHARS = {'twitter': 280}
+DEFAULT_MAX_CHARS = 2200
+HASHTAG_COUNT = 3
+DEFAULT_HASHTAGS = ["#podcast", "#newepisode", "#listennow"]  # Pad hashtag lists that come back short
+MAX_TOKENS_PER_PLATFORM = 500
+MAX_TOKENS_PER_FIELD = 150
+REPAIR_STATS = ["repaired_responses", "fields_requested", "avoided_regenerations"]
+REQUIRED_KEYS = ["headline", "main_content", "hashtags", "cta"]
+SYSTEM_MESSAGE = "You are a helpful assistant that generates marketing content for podcast episodes."
+PROMPT_VERSION = 2  # Bump whenever the prompt templates change so cached results are not reused
+
+def normalize_hashtags(hashtags: Any) -> List[str]:
+    """
+    Coerces generated hashtags into a list of exactly HASHTAG_COUNT distinct tags.
+
+    A string of tags is split on whitespace and commas, each tag is given a leading '#'
+    with inner spaces and punctuation removed, and the list is padded from
+    DEFAULT_HASHTAGS or trimmed.
+
+    Args:
+        hashtags (Any): The generated hashtags, a list or a string.
+
+    Returns:
+        List[str]: The hashtags.
+    """
+    tags = re.split(r"[\s,]+", hashtags) if isinstance(hashtags, str) else [str(tag) for tag in hashtags or []]
+    normalized = {}
+    for tag in tags + DEFAULT_HASHTAGS:
+        words = re.findall(r"\w+", tag)
+        if words:
+            normalized.setdefault("#" + "".join(words).lower(), "#" + "".join(words))
+    return list(normalized.values())[:HASHTAG_COUNT]
+
+
+def record_repair_stat(name: str, count: int = 1) -> None:
+    """
+    Adds to one of the REPAIR_STATS counters, shared by all workers through the cache.
+
+    Args:
+        name (str): The counter.
+        count (int): The amount to add.
+    """
+    key = f"generation-repair:{name}"
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        # The counter was evicted between add and incr
+        cache.set(key, count, None)
+
+
+def get_repair_stats() -> Dict[str, int]:
+    """
+    Returns the REPAIR_STATS counters.
+
+    Returns:
+        Dict[str, int]: Responses repaired, fields requested again and full regenerations avoided.
+    """
+    values = cache.get_many([f"generation-repair:{name}" for name in REPAIR_STATS])
+    return {name: values.get(f"generation-repair:{name}", 0) for name in REPAIR_STATS}
+
+
 class ContentGenerationService:
     """
     A service class for generating AI-driven marketing content for podcast episodes.
     """
 
-    def __init__(self):
+    def __init__(self, generation_cache: GenerationCache = None, llm_client: LLMClient = None,
+                 condenser: TranscriptCondenser = None):
         """
         Initializes the ContentGenerationService with OpenAI API key and model name.
+
+        Args:
+            generation_cache (GenerationCache): Cache of validated results, defaults to the configured shared cache.
+            llm_client (LLMClient): Completion client, defaults to the shared connection-pooled client of this process.
+            condenser (TranscriptCondenser): Builds the cached episode brief used in prompts.
         """
         self.openai_api_key = settings.OPENAI_API_KEY
         self.model_name = 'gpt-3.5-turbo'
-        openai.api_key = self.openai_api_key
+        self.llm_client = llm_client or get_llm_client(self.openai_api_key)
+        self.condenser = condenser or TranscriptCondenser(llm_client=self.llm_client)
+        self.generation_cache = generation_cache or get_generation_cache()
 
     def generate_marketing_content(self, episode: Episode, platform: str) -> MarketingContent:
         """
@@ -34,9 +113,14 @@ class ContentGenerationService:
         """
         try:
             transcript = Transcript.objects.get(episode=episode)
-            prompt = self.prepare_prompt(episode, transcript, platform)
-            generated_content = self.call_openai_api(prompt)
-            parsed_content = self.parse_generated_content(generated_content, platform)
+            transcript.sync_content()
+            cache_key = self.get_cache_key(episode, transcript, platform)
+            parsed_content = self.generation_cache.get(cache_key)
+            if parsed_content is None:
+                prompt = self.prepare_prompt(episode, transcript, platform)
+                generated_content = self.call_openai_api(prompt)
+                parsed_content = self.parse_generated_content(generated_content, platform, prompt)
+                self.generation_cache.set(cache_key, parsed_content)
 
             marketing_content = MarketingContent.objects.create(
                 episode=episode,
@@ -54,6 +138,167 @@ class ContentGenerationService:
             logger.error(f"Error generating marketing content: {str(e)}")
             raise
 
+    def stream_marketing_content(self, episode: Episode, platform: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Generates marketing content for one platform, yielding the text as the API produces it.
+
+        Each chunk of the completion is yielded as ('token', text). Once the completion is
+        complete, it is parsed and validated like generate_marketing_content, cached and
+        saved, and ('content', MarketingContent) is yielded last. A cached result is
+        yielded as a single token.
+
+        Args:
+            episode (Episode): The podcast episode for which to generate content.
+            platform (str): The social media platform for which to generate content.
+
+        Yields:
+            Tuple[str, Any]: ('token', str) events followed by one ('content', MarketingContent).
+        """
+        try:
+            transcript = Transcript.objects.get(episode=episode)
+        except Transcript.DoesNotExist:
+            logger.error(f"Transcript not found for episode {episode.id}")
+            raise ValueError(f"Transcript not found for episode {episode.id}")
+
+        transcript.sync_content()
+        cache_key = self.get_cache_key(episode, transcript, platform)
+        parsed_content = self.generation_cache.get(cache_key)
+        if parsed_content is not None:
+            yield 'token', json.dumps(parsed_content)
+        else:
+            prompt = self.prepare_prompt(episode, transcript, platform)
+            parts = []
+            for text in self.llm_client.stream_chat_completion(
+                self.model_name,
+                self.prepare_messages(prompt),
+                max_tokens=MAX_TOKENS_PER_PLATFORM,
+                temperature=0.7,
+            ):
+                parts.append(text)
+                yield 'token', text
+            parsed_content = self.parse_generated_content(''.join(parts).strip(), platform, prompt)
+            self.generation_cache.set(cache_key, parsed_content)
+
+        yield 'content', MarketingContent.objects.create(
+            episode=episode,
+            platform=platform,
+            content=json.dumps(parsed_content),
+            status='generated'
+        )
+
+    def generate_marketing_contents(self, episode: Episode, platforms: List[str]) -> Dict[str, MarketingContent]:
+        """
+        Generates marketing content for several platforms with a single API call.
+
+        The episode details are sent once and the response holds one section per platform.
+        Each section is validated on its own; only platforms whose section is missing or
+        invalid are regenerated individually. Platforms with a cached result for the same
+        episode content, model and prompt version are not requested at all. All rows are
+        inserted with one query.
+
+        Args:
+            episode (Episode): The podcast episode for which to generate content.
+            platforms (List[str]): The social media platforms for which to generate content.
+
+        Returns:
+            Dict[str, MarketingContent]: Generated marketing content objects by platform.
+        """
+        platforms = list(dict.fromkeys(platforms))
+        try:
+            transcript = Transcript.objects.get(episode=episode)
+        except Transcript.DoesNotExist:
+            logger.error(f"Transcript not found for episode {episode.id}")
+            raise ValueError(f"Transcript not found for episode {episode.id}")
+
+        transcript.sync_content()
+        cache_keys = {platform: self.get_cache_key(episode, transcript, platform) for platform in platforms}
+        cached = self.generation_cache.get_many(cache_keys.values())
+        sections = {platform: cached[key] for platform, key in cache_keys.items() if key in cached}
+        missing = [platform for platform in platforms if platform not in sections]
+
+        generated = {}
+        if len(missing) > 1:
+            prompt = self.prepare_multi_platform_prompt(episode, transcript, missing)
+            generated_content = self.call_openai_api(prompt, max_tokens=MAX_TOKENS_PER_PLATFORM * len(missing))
+            generated = self.parse_multi_platform_content(generated_content, missing)
+
+        for platform in missing:
+            if platform not in generated:
+                # Fall back to a single-platform request for sections that failed validation
+                prompt = self.prepare_prompt(episode, transcript, platform)
+                generated[platform] = self.parse_generated_content(self.call_openai_api(prompt), platform, prompt)
+        if generated:
+            self.generation_cache.set_many({cache_keys[platform]: content for platform, content in generated.items()})
+        sections.update(generated)
+
+        with transaction.atomic():
+            marketing_contents = MarketingContent.objects.bulk_create([
+                MarketingContent(
+                    episode=episode,
+                    platform=platform,
+                    content=json.dumps(sections[platform]),
+                    status='generated'
+                )
+                for platform in platforms
+            ])
+
+        return dict(zip(platforms, marketing_contents))
+
+    def get_cache_key(self, episode: Episode, transcript: Transcript, platform: str) -> str:
+        """
+        Returns the generation cache key for an episode, platform, model and prompt version.
+
+        Args:
+            episode (Episode): The podcast episode.
+            transcript (Transcript): The transcript of the episode, with up-to-date content.
+            platform (str): The social media platform.
+
+        Returns:
+            str: The cache key.
+        """
+        return generation_cache_key(
+            episode.title, episode.description, transcript.content, platform, self.model_name,
+            f"{PROMPT_VERSION}:{self.condenser.strategy}"
+        )
+
+    def prepare_multi_platform_prompt(self, episode: Episode, transcript: Transcript, platforms: List[str]) -> str:
+        """
+        Prepares a single prompt requesting content for several platforms.
+
+        Args:
+            episode (Episode): The podcast episode.
+            transcript (Transcript): The transcript of the episode.
+            platforms (List[str]): The social media platforms for which to generate content.
+
+        Returns:
+            str: Prepared prompt for content generation.
+        """
+        transcript.sync_content()
+        brief = self.condenser.get_brief(transcript.content)
+        limits = "\n".join(
+            f"        - {platform}: main post content max {PLATFORM_MAX_CHARS.get(platform.lower(), DEFAULT_MAX_CHARS)} characters"
+            for platform in platforms
+        )
+        prompt = f"""
+        Generate marketing content for the following podcast episode:
+        Title: {episode.title}
+        Description: {episode.description}
+        Episode brief: {brief}
+
+        Target platforms:
+{limits}
+
+        For each platform, please generate the following:
+        1. A catchy headline (max 100 characters)
+        2. Main post content (within the platform limit above)
+        3. Three relevant hashtags
+        4. A call-to-action
+
+        Format the response as a JSON object with one key per platform name exactly as listed above.
+        Each value must be a JSON object with keys: "headline", "main_content", "hashtags", and "cta".
+        """
+        return prompt
+
     def prepare_prompt(self, episode: Episode, transcript: Transcript, platform: str) -> str:
         """
         Prepares the prompt for content generation based on episode data and target platform.
@@ -66,12 +311,13 @@ class ContentGenerationService:
         Returns:
             str: Prepared prompt for content generation.
         """
-        summary = transcript.content[:500]  # Use first 500 characters as summary
+        transcript.sync_content()
+        brief = self.condenser.get_brief(transcript.content)
         prompt = f"""
         Generate marketing content for the following podcast episode:
         Title: {episode.title}
         Description: {episode.description}
-        Summary: {summary}
+        Episode brief: {brief}
 
         Target platform: {platform}
 
@@ -85,74 +331,192 @@ class ContentGenerationService:
         """
         return prompt
 
-    def call_openai_api(self, prompt: str) -> str:
+    def prepare_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """
+        Wraps a prompt in the chat messages sent to the API.
+
+        Args:
+            prompt (str): The prepared prompt for content generation.
+
+        Returns:
+            List[Dict[str, str]]: The system and user messages.
+        """
+        return [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt}
+        ]
+
+    def call_openai_api(self, prompt: str, max_tokens: int = MAX_TOKENS_PER_PLATFORM) -> str:
         """
         Makes a call to the OpenAI API to generate content based on the prepared prompt.
 
         Args:
             prompt (str): The prepared prompt for content generation.
+            max_tokens (int): Maximum number of tokens to generate.
 
         Returns:
             str: Generated content from OpenAI API.
         """
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that generates marketing content for podcast episodes."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
+            response = self.llm_client.chat_completion(
+                self.model_name,
+                self.prepare_messages(prompt),
+                max_tokens=max_tokens,
                 n=1,
                 stop=None,
                 temperature=0.7,
             )
-            return response.choices[0].message['content'].strip()
+            return chat_completion_text(response)
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {str(e)}")
             raise
 
-    def parse_generated_content(self, content: str, platform: str) -> dict:
+    def parse_generated_content(self, content: str, platform: str, prompt: str = None) -> dict:
         """
-        Parses and validates the generated content to ensure it meets the required format.
+        Parses and validates the generated content, repairing it where possible.
+
+        JSON defects such as markdown fences, trailing commas or a truncated response are
+        repaired, and hashtags are coerced into a list of HASHTAG_COUNT tags. When the
+        prompt is given, fields that are still missing are requested on their own rather
+        than regenerating everything. Each response saved this way is counted as an
+        avoided regeneration.
 
         Args:
             content (str): The generated content from OpenAI API.
             platform (str): The social media platform for which the content was generated.
+            prompt (str): The prompt the content was generated from, used to request missing fields.
 
         Returns:
             dict: Parsed and validated content.
         """
         try:
-            parsed_content = json.loads(content)
-            required_keys = ["headline", "main_content", "hashtags", "cta"]
-            
-            if not all(key in parsed_content for key in required_keys):
-                raise ValueError("Generated content is missing required keys")
-
-            # Validate content length
-            if len(parsed_content["headline"]) > 100:
-                parsed_content["headline"] = parsed_content["headline"][:97] + "..."
-
-            if platform.lower() == "twitter":
-                if len(parsed_content["main_content"]) > 280:
-                    parsed_content["main_content"] = parsed_content["main_content"][:277] + "..."
-            elif len(parsed_content["main_content"]) > 2200:
-                parsed_content["main_content"] = parsed_content["main_content"][:2197] + "..."
-
-            if not isinstance(parsed_content["hashtags"], list) or len(parsed_content["hashtags"]) != 3:
-                raise ValueError("Generated content should contain exactly 3 hashtags")
-
-            return parsed_content
-
-        except json.JSONDecodeError:
-            logger.error("Failed to parse generated content as JSON")
-            raise ValueError("Generated content is not in valid JSON format")
+            parsed_content, repaired = loads_lenient(content)
+            if not isinstance(parsed_content, dict):
+                raise ValueError("Generated content is not a JSON object")
+            parsed_content, normalized = self.normalize_platform_content(parsed_content)
+            missing = [key for key in REQUIRED_KEYS if not parsed_content.get(key)]
+            if missing and prompt:
+                parsed_content.update(self.request_missing_fields(prompt, parsed_content, missing))
+            parsed_content = self.validate_platform_content(parsed_content, platform)
+
         except Exception as e:
             logger.error(f"Error parsing generated content: {str(e)}")
             raise
 
-# TODO: Implement rate limiting and error handling for OpenAI API calls
+        if repaired:
+            record_repair_stat("repaired_responses")
+        if repaired or normalized or missing:
+            record_repair_stat("avoided_regenerations")
+        return parsed_content
+
+    def parse_multi_platform_content(self, content: str, platforms: List[str]) -> Dict[str, dict]:
+        """
+        Parses a multi-platform response, validating each platform section independently.
+
+        The response is repaired like in parse_generated_content; sections that are still
+        invalid are left out so that they can be regenerated on their own.
+
+        Args:
+            content (str): The generated content from OpenAI API.
+            platforms (List[str]): The platforms that were requested.
+
+        Returns:
+            Dict[str, dict]: Validated content for each platform whose section is valid.
+        """
+        try:
+            parsed_content, repaired = loads_lenient(content)
+        except ValueError:
+            logger.error("Failed to parse multi-platform content as JSON")
+            return {}
+        if not isinstance(parsed_content, dict):
+            logger.error("Multi-platform content is not a JSON object")
+            return {}
+        if repaired:
+            record_repair_stat("repaired_responses")
+
+        sections = {key.lower(): value for key, value in parsed_content.items()}
+        valid = {}
+        for platform in platforms:
+            try:
+                section, normalized = self.normalize_platform_content(sections[platform.lower()])
+                valid[platform] = self.validate_platform_content(section, platform)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Invalid {platform} section in multi-platform content: {str(e)}")
+                continue
+            if repaired or normalized:
+                record_repair_stat("avoided_regenerations")
+        return valid
+
+    def normalize_platform_content(self, parsed_content: dict) -> Tuple[dict, bool]:
+        """
+        Normalizes the keys and hashtags of the content generated for one platform.
+
+        Args:
+            parsed_content (dict): The content generated for the platform.
+
+        Returns:
+            Tuple[dict, bool]: The normalized content, and whether anything had to change.
+        """
+        if not isinstance(parsed_content, dict):
+            raise TypeError("Generated content is not a JSON object")
+        normalized = {key.lower(): value for key, value in parsed_content.items()}
+        if normalized.get("hashtags"):
+            normalized["hashtags"] = normalize_hashtags(normalized["hashtags"])
+        return normalized, normalized != parsed_content
+
+    def request_missing_fields(self, prompt: str, parsed_content: dict, missing: List[str]) -> dict:
+        """
+        Requests only the fields missing from otherwise usable generated content.
+
+        Args:
+            prompt (str): The prompt the content was generated from.
+            parsed_content (dict): The fields that were generated.
+            missing (List[str]): The keys to request.
+
+        Returns:
+            dict: The requested fields that came back.
+        """
+        followup = f"""{prompt}
+
+        A previous response was incomplete. It contained:
+        {json.dumps(parsed_content)}
+
+        Generate only the missing fields: {", ".join(missing)}.
+        Format the response as a JSON object with exactly these keys: {", ".join(missing)}.
+        """
+        record_repair_stat("fields_requested", len(missing))
+        fields, _ = loads_lenient(self.call_openai_api(
+            followup, max_tokens=min(MAX_TOKENS_PER_PLATFORM, MAX_TOKENS_PER_FIELD * len(missing))
+        ))
+        fields, _ = self.normalize_platform_content(fields)
+        return {key: fields[key] for key in missing if fields.get(key)}
+
+    def validate_platform_content(self, parsed_content: dict, platform: str) -> dict:
+        """
+        Validates the content generated for one platform, truncating over-long text.
+
+        Args:
+            parsed_content (dict): The content generated for the platform.
+            platform (str): The social media platform for which the content was generated.
+
+        Returns:
+            dict: Validated content.
+        """
+        if not isinstance(parsed_content, dict) or not all(key in parsed_content for key in REQUIRED_KEYS):
+            raise ValueError("Generated content is missing required keys")
+
+        # Validate content length
+        if len(parsed_content["headline"]) > HEADLINE_MAX_CHARS:
+            parsed_content["headline"] = parsed_content["headline"][:HEADLINE_MAX_CHARS - 3] + "..."
+
+        max_chars = PLATFORM_MAX_CHARS.get(platform.lower(), DEFAULT_MAX_CHARS)
+        if len(parsed_content["main_content"]) > max_chars:
+            parsed_content["main_content"] = parsed_content["main_content"][:max_chars - 3] + "..."
+
+        if not isinstance(parsed_content["hashtags"], list) or len(parsed_content["hashtags"]) != HASHTAG_COUNT:
+            raise ValueError("Generated content should contain exactly 3 hashtags")
+
+        return parsed_content
+
 # TODO: Add unit tests for ContentGenerationService methods
-# TODO: Implement caching mechanism for generated content to reduce API calls
 # TODO: Add support for multiple language content generation
\ No newline at end of file
@@ -0,0 +1,285 @@
+import abc
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def generation_cache_key(title: str, description: str, transcript_content: str, platform: str,
+                         model: str, prompt_version: str) -> str:
+    """
+    Computes the cache key of a generation request.
+
+    Any change to the episode text, the transcript, the model or the prompt template
+    produces a different key, so stale results are never served.
+
+    Args:
+        title (str): Episode title.
+        description (str): Episode description.
+        transcript_content (str): Full transcript text, hashed into a digest.
+        platform (str): Target social media platform.
+        model (str): Name of the generation model.
+        prompt_version (str): Version of the prompt templates, including how the episode brief is built.
+
+    Returns:
+        str: Hex-encoded SHA-256 digest.
+    """
+    transcript_digest = hashlib.sha256((transcript_content or '').encode('utf-8')).hexdigest()
+    payload = json.dumps(
+        {
+            'title': title,
+            'description': description,
+            'transcript': transcript_digest,
+            'platform': platform.lower(),
+            'model': model,
+            'prompt_version': prompt_version,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class GenerationCache(abc.ABC):
+    """
+    A time-limited, least-recently-used cache of validated generation results.
+
+    Entries expire timeout seconds after they were last used.
+    """
+
+    name: str
+
+    def __init__(self, timeout: Optional[int] = None, max_entries: Optional[int] = None):
+        """
+        Initializes the cache.
+
+        Args:
+            timeout (Optional[int]): Seconds an entry is kept, defaults to settings.GENERATION_CACHE_TIMEOUT.
+            max_entries (Optional[int]): Number of entries kept, defaults to settings.GENERATION_CACHE_MAX_ENTRIES.
+        """
+        self.timeout = timeout if timeout is not None else settings.GENERATION_CACHE_TIMEOUT
+        self.max_entries = max_entries if max_entries is not None else settings.GENERATION_CACHE_MAX_ENTRIES
+
+    @abc.abstractmethod
+    def get_many(self, cache_keys: Iterable[str]) -> Dict[str, dict]:
+        """
+        Looks up cached results and marks them as recently used.
+
+        Args:
+            cache_keys (Iterable[str]): Keys computed by generation_cache_key.
+
+        Returns:
+            Dict[str, dict]: Cached content by key, for the keys that were found.
+        """
+
+    @abc.abstractmethod
+    def set_many(self, results: Dict[str, dict]) -> None:
+        """
+        Stores results, evicting least-recently-used entries beyond max_entries.
+
+        Args:
+            results (Dict[str, dict]): Validated content by key.
+        """
+
+    @abc.abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss counters and the number of entries.
+
+        Returns:
+            Dict[str, Any]: 'backend', 'hits', 'misses', 'hit_rate' and 'entries'.
+        """
+
+    def get(self, cache_key: str) -> Optional[dict]:
+        return self.get_many([cache_key]).get(cache_key)
+
+    def set(self, cache_key: str, content: dict) -> None:
+        self.set_many({cache_key: content})
+
+    def _stats(self, hits: int, misses: int, entries: int) -> Dict[str, Any]:
+        lookups = hits + misses
+        return {
+            'backend': self.name,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': entries,
+        }
+
+
+class RedisGenerationCache(GenerationCache):
+    """
+    Generation cache shared by all workers.
+
+    Entries expire through Redis TTLs, renewed on every hit. Recency is tracked in a
+    sorted set scored by last access time, so a member scored more than timeout seconds
+    ago belongs to an expired entry; those are dropped before the set is counted or
+    trimmed to max_entries. Hit and miss counters are kept in Redis as well, so the hit
+    rate covers the whole cluster.
+    """
+
+    name = 'redis'
+    prefix = 'generation-cache'
+
+    def __init__(self, timeout=None, max_entries=None, url: Optional[str] = None, client=None):
+        """
+        Initializes the cache.
+
+        Args:
+            timeout (Optional[int]): Seconds an entry is kept.
+            max_entries (Optional[int]): Number of entries kept.
+            url (str): Redis URL, defaults to settings.REDIS_URL
+            client (redis.Redis): Client to reuse, created from url when omitted
+        """
+        import redis
+
+        super().__init__(timeout, max_entries)
+        self.client = client or redis.Redis.from_url(url or settings.REDIS_URL)
+        self.recency_key = f"{self.prefix}:recency"
+        self.stats_key = f"{self.prefix}:stats"
+
+    def _key(self, cache_key):
+        return f"{self.prefix}:{cache_key}"
+
+    def get_many(self, cache_keys):
+        cache_keys = list(dict.fromkeys(cache_keys))
+        if not cache_keys:
+            return {}
+        payloads = self.client.mget([self._key(cache_key) for cache_key in cache_keys])
+        found = {cache_key: json.loads(payload) for cache_key, payload in zip(cache_keys, payloads) if payload}
+
+        missing = [cache_key for cache_key in cache_keys if cache_key not in found]
+        now = time.time()
+        with self.client.pipeline() as pipe:
+            if found:
+                for cache_key in found:
+                    pipe.expire(self._key(cache_key), self.timeout)
+                pipe.zadd(self.recency_key, {cache_key: now for cache_key in found})
+                pipe.hincrby(self.stats_key, 'hits', len(found))
+            if missing:
+                pipe.zrem(self.recency_key, *missing)
+                pipe.hincrby(self.stats_key, 'misses', len(missing))
+            pipe.execute()
+        return found
+
+    def set_many(self, results):
+        if not results:
+            return
+        now = time.time()
+        with self.client.pipeline() as pipe:
+            for cache_key, content in results.items():
+                pipe.set(self._key(cache_key), json.dumps(content), ex=self.timeout)
+            pipe.zadd(self.recency_key, {cache_key: now for cache_key in results})
+            # Forget entries whose TTL has already removed them
+            pipe.zremrangebyscore(self.recency_key, '-inf', now - self.timeout)
+            pipe.zcard(self.recency_key)
+            size = pipe.execute()[-1]
+        if size > self.max_entries:
+            self.evict(size - self.max_entries)
+
+    def evict(self, count: int) -> int:
+        """
+        Deletes the least-recently-used entries.
+
+        Args:
+            count (int): Number of entries to delete.
+
+        Returns:
+            int: Number of entries evicted.
+        """
+        stale = [member.decode() if isinstance(member, bytes) else member
+                 for member, _ in self.client.zpopmin(self.recency_key, count)]
+        if stale:
+            self.client.delete(*[self._key(cache_key) for cache_key in stale])
+            logger.info(f"Evicted {len(stale)} generation cache entries")
+        return len(stale)
+
+    def stats(self):
+        with self.client.pipeline() as pipe:
+            pipe.hgetall(self.stats_key)
+            pipe.zremrangebyscore(self.recency_key, '-inf', time.time() - self.timeout)
+            pipe.zcard(self.recency_key)
+            counters, _, entries = pipe.execute()
+        return self._stats(int(counters.get(b'hits', 0)), int(counters.get(b'misses', 0)), entries)
+
+
+class InMemoryGenerationCache(GenerationCache):
+    """Per-process generation cache for development and tests"""
+
+    name = 'memory'
+
+    def __init__(self, timeout=None, max_entries=None):
+        super().__init__(timeout, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, cache_keys):
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for cache_key in dict.fromkeys(cache_keys):
+                entry = self._entries.get(cache_key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[cache_key]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self._entries[cache_key] = (now + self.timeout, entry[1])
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                found[cache_key] = json.loads(entry[1])
+        return found
+
+    def set_many(self, results):
+        expires_at = time.monotonic() + self.timeout
+        with self._lock:
+            for cache_key, content in results.items():
+                # Stored serialized so callers never share mutable results
+                self._entries[cache_key] = (expires_at, json.dumps(content))
+                self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            # Recency order is expiry order, as every use renews the timeout
+            while self._entries and next(iter(self._entries.values()))[0] <= now:
+                self._entries.popitem(last=False)
+            return self._stats(self.hits, self.misses, len(self._entries))
+
+
+GENERATION_CACHES = {
+    RedisGenerationCache.name: RedisGenerationCache,
+    InMemoryGenerationCache.name: InMemoryGenerationCache,
+}
+
+_generation_cache = None
+_generation_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> GenerationCache:
+    """
+    Returns the process-wide generation cache selected by settings.GENERATION_CACHE_BACKEND.
+
+    Returns:
+        GenerationCache: The shared cache.
+    """
+    global _generation_cache
+    with _generation_cache_lock:
+        if _generation_cache is None:
+            try:
+                cache_class = GENERATION_CACHES[settings.GENERATION_CACHE_BACKEND]
+            except KeyError:
+                raise ValueError(f"Unknown generation cache backend: {settings.GENERATION_CACHE_BACKEND}")
+            _generation_cache = cache_class()
+        return _generation_cache
@@ -0,0 +1,125 @@
+import json
+import re
+from typing import Any, List, Tuple
+
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+CLOSERS = {'{': '}', '[': ']'}
+
+
+def extract_json_text(text: str) -> str:
+    """
+    Extracts the JSON document from a model response.
+
+    Models often wrap JSON in markdown fences or add a sentence around it. The fenced
+    block is used when there is one. The first complete JSON value starting at a brace
+    or bracket is then returned without the text after it; when none decodes, e.g. in a
+    truncated response, the text from the first brace or bracket is returned for repair.
+
+    Args:
+        text (str): The raw response text.
+
+    Returns:
+        str: The text of the JSON document.
+    """
+    fenced = FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = sorted(index for index in (text.find('{'), text.find('[')) if index >= 0)
+    decoder = json.JSONDecoder()
+    for start in starts:
+        try:
+            _, end = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            continue
+        return text[start:end]
+    return text[starts[0]:].strip() if starts else text.strip()
+
+
+def _scan(text: str) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Rewrites a JSON document without trailing commas and closes whatever is left open.
+
+    Args:
+        text (str): The JSON text, possibly truncated.
+
+    Returns:
+        Tuple[str, List[Tuple[int, str]]]: The closed document, and for each comma between
+        values, its offset in the rewritten text with the closers needed at that point.
+    """
+    output = []
+    stack = []
+    commas = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            output.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char in '}]':
+            # Drop a trailing comma before the closer
+            while output and output[-1].isspace():
+                output.pop()
+            if output and output[-1] == ',':
+                output.pop()
+                commas.pop()
+            if stack:
+                stack.pop()
+        elif char in '{[':
+            stack.append(CLOSERS[char])
+        elif char == ',':
+            commas.append((len(output), ''.join(reversed(stack))))
+        elif char == '"':
+            in_string = True
+        output.append(char)
+
+    if escaped:
+        output.pop()
+    if in_string:
+        output.append('"')
+    return ''.join(output).rstrip().rstrip(',') + ''.join(reversed(stack)), commas
+
+
+def loads_lenient(text: str) -> Tuple[Any, bool]:
+    """
+    Parses JSON produced by a model, repairing the usual defects.
+
+    Markdown fences and surrounding prose are stripped, and a document that is valid on
+    its own is used as it is. Otherwise trailing commas are removed and a truncated
+    document is closed: an unterminated string is ended and open objects and
+    arrays are closed. When the cut fell inside a key or between a key and its value,
+    the incomplete member is dropped.
+
+    Args:
+        text (str): The raw response text.
+
+    Returns:
+        Tuple[Any, bool]: The parsed value, and whether it needed any repair.
+
+    Raises:
+        ValueError: If no repair yields valid JSON.
+    """
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+
+    document = extract_json_text(text)
+    try:
+        return json.loads(document), True
+    except json.JSONDecodeError:
+        pass
+
+    closed, commas = _scan(document)
+    candidates = [closed] + [closed[:offset] + closers for offset, closers in reversed(commas)]
+    for candidate in candidates:
+        try:
+            return json.loads(candidate), True
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Generated content is not in valid JSON format")
@@ -0,0 +1,270 @@
+import abc
+import itertools
+import random
+import time
+import zlib
+from typing import Any, Dict, Iterable, List
+
+# Global constants
+LANGUAGE_CODE = "en-US"
+SAMPLE_WIDTH_BYTES = 2  # LINEAR16
+STREAMING_WINDOW_SECONDS = 290  # Google ends a streaming request after about five minutes of audio
+
+# Vocabulary the local engine draws its synthetic words from
+LOCAL_VOCABULARY = [
+    "podcast", "episode", "today", "we", "talk", "about", "marketing", "audience", "growth",
+    "content", "guest", "story", "listen", "show", "the", "and", "with", "our", "new", "week",
+]
+
+
+class RecognizerBackend(abc.ABC):
+    """Speech recognition engine used by the transcription services"""
+
+    name: str
+
+    @abc.abstractmethod
+    def recognize(self, audio_content: bytes, sample_rate: int) -> List[Dict[str, Any]]:
+        """
+        Recognizes in-memory LINEAR16 mono audio
+
+        Args:
+            audio_content (bytes): Raw LINEAR16 mono PCM
+            sample_rate (int): Sample rate of the audio
+
+        Returns:
+            list: Word dicts with 'word', 'start_time', 'end_time' and 'confidence',
+                times relative to the start of the audio
+        """
+
+    def recognize_stream(self, chunks: Iterable[bytes], sample_rate: int) -> List[Dict[str, Any]]:
+        """
+        Recognizes audio delivered as a stream of chunks
+
+        The default implementation buffers the stream; engines with native streaming
+        support override it to keep memory bounded.
+
+        Args:
+            chunks (Iterable[bytes]): Raw LINEAR16 mono PCM, in order
+            sample_rate (int): Sample rate of the audio
+
+        Returns:
+            list: Word dicts as returned by recognize
+        """
+        return self.recognize(b''.join(chunks), sample_rate)
+
+
+class GoogleSpeechRecognizer(RecognizerBackend):
+    """Recognizes LINEAR16 audio with Google Cloud Speech-to-Text"""
+
+    name = "google"
+
+    def __init__(self, client=None, language_code: str = LANGUAGE_CODE, model: str = "default", timeout: float = 90):
+        """
+        Initializes the recognizer
+
+        Args:
+            client (speech.SpeechClient): Client to reuse, created when omitted
+            language_code (str): Language of the audio
+            model (str): Recognition model
+            timeout (float): Seconds to wait for a single synchronous request
+        """
+        # Imported here so the local engine can run without Google Cloud libraries installed
+        from google.cloud import speech
+
+        self.speech = speech
+        self.client = client or speech.SpeechClient()
+        self.language_code = language_code
+        self.model = model
+        self.timeout = timeout
+
+    def _config(self, sample_rate: int):
+        return self.speech.RecognitionConfig(
+            encoding=self.speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=sample_rate,
+            language_code=self.language_code,
+            model=self.model,
+            enable_word_time_offsets=True,
+        )
+
+    @staticmethod
+    def _words(results, offset: float = 0.0) -> List[Dict[str, Any]]:
+        words = []
+        for result in results:
+            alternative = result.alternatives[0]
+            for word_info in alternative.words:
+                words.append({
+                    "word": word_info.word,
+                    "start_time": offset + word_info.start_time.total_seconds(),
+                    "end_time": offset + word_info.end_time.total_seconds(),
+                    "confidence": alternative.confidence,
+                })
+        return words
+
+    def recognize(self, audio_content: bytes, sample_rate: int) -> List[Dict[str, Any]]:
+        """
+        Recognizes a segment of audio of at most one minute
+
+        Args:
+            audio_content (bytes): Raw LINEAR16 mono PCM
+            sample_rate (int): Sample rate of the audio
+
+        Returns:
+            list: Word dicts with times relative to the start of the segment
+        """
+        response = self.client.recognize(
+            config=self._config(sample_rate),
+            audio=self.speech.RecognitionAudio(content=audio_content),
+            timeout=self.timeout,
+        )
+        return self._words(response.results)
+
+    def recognize_stream(self, chunks: Iterable[bytes], sample_rate: int, request_bytes: int = 16 * 1024,
+                         window_seconds: float = STREAMING_WINDOW_SECONDS) -> List[Dict[str, Any]]:
+        """
+        Recognizes a stream of audio with streaming recognition
+
+        Streaming requests are limited to about five minutes of audio, so a new stream
+        is opened for every window_seconds of audio and the word times of each window
+        are offset by its start.
+
+        Args:
+            chunks (Iterable[bytes]): Raw LINEAR16 mono PCM, in order
+            sample_rate (int): Sample rate of the audio
+            request_bytes (int): Audio bytes per streaming request
+            window_seconds (float): Seconds of audio sent in one stream
+
+        Returns:
+            list: Word dicts with times relative to the start of the stream
+        """
+        bytes_per_second = sample_rate * SAMPLE_WIDTH_BYTES
+        requests_per_window = max(1, int(window_seconds * bytes_per_second) // request_bytes)
+        pieces = self._pieces(chunks, request_bytes)
+        config = self.speech.StreamingRecognitionConfig(config=self._config(sample_rate))
+
+        words = []
+        offset = 0.0
+        for first in pieces:
+            window = itertools.chain([first], itertools.islice(pieces, requests_per_window - 1))
+            responses = self.client.streaming_recognize(
+                config=config,
+                requests=(self.speech.StreamingRecognizeRequest(audio_content=piece) for piece in window),
+            )
+            for response in responses:
+                words.extend(self._words((result for result in response.results if result.is_final), offset))
+            offset += requests_per_window * request_bytes / bytes_per_second
+        return words
+
+    @staticmethod
+    def _pieces(chunks: Iterable[bytes], size: int) -> Iterable[bytes]:
+        """Re-cuts a stream of chunks into pieces of exactly size bytes, but for the last"""
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk
+            while len(buffer) >= size:
+                yield bytes(buffer[:size])
+                del buffer[:size]
+        if buffer:
+            yield bytes(buffer)
+
+
+class LocalRecognizer(RecognizerBackend):
+    """
+    Deterministic offline engine for tests and benchmarks
+
+    Emits synthetic words at a fixed speaking rate and spends latency plus
+    real_time_factor times the audio duration per call, so pipelines behave as
+    they would against a remote engine without needing one.
+    """
+
+    name = "local"
+
+    def __init__(self, real_time_factor: float = 0.0, latency: float = 0.0,
+                 words_per_second: float = 2.5, seed: int = 0):
+        """
+        Initializes the engine
+
+        Args:
+            real_time_factor (float): Processing seconds spent per second of audio
+            latency (float): Fixed seconds spent per call, like a network round trip
+            words_per_second (float): Speaking rate of the synthetic words
+            seed (int): Seed mixed with the audio bytes so identical audio yields identical words
+        """
+        if real_time_factor < 0 or latency < 0 or words_per_second <= 0:
+            raise ValueError("Invalid local recognizer parameters")
+        self.real_time_factor = real_time_factor
+        self.latency = latency
+        self.words_per_second = words_per_second
+        self.seed = seed
+
+    def recognize(self, audio_content: bytes, sample_rate: int) -> List[Dict[str, Any]]:
+        """
+        Produces synthetic words for in-memory audio
+
+        Args:
+            audio_content (bytes): Raw LINEAR16 mono PCM
+            sample_rate (int): Sample rate of the audio
+
+        Returns:
+            list: Word dicts with times relative to the start of the audio
+        """
+        return self.recognize_stream([audio_content], sample_rate)
+
+    def recognize_stream(self, chunks: Iterable[bytes], sample_rate: int) -> List[Dict[str, Any]]:
+        """
+        Produces synthetic words while consuming the stream chunk by chunk
+
+        Args:
+            chunks (Iterable[bytes]): Raw LINEAR16 mono PCM, in order
+            sample_rate (int): Sample rate of the audio
+
+        Returns:
+            list: Word dicts with times relative to the start of the stream
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+        total_bytes = 0
+        checksum = 0
+        for chunk in chunks:
+            total_bytes += len(chunk)
+            checksum = zlib.crc32(chunk, checksum)
+            if self.real_time_factor:
+                time.sleep(len(chunk) / (sample_rate * SAMPLE_WIDTH_BYTES) * self.real_time_factor)
+
+        duration = total_bytes / (sample_rate * SAMPLE_WIDTH_BYTES)
+        rng = random.Random(self.seed ^ checksum ^ total_bytes)
+        interval = 1.0 / self.words_per_second
+        words = []
+        for i in range(int(duration * self.words_per_second)):
+            start_time = i * interval
+            words.append({
+                "word": rng.choice(LOCAL_VOCABULARY),
+                "start_time": round(start_time, 3),
+                "end_time": round(start_time + interval * 0.8, 3),
+                "confidence": round(0.85 + rng.random() * 0.14, 3),
+            })
+        return words
+
+
+RECOGNIZER_BACKENDS = {
+    GoogleSpeechRecognizer.name: GoogleSpeechRecognizer,
+    LocalRecognizer.name: LocalRecognizer,
+}
+
+
+def get_recognizer(name: str, **options) -> RecognizerBackend:
+    """
+    Instantiates a recognizer backend by name
+
+    Args:
+        name (str): Registered backend name, e.g. 'google' or 'local'
+        **options: Keyword arguments for the backend constructor
+
+    Returns:
+        RecognizerBackend: The configured backend
+    """
+    try:
+        backend_class = RECOGNIZER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown recognizer backend: {name}")
+    return backend_class(**options)
@@ -242,7 +242,9 @@ class SocialMediaIntegrationService:
         pass
 
 # TODO: Implement proper error handling and logging for each social media platform integration
-# TODO: Add rate limiting and retry logic for API calls to prevent exceeding platform limits
+# TODO: Add retry logic for API calls to each platform
+# Note: calls made by this service are deliberately not rate limited; only posts published through the
+# backend's social publishing service go through its SocialRateLimiter
 # TODO: Implement refresh token logic for platforms that require it
 # TODO: Add unit tests for each method in the SocialMediaIntegrationService class
 # TODO: Implement a method to refresh all social media platform tokens periodically
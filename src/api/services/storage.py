@@ -2,6 +2,9 @@ import boto3
 from botocore.exceptions import ClientError
 from src.api.config import settings
 
+# Size of each ranged GET when streaming objects
+STREAM_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
 class StorageService:
     """Service class for managing storage operations with Amazon S3"""
 
@@ -57,6 +60,36 @@ class StorageService:
             # Log the error here
             raise
 
+    def iter_file_chunks(self, file_name, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Stream a file from S3 bucket as a sequence of ranged GETs
+
+        Only one chunk is held in memory at a time, regardless of the object size.
+
+        Args:
+            file_name (str): The name of the file in S3, or its bucket URL
+            chunk_size (int): Number of bytes requested per ranged GET
+
+        Yields:
+            bytes: Consecutive chunks of the file content
+
+        Raises:
+            ClientError: If an error occurs during download
+        """
+        prefix = f"https://{self.bucket_name}.s3.amazonaws.com/"
+        if file_name.startswith(prefix):
+            file_name = file_name[len(prefix):]
+
+        size = self.s3_client.head_object(Bucket=self.bucket_name, Key=file_name)['ContentLength']
+        for start in range(0, size, chunk_size):
+            end = min(start + chunk_size, size) - 1
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=file_name,
+                Range=f"bytes={start}-{end}"
+            )
+            yield response['Body'].read()
+
     def delete_file(self, file_name):
         """
         Delete a file from S3 bucket
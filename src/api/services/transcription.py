@@ -1,38 +1,48 @@
 import logging
-from google.cloud import speech
-from google.cloud.speech import RecognitionAudio, RecognitionConfig
+import tempfile
 from celery import shared_task
+from django.conf import settings
 from typing import Optional
 
 # Assuming these imports are correct based on the provided structure
 from src.api.apps.episodes.models import Episode
 from src.api.apps.transcripts.models import Transcript
-from src.api.services.storage import StorageService
+from src.api.services.recognizers import RecognizerBackend, get_recognizer
+from src.api.services.storage import STREAM_CHUNK_SIZE, StorageService
+from src.api.services.transcription_cache import AudioDigest, TranscriptionResultCache, transcription_result_cache
 
 # Global constants
 SAMPLE_RATE_HERTZ = 16000
 LANGUAGE_CODE = "en-US"
+RECOGNITION_MODEL = "default"
+SPOOL_MAX_BYTES = 32 * 1024 * 1024  # Downloaded audio spills to disk beyond this size
 
 logger = logging.getLogger(__name__)
 
 class TranscriptionService:
     """
-    A service class for handling podcast episode transcription using Google Cloud Speech-to-Text API.
+    A service class for handling podcast episode transcription through a pluggable recognizer backend.
     """
 
-    def __init__(self, storage_service: StorageService):
+    def __init__(self, storage_service: StorageService, result_cache: Optional[TranscriptionResultCache] = None,
+                 recognizer: Optional[RecognizerBackend] = None):
         """
         Initializes the TranscriptionService with necessary dependencies.
 
         Args:
             storage_service (StorageService): An instance of the StorageService for handling file storage.
+            result_cache (Optional[TranscriptionResultCache]): Cache of recognizer results, defaults to the shared process cache.
+            recognizer (Optional[RecognizerBackend]): Recognition engine, defaults to the backend named by settings.TRANSCRIPTION_RECOGNIZER.
         """
         self.storage_service = storage_service
-        self.speech_client = speech.SpeechClient()
+        self.result_cache = result_cache or transcription_result_cache
+        self.recognizer = recognizer or get_recognizer(
+            settings.TRANSCRIPTION_RECOGNIZER, **settings.TRANSCRIPTION_RECOGNIZER_OPTIONS
+        )
 
     def transcribe_episode(self, episode: Episode) -> Optional[Transcript]:
         """
-        Transcribes a given podcast episode using Google Cloud Speech-to-Text API.
+        Transcribes a given podcast episode with the configured recognizer backend.
 
         Args:
             episode (Episode): The episode to be transcribed.
@@ -41,30 +51,43 @@ class TranscriptionService:
             Optional[Transcript]: The generated transcript object, or None if transcription fails.
         """
         try:
-            # Retrieve audio file from storage service
-            audio_file = self.storage_service.get_file(episode.audio_file_url)
-
-            # Configure recognition settings
-            config = RecognitionConfig(
-                encoding=RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=SAMPLE_RATE_HERTZ,
-                language_code=LANGUAGE_CODE,
-            )
-
-            # Send audio for transcription
-            audio = RecognitionAudio(content=audio_file.read())
-            response = self.speech_client.recognize(config=config, audio=audio)
-
-            # Process and format the transcription result
-            transcript_text = ""
-            for result in response.results:
-                transcript_text += result.alternatives[0].transcript + " "
+            # Audio is read from storage once, in ranged chunks, and hashed as it arrives.
+            # Identical audio transcribed by the same engine with identical settings reuses the earlier result.
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as audio:
+                digest = AudioDigest(SAMPLE_RATE_HERTZ, LANGUAGE_CODE, f"{self.recognizer.name}/{RECOGNITION_MODEL}")
+                for chunk in self.storage_service.iter_file_chunks(episode.audio_file_url):
+                    digest.update(chunk)
+                    audio.write(chunk)
+                cache_key = digest.hexdigest()
+
+                cached = self.result_cache.get(cache_key)
+                if cached:
+                    logger.info(f"Reusing cached transcription {cache_key[:12]} for episode {episode.id}")
+                    transcript = Transcript.objects.create(episode=episode, status='completed', **cached)
+                    transcript.build_segments()
+                    return transcript
+
+                # On a miss the recognizer streams the local copy rather than downloading the audio again
+                audio.seek(0)
+                timestamps = self.recognizer.recognize_stream(
+                    iter(lambda: audio.read(STREAM_CHUNK_SIZE), b""),
+                    SAMPLE_RATE_HERTZ,
+                )
+            transcript_text = " ".join(word["word"] for word in timestamps)
+            confidence = sum(word["confidence"] for word in timestamps) / len(timestamps) if timestamps else 0.0
+
+            self.result_cache.set(cache_key, transcript_text.strip(), LANGUAGE_CODE, confidence, timestamps)
 
             # Create and save Transcript object
             transcript = Transcript.objects.create(
                 episode=episode,
-                content=transcript_text.strip()
+                content=transcript_text.strip(),
+                language=LANGUAGE_CODE,
+                confidence_score=confidence,
+                timestamps=timestamps,
+                status='completed'
             )
+            transcript.build_segments()
 
             return transcript
 
@@ -100,6 +123,8 @@ class TranscriptionService:
         """
         Updates the transcript for a given episode.
 
+        Only the segments whose text differs from the new content are written.
+
         Args:
             episode (Episode): The episode whose transcript needs to be updated.
             new_content (str): The new content for the transcript.
@@ -115,9 +140,8 @@ class TranscriptionService:
                 logger.warning(f"No transcript found for episode {episode.id}")
                 return None
 
-            # Update transcript content
-            transcript.content = new_content
-            transcript.save()
+            # Update only the segments touched by the edit
+            transcript.replace_content(new_content)
 
             return transcript
 
@@ -145,4 +169,3 @@ def transcribe_episode_task(episode_id: int):
 
 # TODO: Implement error handling for API rate limits and quotas
 # TODO: Add support for multiple languages in transcription
-# TODO: Implement caching mechanism for frequently accessed transcripts
\ No newline at end of file
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, BinaryIO, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from src.api.apps.transcripts.models import TranscriptionCacheEntry
+from src.api.apps.transcripts.timestamps import pack_timestamps
+
+# Global constants
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+logger = logging.getLogger(__name__)
+
+
+class AudioDigest:
+    """
+    Incrementally hashes audio bytes together with the recognition config they are transcribed with.
+    """
+
+    def __init__(self, sample_rate_hertz: int, language_code: str, model: str):
+        """
+        Initializes the digest with the recognition config so that the same audio
+        transcribed with different settings never shares a cache entry.
+
+        Args:
+            sample_rate_hertz (int): Sample rate passed to the recognizer.
+            language_code (str): Language code passed to the recognizer.
+            model (str): Recognition model passed to the recognizer.
+        """
+        self._hash = hashlib.sha256()
+        config = json.dumps(
+            {"sample_rate_hertz": sample_rate_hertz, "language_code": language_code, "model": model},
+            sort_keys=True,
+        )
+        self._hash.update(config.encode("utf-8"))
+        self._hash.update(b"\x00")
+
+    def update(self, chunk: bytes) -> None:
+        """
+        Feeds the next chunk of audio bytes into the digest.
+
+        Args:
+            chunk (bytes): A chunk of the audio file.
+        """
+        self._hash.update(chunk)
+
+    def hexdigest(self) -> str:
+        """
+        Returns the cache key for the bytes hashed so far.
+
+        Returns:
+            str: Hex-encoded SHA-256 digest.
+        """
+        return self._hash.hexdigest()
+
+    @classmethod
+    def from_file(cls, audio_file: BinaryIO, sample_rate_hertz: int, language_code: str, model: str) -> str:
+        """
+        Computes the cache key of a file-like object without loading it into memory.
+
+        The file is rewound afterwards so it can still be sent to the recognizer.
+
+        Args:
+            audio_file (BinaryIO): The audio file to hash.
+            sample_rate_hertz (int): Sample rate passed to the recognizer.
+            language_code (str): Language code passed to the recognizer.
+            model (str): Recognition model passed to the recognizer.
+
+        Returns:
+            str: Hex-encoded SHA-256 digest.
+        """
+        digest = cls.from_chunks(iter(lambda: audio_file.read(HASH_CHUNK_SIZE), b""), sample_rate_hertz, language_code, model)
+        audio_file.seek(0)
+        return digest
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[bytes], sample_rate_hertz: int, language_code: str, model: str) -> str:
+        """
+        Computes the cache key of audio delivered as a stream of chunks.
+
+        Args:
+            chunks (Iterable[bytes]): The audio bytes, in order.
+            sample_rate_hertz (int): Sample rate passed to the recognizer.
+            language_code (str): Language code passed to the recognizer.
+            model (str): Recognition model passed to the recognizer.
+
+        Returns:
+            str: Hex-encoded SHA-256 digest.
+        """
+        digest = cls(sample_rate_hertz, language_code, model)
+        for chunk in chunks:
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class TranscriptionResultCache:
+    """
+    A size-bounded, least-recently-used cache of recognizer results backed by the database.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        Initializes the cache.
+
+        Args:
+            max_bytes (Optional[int]): Total size budget of all entries, defaults to settings.TRANSCRIPTION_CACHE_MAX_BYTES.
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else settings.TRANSCRIPTION_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a cached recognizer result and marks it as recently used.
+
+        Args:
+            cache_key (str): Digest of the audio and recognition config.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached 'content', 'language', 'confidence_score' and 'packed_timestamps', or None.
+        """
+        entry = TranscriptionCacheEntry.objects.filter(cache_key=cache_key).first()
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        TranscriptionCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F("hit_count") + 1,
+            last_accessed_at=timezone.now(),
+        )
+        return {
+            "content": entry.content,
+            "language": entry.language,
+            "confidence_score": entry.confidence_score,
+            "packed_timestamps": entry.packed_timestamps,
+        }
+
+    def set(self, cache_key: str, content: str, language: str, confidence_score: float, timestamps: list) -> None:
+        """
+        Stores a recognizer result, evicting least-recently-used entries beyond the size budget.
+
+        Args:
+            cache_key (str): Digest of the audio and recognition config.
+            content (str): Transcript text.
+            language (str): Language code of the transcript.
+            confidence_score (float): Average recognizer confidence.
+            timestamps (list): Word-level timestamps.
+        """
+        packed_timestamps = pack_timestamps(timestamps, content)
+        size_bytes = len(content.encode("utf-8")) + len(packed_timestamps)
+        if size_bytes > self.max_bytes:
+            logger.info(f"Transcription result {cache_key[:12]} exceeds the cache budget and was not cached")
+            return
+
+        TranscriptionCacheEntry.objects.update_or_create(
+            cache_key=cache_key,
+            defaults={
+                "content": content,
+                "language": language,
+                "confidence_score": confidence_score,
+                "packed_timestamps": packed_timestamps,
+                "size_bytes": size_bytes,
+                "last_accessed_at": timezone.now(),
+            },
+        )
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Deletes least-recently-used entries until the cache fits its size budget.
+
+        Returns:
+            int: Number of entries evicted.
+        """
+        with transaction.atomic():
+            total = TranscriptionCacheEntry.objects.aggregate(total=Sum("size_bytes"))["total"] or 0
+            if total <= self.max_bytes:
+                return 0
+
+            stale_ids = []
+            for entry_id, size_bytes in TranscriptionCacheEntry.objects.order_by("last_accessed_at").values_list("id", "size_bytes").iterator():
+                if total <= self.max_bytes:
+                    break
+                stale_ids.append(entry_id)
+                total -= size_bytes
+
+            TranscriptionCacheEntry.objects.filter(id__in=stale_ids).delete()
+
+        logger.info(f"Evicted {len(stale_ids)} transcription cache entries")
+        return len(stale_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss counters for this process and the current size of the cache.
+
+        Returns:
+            Dict[str, Any]: 'hits', 'misses', 'hit_rate', 'entries' and 'size_bytes'.
+        """
+        aggregate = TranscriptionCacheEntry.objects.aggregate(total=Sum("size_bytes"))
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": TranscriptionCacheEntry.objects.count(),
+            "size_bytes": aggregate["total"] or 0,
+        }
+
+
+# Shared per-process instance so hit/miss counters accumulate across service instances
+transcription_result_cache = TranscriptionResultCache()
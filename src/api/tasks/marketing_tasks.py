@@ -3,6 +3,7 @@ from celery import shared_task
 from typing import List, Dict
 from src.api.tasks.celery import app
 from src.api.services import content_generation, social_media_integration
+from src.backend.services.llm_client import LLMError
 from src.api.apps.episodes.models import Episode
 from src.api.apps.marketing.models import MarketingContent
 from src.api.apps.social_media.models import SocialMediaPost
@@ -25,20 +26,10 @@ def generate_marketing_content(self, episode_id: int, platforms: List[str]) -> D
         # Retrieve the episode from the database
         episode = Episode.objects.get(id=episode_id)
 
-        generated_content = {}
-        for platform in platforms:
-            # Generate marketing content using the content generation service
-            content = content_generation.generate_content(episode, platform)
-            
-            # Save the generated content to the MarketingContent model
-            marketing_content = MarketingContent.objects.create(
-                episode=episode,
-                platform=platform,
-                content=content,
-                status='generated'
-            )
-            
-            generated_content[platform] = content
+        # One structured request covers every platform, and the rows are inserted together
+        service = content_generation.ContentGenerationService()
+        marketing_contents = service.generate_marketing_contents(episode, platforms)
+        generated_content = {platform: marketing_content.content for platform, marketing_content in marketing_contents.items()}
 
         logger.info(f"Generated marketing content for episode {episode_id} on platforms: {', '.join(platforms)}")
         return generated_content
@@ -48,7 +39,9 @@ def generate_marketing_content(self, episode_id: int, platforms: List[str]) -> D
         raise self.retry(countdown=60 * 5, max_retries=3)
     except Exception as e:
         logger.error(f"Error generating marketing content for episode {episode_id}: {str(e)}")
-        raise self.retry(exc=e, countdown=60 * 5, max_retries=3)
+        # A rate-limited call can be retried as soon as the API allows it
+        countdown = e.retry_after if isinstance(e, LLMError) and e.retry_after else 60 * 5
+        raise self.retry(exc=e, countdown=countdown, max_retries=3)
 
 @app.task(bind=True, max_retries=3)
 def schedule_social_media_posts(self, marketing_content_id: int) -> Dict[str, Dict]:
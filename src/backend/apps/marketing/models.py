@@ -1,4 +1,5 @@
 from django.db import models
+from apps.authentication.models import User
 from apps.episodes.models import Episode
 
 class MarketingContent(models.Model):
@@ -25,6 +26,59 @@ class MarketingContent(models.Model):
         # TODO: Implement content generation using AI services
         pass
 
+class ContentGenerationBatch(models.Model):
+    """
+    Progress of a bulk back-catalog generation, kept as counters in a single row
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='content_generation_batches')
+    episode_ids = models.JSONField(help_text="Episode IDs in submission order")
+    platforms = models.JSONField()
+    batch_size = models.PositiveIntegerField(help_text="Maximum number of requests per batch job")
+    jobs = models.JSONField(default=dict, help_text="Request IDs of each submitted batch job not ingested yet")
+    jobs_total = models.PositiveIntegerField(default=0)
+    submitted = models.BooleanField(default=False, help_text="Whether every job of the batch has been submitted")
+    jobs_completed = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0, help_text="Requests for content that already existed")
+    failed = models.PositiveIntegerField(default=0)
+    failed_requests = models.JSONField(default=list, help_text="'episode_id:platform' of each failed request")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Content generation batch {self.id} ({self.get_status_display()})"
+
+    @property
+    def total(self):
+        return len(self.episode_ids) * len(self.platforms)
+
+    @property
+    def finished(self):
+        return self.succeeded + self.skipped + self.failed
+
+    def get_progress(self):
+        """
+        Returns the aggregate progress of the batch
+        """
+        return {
+            'batch_id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'jobs_total': self.jobs_total,
+            'jobs_completed': self.jobs_completed,
+            'succeeded': self.succeeded,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'failed_requests': self.failed_requests,
+            'percent_complete': round(100 * self.finished / self.total, 1) if self.total else 100.0,
+        }
+
 # Human Tasks:
 # TODO: Implement the generate_content method using the chosen AI service for content generation
 # TODO: Define specific status choices for marketing content (e.g., 'draft', 'approved', 'published')
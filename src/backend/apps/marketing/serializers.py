@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from apps.marketing.models import MarketingContent
+from apps.marketing.models import ContentGenerationBatch, MarketingContent
 
 class MarketingContentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -60,5 +60,30 @@ class MarketingContentListSerializer(serializers.ModelSerializer):
         model = MarketingContent
         fields = ['id', 'episode', 'platform', 'status', 'created_at', 'updated_at']
 
+class ContentGenerationBatchSerializer(serializers.ModelSerializer):
+    episode_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    platforms = serializers.ListField(
+        child=serializers.ChoiceField(choices=['twitter', 'facebook', 'linkedin', 'instagram']),
+        allow_empty=False,
+        required=False,
+    )
+    batch_size = serializers.IntegerField(min_value=1, required=False)
+
+    class Meta:
+        model = ContentGenerationBatch
+        fields = ['episode_ids', 'platforms', 'batch_size']
+
+    def validate_episode_ids(self, value):
+        """
+        Drops duplicate episode IDs, keeping submission order.
+        """
+        return list(dict.fromkeys(value))
+
+    def validate_platforms(self, value):
+        """
+        Drops duplicate platforms, keeping their order.
+        """
+        return list(dict.fromkeys(value))
+
 # TODO: Implement custom field for associated social media posts count
 # This can be added to the MarketingContentListSerializer or as a separate serializer method field
\ No newline at end of file
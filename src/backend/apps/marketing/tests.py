@@ -1,17 +1,27 @@
-from django.test import TestCase
-from rest_framework.test import APITestCase
+import time
+from django.conf import settings
+from django.test import TestCase, SimpleTestCase
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
 from rest_framework import status
 from django.urls import reverse
 from unittest.mock import patch
-from apps.marketing.models import MarketingContent
+from apps.marketing.models import ContentGenerationBatch, MarketingContent
 from apps.marketing.serializers import MarketingContentSerializer
 from apps.marketing.views import (
     MarketingContentListCreateView,
     MarketingContentDetailView,
     GenerateMarketingContentView,
+    ContentGenerationBatchViewSet,
 )
 from apps.episodes.models import Episode
 from apps.authentication.models import User
+from apps.podcasts.models import Podcast
+from benchmarks.fake_llm_server import FakeLLMServer
+from services.batch_generation import BatchContentGenerationService
+from services.content_generation import ContentGenerationService
+from services.llm_client import LLMClient, LLMError, chat_completion_text
+from services.llm_rate_limiter import InMemoryRateLimiter
+from tasks.marketing_tasks import generate_back_catalog_content, poll_content_generation_batch
 
 class MarketingContentModelTest(TestCase):
     def setUp(self):
@@ -172,6 +182,220 @@ class MarketingContentViewsTest(APITestCase):
         self.assertEqual(response.data['content'], 'Generated marketing content')
         mock_generate_content.assert_called_once()
 
+class LLMClientTest(SimpleTestCase):
+    def setUp(self):
+        self.server = FakeLLMServer(latency=0.2).__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+
+    def test_requests_run_concurrently_up_to_the_limit(self):
+        client = LLMClient('test', api_base=self.server.api_base, max_concurrency=4)
+        self.addCleanup(client.close)
+        messages = [{'role': 'user', 'content': 'Hello'}]
+
+        started = time.monotonic()
+        results = client.chat_completions('gpt-3.5-turbo', [messages] * 8)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(self.server.requests, 8)
+        self.assertIn('headline', chat_completion_text(results[0]))
+        # Two rounds of four requests, rather than eight sequential calls
+        self.assertGreaterEqual(elapsed, 0.4)
+        self.assertLess(elapsed, 1.2)
+
+    def test_error_status_raises(self):
+        client = LLMClient('test', api_base=f"{self.server.api_base}/missing", max_concurrency=1)
+        self.addCleanup(client.close)
+        with self.assertRaises(LLMError) as raised:
+            client.completion('gpt-3.5-turbo', 'Hello')
+        self.assertEqual(raised.exception.status, 404)
+
+    def test_rate_limit_reports_retry_after(self):
+        self.server.rate_limit_rate, self.server.retry_after = 1.0, 2.0
+        client = LLMClient('test', api_base=self.server.api_base, max_concurrency=1)
+        self.addCleanup(client.close)
+        with self.assertRaises(LLMError) as raised:
+            client.completion('gpt-3.5-turbo', 'Hello')
+        self.assertEqual(raised.exception.status, 429)
+        self.assertEqual(raised.exception.retry_after, 2.0)
+        self.assertEqual(self.server.outcomes['rate_limited'], 1)
+
+    def test_rate_limiter_keeps_requests_within_the_server_budget(self):
+        self.server.requests_per_minute = 600
+        # Budgeted a little under the server's limit, as in production, to absorb network jitter
+        limiter = InMemoryRateLimiter(requests_per_minute=540, tokens_per_minute=10 ** 6, burst_seconds=1)
+        client = LLMClient('test', api_base=self.server.api_base, max_concurrency=16, rate_limiter=limiter)
+        self.addCleanup(client.close)
+        messages = [{'role': 'user', 'content': 'Hello'}]
+
+        started = time.monotonic()
+        results = client.chat_completions('gpt-3.5-turbo', [messages] * 15)
+        elapsed = time.monotonic() - started
+
+        self.assertFalse([result for result in results if isinstance(result, Exception)])
+        self.assertEqual(self.server.outcomes['rate_limited'], 0)
+        # Nine requests fit in the burst, the other six wait a ninth of a second each
+        self.assertGreaterEqual(elapsed, 0.6)
+
+    def test_stream_yields_first_text_before_completion_ends(self):
+        self.server.latency, self.server.first_token_latency = 1.0, 0.1
+        client = LLMClient('test', api_base=self.server.api_base, max_concurrency=1)
+        self.addCleanup(client.close)
+        messages = [{'role': 'user', 'content': 'Hello'}]
+
+        started = time.monotonic()
+        parts = []
+        for text in client.stream_chat_completion('gpt-3.5-turbo', messages):
+            if not parts:
+                first_token = time.monotonic() - started
+            parts.append(text)
+
+        self.assertLess(first_token, 0.5)
+        self.assertGreaterEqual(time.monotonic() - started, 0.9)
+        self.assertIn('headline', ''.join(parts))
+
+class RateLimiterTest(SimpleTestCase):
+    def test_requests_beyond_the_burst_wait_exactly_for_the_refill(self):
+        limiter = InMemoryRateLimiter(requests_per_minute=60, tokens_per_minute=10 ** 6, burst_seconds=2)
+        self.assertEqual(limiter.reserve(1), 0)
+        self.assertEqual(limiter.reserve(1), 0)
+        self.assertAlmostEqual(limiter.reserve(1), 1.0, places=2)
+        self.assertAlmostEqual(limiter.reserve(1), 2.0, places=2)
+
+    def test_token_budget_limits_large_requests(self):
+        limiter = InMemoryRateLimiter(requests_per_minute=10 ** 6, tokens_per_minute=600, burst_seconds=1)
+        self.assertEqual(limiter.reserve(10), 0)
+        self.assertAlmostEqual(limiter.reserve(5), 0.5, places=2)
+
+class BatchContentGenerationTest(TestCase):
+    def setUp(self):
+        self.server = FakeLLMServer(latency=0.05).__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.llm_client = LLMClient('test', api_base=self.server.api_base, max_concurrency=4)
+        self.addCleanup(self.llm_client.close)
+        self.service = BatchContentGenerationService('test', 'gpt-3.5-turbo-instruct', llm_client=self.llm_client,
+                                                     poll_seconds=0.01)
+
+        self.user = User.objects.create(email='batch@example.com')
+        podcast = Podcast.objects.create(title='Back catalog', description='Test Description',
+                                         cover_image_url='https://example.com/cover.png', user=self.user)
+        self.episodes = [
+            Episode.objects.create(podcast=podcast, title=f'Episode {index}', description='Test Description',
+                                   audio_file_url='https://example.com/episode.mp3')
+            for index in range(3)
+        ]
+
+    def test_contents_are_generated_in_jobs_and_existing_ones_skipped(self):
+        MarketingContent.objects.create(episode=self.episodes[0], platform='twitter', content='Existing')
+        batch = ContentGenerationBatch.objects.create(user=self.user,
+                                                      episode_ids=[episode.id for episode in self.episodes],
+                                                      platforms=['twitter', 'linkedin'], batch_size=2)
+        reported = []
+
+        self.service.run(batch, on_progress=reported.append)
+
+        # Five missing contents in jobs of two, each answered by a single line of JSONL output
+        self.assertEqual(len(self.server.batches), 3)
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual([progress['jobs_completed'] for progress in reported], [0, 1, 2, 3])
+        progress = batch.get_progress()
+        self.assertEqual((progress['status'], progress['succeeded'], progress['skipped'], progress['failed']),
+                         ('completed', 5, 1, 0))
+        self.assertEqual(MarketingContent.objects.filter(episode__in=self.episodes).count(), 6)
+        self.assertIn('#podcast', MarketingContent.objects.get(episode=self.episodes[2], platform='linkedin').content)
+
+    def test_polls_check_the_jobs_once_without_waiting(self):
+        self.server.latency = 0.3
+        batch = ContentGenerationBatch.objects.create(user=self.user,
+                                                      episode_ids=[episode.id for episode in self.episodes],
+                                                      platforms=['twitter'], batch_size=2)
+
+        self.service.start(batch)
+        started = time.monotonic()
+        self.assertTrue(self.service.poll(batch))
+        self.assertLess(time.monotonic() - started, 0.2)
+        self.assertEqual((batch.jobs_total, batch.jobs_completed), (2, 0))
+
+        while self.service.poll(batch):
+            time.sleep(0.05)
+        self.assertEqual((batch.status, batch.succeeded), ('completed', 3))
+
+    @patch('tasks.marketing_tasks.poll_content_generation_batch.apply_async')
+    def test_tasks_requeue_the_poll_until_every_job_is_ingested(self, apply_async):
+        batch = ContentGenerationBatch.objects.create(user=self.user, episode_ids=[self.episodes[0].id],
+                                                      platforms=['twitter'], batch_size=1)
+
+        with patch('tasks.marketing_tasks.BatchContentGenerationService', return_value=self.service):
+            generate_back_catalog_content.apply(args=(batch.id,))
+            apply_async.assert_called_once_with((batch.id,), countdown=settings.CONTENT_GENERATION_BATCH_POLL_SECONDS)
+
+            while ContentGenerationBatch.objects.get(id=batch.id).status != 'completed':
+                time.sleep(0.05)
+                apply_async.reset_mock()
+                poll_content_generation_batch.apply(args=(batch.id,))
+        apply_async.assert_not_called()
+        self.assertEqual(MarketingContent.objects.filter(episode=self.episodes[0]).count(), 1)
+
+    def test_batches_are_only_visible_to_the_user_who_started_them(self):
+        batch = ContentGenerationBatch.objects.create(user=self.user, episode_ids=[self.episodes[0].id],
+                                                      platforms=['twitter'], batch_size=1)
+        view = ContentGenerationBatchViewSet.as_view({'get': 'retrieve'})
+
+        for user, expected_status in ((self.user, status.HTTP_200_OK),
+                                      (User.objects.create(email='other@example.com'), status.HTTP_404_NOT_FOUND)):
+            request = APIRequestFactory().get(f'/batches/{batch.id}/')
+            force_authenticate(request, user=user)
+            self.assertEqual(view(request, pk=batch.id).status_code, expected_status)
+
+    def test_failed_requests_are_reported_and_not_saved(self):
+        self.server.error_rate = 1.0
+        batch = ContentGenerationBatch.objects.create(user=self.user, episode_ids=[self.episodes[0].id, 999],
+                                                      platforms=['twitter'], batch_size=10)
+
+        self.service.run(batch)
+
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, 'completed')
+        self.assertEqual(batch.failed_requests, ['999:twitter', f'{self.episodes[0].id}:twitter'])
+        self.assertFalse(MarketingContent.objects.exists())
+
+class ContentGenerationServiceTest(TestCase):
+    def setUp(self):
+        self.server = FakeLLMServer(latency=0.05).__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.llm_client = LLMClient('test', api_base=self.server.api_base, max_concurrency=4)
+        self.addCleanup(self.llm_client.close)
+        self.service = ContentGenerationService('test', 'gpt-3.5-turbo-instruct', llm_client=self.llm_client)
+
+        user = User.objects.create(email='generation@example.com')
+        podcast = Podcast.objects.create(title='Generation', description='Test Description',
+                                         cover_image_url='https://example.com/cover.png', user=user)
+        self.episode = Episode.objects.create(podcast=podcast, title='Episode', description='Test Description',
+                                              audio_file_url='https://example.com/episode.mp3')
+
+    def test_platforms_are_generated_in_one_completion(self):
+        contents = self.service.generate_and_save_contents(self.episode, ['twitter', 'facebook', 'linkedin'])
+
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(list(contents), ['twitter', 'facebook', 'linkedin'])
+        self.assertEqual(MarketingContent.objects.filter(episode=self.episode).count(), 3)
+        self.assertTrue(contents['twitter'].content.endswith('#podcast'))
+        self.assertIn('#contentcreation', contents['linkedin'].content)
+
+    def test_posts_missing_from_the_completion_are_generated_on_their_own(self):
+        # The first completion wraps its JSON in prose and leaves the Facebook post empty
+        responses = iter([{'choices': [{'text': 'Here you go: {"Twitter": "New episode!", "facebook": ""} Enjoy!'}]}])
+        real_completion = self.llm_client.completion
+
+        def completion(model, prompt, **params):
+            return next(responses, None) or real_completion(model, prompt, **params)
+
+        with patch.object(self.llm_client, 'completion', side_effect=completion) as completion:
+            contents = self.service.generate_and_save_contents(self.episode, ['twitter', 'facebook'])
+
+        self.assertEqual(completion.call_count, 2)
+        self.assertEqual(contents['twitter'].content, 'New episode!... #podcast')
+        self.assertTrue(contents['facebook'].content)
+
 # TODO: Implement integration tests with actual AI service for content generation
 # TODO: Add tests for error cases and edge scenarios
 # TODO: Implement performance tests for marketing content generation and retrieval
\ No newline at end of file
@@ -1,5 +1,8 @@
 from django.urls import path
-from .views import MarketingContentListCreateView, MarketingContentDetailView, GenerateMarketingContentView
+from .views import (
+    MarketingContentListCreateView, MarketingContentDetailView, GenerateMarketingContentView,
+    GenerateMarketingContentStreamView, ContentGenerationBatchViewSet,
+)
 
 app_name = "marketing"
 
@@ -7,6 +10,10 @@ urlpatterns = [
     path("", MarketingContentListCreateView.as_view(), name="marketing_content_list_create"),
     path("<int:pk>/", MarketingContentDetailView.as_view(), name="marketing_content_detail"),
     path("generate/", GenerateMarketingContentView.as_view(), name="generate_marketing_content"),
+    path("generate/stream/", GenerateMarketingContentStreamView.as_view(), name="generate_marketing_content_stream"),
+    path("batches/", ContentGenerationBatchViewSet.as_view({"post": "create"}), name="content_generation_batch_create"),
+    path("batches/<int:pk>/", ContentGenerationBatchViewSet.as_view({"get": "retrieve"}),
+         name="content_generation_batch_detail"),
 ]
 
 # Human tasks:
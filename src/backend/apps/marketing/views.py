@@ -1,10 +1,21 @@
-from rest_framework import generics, permissions, status
+import json
+import logging
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import generics, mixins, permissions, status, viewsets
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
-from .models import MarketingContent
-from .serializers import MarketingContentSerializer
+from rest_framework.views import APIView
+from .models import ContentGenerationBatch, MarketingContent
+from .serializers import ContentGenerationBatchSerializer, MarketingContentSerializer
 from apps.episodes.models import Episode
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
+from services.content_generation import ContentGenerationService
+from tasks.marketing_tasks import start_content_generation_batch
+
+logger = logging.getLogger(__name__)
 
 class MarketingContentListCreateView(generics.ListCreateAPIView):
     queryset = MarketingContent.objects.all()
@@ -88,6 +99,104 @@ class GenerateMarketingContentView(generics.CreateAPIView):
         return f"Generated {platform} marketing content for episode: {episode.title}"
 
 
+class EventStreamRenderer(BaseRenderer):
+    # Lets clients ask for text/event-stream; the streamed body is written by the view itself
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data)
+
+
+class GenerateMarketingContentStreamView(APIView):
+    """
+    Generates marketing content for an episode and platform, streamed as server-sent events.
+
+    The response starts immediately. Generated text is sent in 'token' events as the model
+    produces it, then the saved content is sent in a 'content' event, or the failure in an
+    'error' event.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def post(self, request, *args, **kwargs):
+        # Get episode ID and platform from request data
+        episode_id = request.data.get('episode_id')
+        platform = request.data.get('platform')
+        if not platform:
+            return Response({"error": "platform is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Retrieve the Episode instance
+        episode = get_object_or_404(Episode, id=episode_id)
+
+        # Check if the user has permission to generate content for the episode
+        if episode.podcast.user != request.user:
+            return Response({"error": "You don't have permission to generate content for this episode."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        response = StreamingHttpResponse(self.events(episode, platform), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def events(self, episode, platform):
+        # A comment flushes the headers through proxies before the first token arrives
+        yield ": generating\n\n"
+        try:
+            service = ContentGenerationService(settings.OPENAI_API_KEY, settings.CONTENT_GENERATION_MODEL)
+            for event, payload in service.stream_content(episode, platform):
+                if event == 'token':
+                    yield self.event('token', {"text": payload})
+                else:
+                    yield self.event('content', MarketingContentSerializer(payload).data)
+        except Exception as e:
+            logger.error(f"Error streaming marketing content for episode {episode.id}: {str(e)}")
+            yield self.event('error', {"error": str(e)})
+
+    @staticmethod
+    def event(name, data):
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+class ContentGenerationBatchViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet for generating content for a back catalog in batch jobs and reporting their progress
+    """
+    serializer_class = ContentGenerationBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Return only the batches started by the authenticated user
+        return ContentGenerationBatch.objects.filter(user=self.request.user)
+
+    def create(self, request):
+        """
+        Start generating content for a list of episodes through batch jobs
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        episode_ids = serializer.validated_data['episode_ids']
+
+        # Check if the user has permission to generate content for every episode
+        if Episode.objects.filter(id__in=episode_ids).exclude(podcast__user=request.user).exists():
+            return Response({"error": "You don't have permission to generate content for these episodes."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        batch = start_content_generation_batch(
+            request.user,
+            episode_ids,
+            serializer.validated_data.get('platforms'),
+            serializer.validated_data.get('batch_size'),
+        )
+        return Response(batch.get_progress(), status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        """
+        Get the progress of a batch, updated as each batch job is ingested
+        """
+        return Response(self.get_object().get_progress())
+
+
 # Pending human tasks:
 # TODO: Implement error handling for cases where episode doesn't exist or user doesn't have permission
 # TODO: Add pagination to the MarketingContentListCreateView if needed for large datasets
@@ -0,0 +1,37 @@
+import asyncio
+import signal
+
+from django.core.management.base import BaseCommand
+
+from services.post_dispatcher import ScheduledPostDispatcher
+from services.social_publishing import get_publishing_client
+
+
+class Command(BaseCommand):
+    help = "Publishes scheduled social media posts at their scheduled time; run as many as needed side by side"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Most posts claimed at once')
+        parser.add_argument('--lookahead', type=float, help='Seconds ahead of their time posts are claimed')
+        parser.add_argument('--poll', type=float, help='Seconds between claims')
+
+    def handle(self, *args, **options):
+        dispatcher = ScheduledPostDispatcher(
+            batch_size=options['batch_size'],
+            lookahead_seconds=options['lookahead'],
+            poll_seconds=options['poll'],
+        )
+        self.stdout.write(f"Dispatcher {dispatcher.name} started")
+        asyncio.run(self.dispatch(dispatcher))
+        self.stdout.write(self.style.SUCCESS(f"Dispatcher {dispatcher.name} stopped: {dispatcher.get_stats()}"))
+
+    async def dispatch(self, dispatcher):
+        # Stop on SIGTERM or Ctrl-C, handing the posts not yet due back to the other dispatchers
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            await dispatcher.run(stop)
+        finally:
+            await get_publishing_client().close()
@@ -12,6 +12,7 @@ class SocialMediaPost(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('scheduled', 'Scheduled'),
+        ('publishing', 'Publishing'),
         ('published', 'Published'),
         ('failed', 'Failed'),
     ]
@@ -19,9 +20,13 @@ class SocialMediaPost(models.Model):
     episode = models.ForeignKey(Episode, on_delete=models.CASCADE, related_name='social_media_posts')
     platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
     content = models.TextField()
+    media_url = models.URLField(max_length=500, blank=True, null=True)
     post_id = models.CharField(max_length=255, blank=True, null=True)
     scheduled_time = models.DateTimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    # Set when a dispatcher claims the scheduled post for publishing
+    claimed_by = models.CharField(max_length=100, blank=True, null=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -45,6 +50,7 @@ class SocialMediaPost(models.Model):
         indexes = [
             models.Index(fields=['platform', 'status']),
             models.Index(fields=['episode', 'platform']),
+            models.Index(fields=['status', 'scheduled_time']),
         ]
 
 # TODO: Implement the get_engagement_metrics method to integrate with specific social media platform APIs
@@ -5,6 +5,7 @@ class SocialMediaPostSerializer(serializers.ModelSerializer):
     class Meta:
         model = SocialMediaPost
         fields = '__all__'
+        read_only_fields = ['claimed_by', 'claimed_at']
 
     def validate_content(self, value):
         # TODO: Implement platform-specific content validation
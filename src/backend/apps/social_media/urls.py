@@ -3,7 +3,8 @@ from .views import (
     SocialMediaPostListCreateView,
     SocialMediaPostRetrieveUpdateDestroyView,
     SocialMediaPostScheduleView,
-    SocialMediaPostEngagementView
+    SocialMediaPostEngagementView,
+    SocialRateLimitMetricsView
 )
 
 app_name = "social_media"
@@ -13,6 +14,7 @@ urlpatterns = [
     path("posts/<int:pk>/", SocialMediaPostRetrieveUpdateDestroyView.as_view(), name="post-detail"),
     path("posts/<int:pk>/schedule/", SocialMediaPostScheduleView.as_view(), name="post-schedule"),
     path("posts/<int:pk>/engagement/", SocialMediaPostEngagementView.as_view(), name="post-engagement"),
+    path("rate-limits/", SocialRateLimitMetricsView.as_view(), name="rate-limit-metrics"),
 ]
 
 # Human Tasks:
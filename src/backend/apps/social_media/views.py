@@ -1,10 +1,13 @@
-from rest_framework import generics, permissions, status
+from rest_framework import generics, permissions, serializers, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from .models import SocialMediaPost
 from .serializers import SocialMediaPostSerializer
 from apps.episodes.models import Episode
+from services.social_rate_limiter import get_social_rate_limiter
 
 class SocialMediaPostListCreateView(generics.ListCreateAPIView):
     queryset = SocialMediaPost.objects.all()
@@ -31,24 +34,17 @@ class SocialMediaPostRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPI
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_update(self, serializer):
-        instance = self.get_object()
-        
-        # Check if the status or scheduled_time has changed
-        status_changed = 'status' in serializer.validated_data and serializer.validated_data['status'] != instance.status
-        time_changed = 'scheduled_time' in serializer.validated_data and serializer.validated_data['scheduled_time'] != instance.scheduled_time
-        
-        # Save the updated social media post
-        updated_instance = serializer.save()
-        
-        # If status changed to 'scheduled', trigger scheduling task
-        if status_changed and updated_instance.status == 'scheduled':
-            # TODO: Implement scheduling task
-            pass
-        
-        # If scheduled_time changed, update the scheduling task
-        if time_changed:
-            # TODO: Implement rescheduling task
-            pass
+        # The row stays locked until saved, so no dispatcher can claim the post meanwhile
+        with transaction.atomic():
+            instance = SocialMediaPost.objects.select_for_update().get(pk=serializer.instance.pk)
+            
+            # A dispatcher has claimed the post and may already have sent it
+            if instance.status == 'publishing':
+                raise serializers.ValidationError("This post is being published and can no longer be changed.")
+            
+            # Save the updated social media post; the dispatchers publish scheduled posts
+            # by their status and scheduled_time, so a new time or status needs nothing more
+            serializer.save()
 
 class SocialMediaPostScheduleView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -59,21 +55,22 @@ class SocialMediaPostScheduleView(APIView):
         # Check if the post is already scheduled
         if post.status == 'scheduled':
             return Response({"error": "This post is already scheduled."}, status=status.HTTP_400_BAD_REQUEST)
+        if post.status in ('publishing', 'published'):
+            return Response({"error": "This post has already been published."}, status=status.HTTP_400_BAD_REQUEST)
         
         # Validate the scheduling time
         scheduled_time = request.data.get('scheduled_time')
         if not scheduled_time:
             return Response({"error": "Scheduled time is required."}, status=status.HTTP_400_BAD_REQUEST)
         
-        # TODO: Implement validation for scheduled_time
+        scheduled_time = serializers.DateTimeField().to_internal_value(scheduled_time)
+        if scheduled_time <= timezone.now():
+            return Response({"error": "Scheduled time must be in the future."}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Call the social media integration service to schedule the post
-        # TODO: Implement social media integration service
-        
-        # Update the post status and save
+        # Update the post status and save; a dispatcher publishes it at the scheduled time
         post.status = 'scheduled'
         post.scheduled_time = scheduled_time
-        post.save()
+        post.save(update_fields=['status', 'scheduled_time', 'updated_at'])
         
         return Response({"message": "Post scheduled successfully."}, status=status.HTTP_200_OK)
 
@@ -89,6 +86,16 @@ class SocialMediaPostEngagementView(APIView):
         
         return Response(engagement_metrics, status=status.HTTP_200_OK)
 
+class SocialRateLimitMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        # Queue depth and wait times of the platform rate limits shared by all workers
+        rate_limiter = get_social_rate_limiter()
+        if rate_limiter is None:
+            return Response({"error": "Social rate limiting is disabled."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(rate_limiter.get_metrics(), status=status.HTTP_200_OK)
+
 # TODO: Implement proper error handling and logging for API requests
 # TODO: Add rate limiting to prevent abuse of the API endpoints
 # TODO: Implement caching for frequently accessed data, such as engagement metrics
@@ -1,5 +1,7 @@
 from django.db import models
+from apps.authentication.models import User
 from apps.episodes.models import Episode
+from services.extractive_summary import DEFAULT_SUMMARY_SENTENCES, summarize
 
 class Transcript(models.Model):
     """
@@ -21,10 +23,15 @@ class Transcript(models.Model):
 
     def get_summary(self):
         """
-        Generates a summary of the transcript using AI
+        Returns the most salient sentences of the transcript, extracted locally without an API call
         """
-        # TODO: Implement AI-powered summary generation
-        raise NotImplementedError("AI-powered summary generation not implemented yet")
+        return self.generate_summary(self.content)
+
+    def generate_summary(self, content, max_sentences=DEFAULT_SUMMARY_SENTENCES):
+        """
+        Extracts a summary of the content by TextRank over TF-IDF sentence vectors
+        """
+        return summarize(content or '', max_sentences)
 
     def extract_keywords(self):
         """
@@ -33,8 +40,57 @@ class Transcript(models.Model):
         # TODO: Implement keyword extraction algorithm
         raise NotImplementedError("Keyword extraction algorithm not implemented yet")
 
+class TranscriptionBatch(models.Model):
+    """
+    Progress of a batch transcription, kept as counters in a single row
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transcription_batches')
+    episode_ids = models.JSONField(help_text="Episode IDs in submission order")
+    max_concurrency = models.PositiveIntegerField()
+    dispatched = models.PositiveIntegerField(default=0, help_text="Number of episode IDs submitted so far")
+    in_flight = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    failed_episode_ids = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Transcription batch {self.id} ({self.get_status_display()})"
+
+    @property
+    def total(self):
+        return len(self.episode_ids)
+
+    @property
+    def finished(self):
+        return self.succeeded + self.skipped + self.failed
+
+    def get_progress(self):
+        """
+        Returns the aggregate progress of the batch
+        """
+        return {
+            'batch_id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'pending': self.total - self.dispatched,
+            'in_flight': self.in_flight,
+            'succeeded': self.succeeded,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'failed_episode_ids': self.failed_episode_ids,
+            'percent_complete': round(100 * self.finished / self.total, 1) if self.total else 100.0,
+        }
+
 # Human tasks:
-# TODO: Implement AI-powered summary generation in the get_summary method
 # TODO: Implement keyword extraction algorithm in the extract_keywords method
 # TODO: Consider adding a field for transcript language if multi-language support is needed
 # TODO: Evaluate the need for storing timestamps with the transcript content for precise audio syncing
\ No newline at end of file
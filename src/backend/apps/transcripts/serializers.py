@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from apps.transcripts.models import Transcript
+from apps.transcripts.models import Transcript, TranscriptionBatch
 
 class TranscriptSerializer(serializers.ModelSerializer):
     word_count = serializers.SerializerMethodField()
@@ -41,6 +41,20 @@ class TranscriptSerializer(serializers.ModelSerializer):
         """
         return obj.extract_keywords()
 
+class TranscriptionBatchSerializer(serializers.ModelSerializer):
+    episode_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    max_concurrency = serializers.IntegerField(min_value=1, required=False)
+
+    class Meta:
+        model = TranscriptionBatch
+        fields = ['episode_ids', 'max_concurrency']
+
+    def validate_episode_ids(self, value):
+        """
+        Drops duplicate episode IDs, keeping submission order.
+        """
+        return list(dict.fromkeys(value))
+
 # Human tasks (commented as requested):
 # TODO: Implement content validation logic in the validate_content method
 # TODO: Consider adding rate limiting or caching for resource-intensive methods like get_summary and get_keywords
@@ -1,8 +1,24 @@
-from django.test import TestCase
+from django.test import TestCase, SimpleTestCase
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
-from apps.transcripts.models import Transcript
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.authentication.models import User
+from apps.podcasts.models import Podcast
+from apps.transcripts.models import Transcript, TranscriptionBatch
+from apps.transcripts.views import TranscriptionBatchViewSet
 from apps.episodes.models import Episode
+import io
+import threading
+import time
+import wave
+import numpy as np
+from services.audio_normalization import AudioNormalizer
+from services.extractive_summary import split_sentences, summarize
+from services.recognizers import LocalRecognizer, get_recognizer
+from services.transcription_pipeline import ChunkedTranscriptionPipeline, iter_windows
+from services.transcription_status import InMemoryStatusStore, ProgressReporter
+from tasks.transcription_tasks import record_batch_result, start_transcription_batch
 
 class TranscriptModelTest(TestCase):
     def setUp(self):
@@ -59,6 +75,272 @@ class TranscriptModelTest(TestCase):
         self.assertEqual(keywords, mock_keywords)
         mock_extract_keywords.assert_called_once_with(self.transcript.content)
 
+class FakeRecognizer:
+    """Emits one word every half second of the audio it receives"""
+
+    def recognize(self, audio_content, sample_rate):
+        duration = len(audio_content) / (2 * sample_rate)
+        words = []
+        start = 0.0
+        while start + 0.4 <= duration:
+            words.append({'word': 'word', 'start_time': start, 'end_time': start + 0.4, 'confidence': 0.9})
+            start += 0.5
+        return words
+
+
+class ChunkedTranscriptionPipelineTest(SimpleTestCase):
+    def test_iter_windows_covers_audio_once(self):
+        """Test that window ownership spans the audio without gaps or overlaps"""
+        pcm = b'\x00\x00' * 16000 * 25
+        chunks = (pcm[i:i + 4096] for i in range(0, len(pcm), 4096))
+        windows = [window for window, _ in iter_windows(chunks, 16000, window_seconds=10.0, overlap_seconds=2.0)]
+        self.assertEqual([w['start'] for w in windows], [0.0, 8.0, 16.0])
+        self.assertEqual(windows[-1]['end'], 25.0)
+        self.assertEqual(windows[-1]['keep_end'], float('inf'))
+        for previous, current in zip(windows, windows[1:]):
+            self.assertEqual(previous['keep_end'], current['keep_start'])
+
+    def test_transcribe_stitches_without_duplicates(self):
+        """Test that overlapping windows are de-duplicated when stitched"""
+        pipeline = ChunkedTranscriptionPipeline(FakeRecognizer(), max_workers=4, window_seconds=10.0, overlap_seconds=2.0)
+        result = pipeline.transcribe(b'\x00\x00' * 16000 * 130)
+
+        self.assertEqual(result['duration'], 130.0)
+        self.assertEqual(len(result['words']), 260)
+        starts = [word['start_time'] for word in result['words']]
+        self.assertEqual(starts, sorted(starts))
+        self.assertAlmostEqual(result['confidence'], 0.9)
+
+    def test_transcribe_stream_matches_in_memory(self):
+        """Test that streamed chunks produce the same words as in-memory audio"""
+        pcm = b'\x00\x00' * 16000 * 130
+        pipeline = ChunkedTranscriptionPipeline(FakeRecognizer(), max_workers=2, window_seconds=10.0, overlap_seconds=2.0)
+        streamed = pipeline.transcribe_stream(pcm[i:i + 7777] for i in range(0, len(pcm), 7777))
+        self.assertEqual(streamed['words'], pipeline.transcribe(pcm)['words'])
+
+    def test_transcribe_empty_audio(self):
+        """Test that empty audio yields an empty transcript"""
+        result = ChunkedTranscriptionPipeline(FakeRecognizer()).transcribe(b'')
+        self.assertEqual(result['transcript'], '')
+        self.assertEqual(result['words'], [])
+
+class LocalRecognizerTest(SimpleTestCase):
+    def test_recognize_is_deterministic(self):
+        """Test that identical audio yields identical synthetic words"""
+        recognizer = get_recognizer('local', words_per_second=2.0)
+        audio = bytes(range(256)) * 250  # 2 seconds at 16 kHz
+        words = recognizer.recognize(audio, 16000)
+
+        self.assertEqual(len(words), 4)
+        self.assertEqual(words, recognizer.recognize(audio, 16000))
+        self.assertEqual(words, recognizer.recognize_stream([audio[:1000], audio[1000:]], 16000))
+        self.assertEqual([word['start_time'] for word in words], [0.0, 0.5, 1.0, 1.5])
+
+    def test_unknown_backend(self):
+        """Test that unknown backend names are rejected"""
+        with self.assertRaises(ValueError):
+            get_recognizer('unknown')
+
+    def test_drives_pipeline(self):
+        """Test that the local engine can drive the chunked pipeline"""
+        pipeline = ChunkedTranscriptionPipeline(LocalRecognizer(), max_workers=4, window_seconds=10.0, overlap_seconds=2.0)
+        result = pipeline.transcribe(b'\x00\x00' * 16000 * 60)
+        self.assertGreater(len(result['words']), 0)
+        self.assertEqual(result['duration'], 60.0)
+
+def make_wav(samples, sample_rate, channels):
+    """Encodes float samples of shape (frames, channels) as a 16-bit WAV file"""
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes((samples * 32767).astype('<i2').tobytes())
+    return output.getvalue()
+
+
+class AudioNormalizerTest(SimpleTestCase):
+    def tone(self, seconds, sample_rate):
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        return 0.5 * np.sin(2 * np.pi * 440 * t)
+
+    def test_downmixes_and_resamples(self):
+        """Stereo 44.1 kHz audio becomes 16 kHz mono of the same duration"""
+        mono = self.tone(3, 44100)
+        data = make_wav(np.stack([mono, mono], axis=1), 44100, 2)
+        output = io.BytesIO()
+        result = AudioNormalizer(trim_silence=False).normalize([data[i:i + 10000] for i in range(0, len(data), 10000)], output)
+
+        output.seek(0)
+        with wave.open(output, 'rb') as wav_file:
+            self.assertEqual((wav_file.getframerate(), wav_file.getnchannels()), (16000, 1))
+            self.assertAlmostEqual(wav_file.getnframes() / 16000, 3.0, places=2)
+        self.assertAlmostEqual(result['duration'], 3.0, places=2)
+
+    def test_trims_silence_and_maps_times_back(self):
+        """A long silence is cut down to its padding and later times map back to the original"""
+        samples = np.concatenate([self.tone(2, 16000), np.zeros(16000 * 6), self.tone(2, 16000)])
+        output = io.BytesIO()
+        result = AudioNormalizer(min_silence_seconds=2.0, padding_seconds=0.25).normalize(
+            [make_wav(samples[:, None], 16000, 1)], output
+        )
+
+        self.assertAlmostEqual(result['duration'], 4.5, delta=0.05)
+        self.assertAlmostEqual(result['original_duration'], 10.0, places=2)
+        offset_map = result['offset_map']
+        self.assertAlmostEqual(float(offset_map.to_original(1.0)), 1.0)
+        words = offset_map.remap_words([{'word': 'back', 'start_time': 2.6, 'end_time': 3.0}])
+        self.assertAlmostEqual(words[0]['start_time'], 8.1, delta=0.05)
+
+
+class TranscriptionStatusTest(SimpleTestCase):
+    def test_publish_and_wait(self):
+        """A waiter is woken by the next event and sees sequence numbers increase"""
+        store = InMemoryStatusStore()
+        first = store.publish('task', 'queued', 0.0)
+        self.assertEqual(store.wait('task', since=0, timeout=0.1), first)
+
+        threading.Timer(0.05, store.publish, args=('task', 'recognizing', 40.0)).start()
+        event = store.wait('task', since=first['sequence'], timeout=5)
+        self.assertEqual((event['sequence'], event['stage'], event['percent']), (2, 'recognizing', 40.0))
+        self.assertEqual(store.wait('task', since=2, timeout=0.01), event)
+
+    def test_stream_ends_at_terminal_stage(self):
+        """The stream yields each new event once and stops after completion"""
+        store = InMemoryStatusStore()
+        reporter = ProgressReporter('task', store)
+        reporter.report('recognizing', 50.0)
+        reporter.report('completed', 100.0)
+        events = list(store.stream('task', timeout=0.1))
+        self.assertEqual([event['stage'] for event in events], ['completed'])
+        self.assertEqual(events[0]['eta_seconds'], 0.0)
+
+    def test_stream_gives_up_on_silent_or_unknown_tasks(self):
+        """The stream ends after too many keep-alives in a row, after its maximum duration, or without state"""
+        store = InMemoryStatusStore()
+        self.assertEqual(list(store.stream('unknown', timeout=0.01)), [])
+
+        store.publish('task', 'recognizing', 10.0)
+        events = list(store.stream('task', since=1, timeout=0.01, max_idle_polls=3))
+        self.assertEqual(events, [None, None])
+
+        started = time.monotonic()
+        events = list(store.stream('task', since=1, timeout=0.05, max_seconds=0.12))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(all(event is None for event in events))
+
+    def test_pipeline_reports_progress(self):
+        """Recognized seconds reported by the pipeline add up to the audio duration"""
+        reported = []
+        pipeline = ChunkedTranscriptionPipeline(FakeRecognizer(), max_workers=2, window_seconds=10, overlap_seconds=2)
+        result = pipeline.transcribe_stream([bytes(16000 * 2 * 35)], 16000, on_progress=reported.append)
+        self.assertEqual(reported, sorted(reported))
+        self.assertAlmostEqual(reported[-1], result['duration'])
+
+
+class TranscriptionBatchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='batch@example.com')
+
+    def start(self, episode_ids, max_concurrency):
+        with self.captureOnCommitCallbacks(execute=True):
+            batch = start_transcription_batch(self.user, episode_ids, max_concurrency)
+        return batch
+
+    def finish(self, batch, episode_id, outcome):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_batch_result(batch.id, episode_id, outcome)
+        batch.refresh_from_db()
+
+    @patch('tasks.transcription_tasks.transcribe_episode.delay')
+    def test_concurrency_is_capped(self, mock_delay):
+        """Only max_concurrency episodes run at once; each result submits the next one"""
+        batch = self.start([1, 2, 3, 4, 5], max_concurrency=2)
+        self.assertEqual([c.args[0] for c in mock_delay.call_args_list], [1, 2])
+        self.assertEqual(batch.in_flight, 2)
+
+        self.finish(batch, 1, 'succeeded')
+        self.assertEqual(mock_delay.call_args.args[0], 3)
+        self.assertEqual(mock_delay.call_args.kwargs, {'batch_id': batch.id})
+        self.assertEqual(batch.in_flight, 2)
+
+    @patch('tasks.transcription_tasks.transcribe_episode.delay')
+    def test_progress_record(self, mock_delay):
+        """The batch row aggregates outcomes and completes once every episode has finished"""
+        batch = self.start([1, 2, 3], max_concurrency=3)
+        self.finish(batch, 1, 'succeeded')
+        self.finish(batch, 2, 'failed')
+        self.assertEqual(batch.get_progress()['percent_complete'], 66.7)
+        self.assertEqual(batch.status, 'running')
+
+        self.finish(batch, 3, 'skipped')
+        progress = batch.get_progress()
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual((progress['succeeded'], progress['skipped'], progress['failed']), (1, 1, 1))
+        self.assertEqual(progress['failed_episode_ids'], [2])
+        self.assertEqual(mock_delay.call_count, 3)
+
+    @patch('tasks.transcription_tasks.transcribe_episode.delay')
+    def test_batches_are_limited_to_the_user_and_their_episodes(self, mock_delay):
+        """Episodes of another user cannot be batched, nor another user's batch followed"""
+        podcast = Podcast.objects.create(title='Back catalog', description='Test Description',
+                                         cover_image_url='https://example.com/cover.png', user=self.user)
+        episode = Episode.objects.create(podcast=podcast, title='Episode', description='Test Description',
+                                         audio_file_url='https://example.com/episode.mp3')
+        other_user = User.objects.create(email='other@example.com')
+        factory = APIRequestFactory()
+
+        request = factory.post('/batches/', {'episode_ids': [episode.id]}, format='json')
+        force_authenticate(request, user=other_user)
+        response = TranscriptionBatchViewSet.as_view({'post': 'create'})(request)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(TranscriptionBatch.objects.exists())
+        mock_delay.assert_not_called()
+
+        batch = self.start([episode.id], max_concurrency=1)
+        for user, expected_status in ((self.user, status.HTTP_200_OK), (other_user, status.HTTP_404_NOT_FOUND)):
+            request = factory.get(f'/batches/{batch.id}/')
+            force_authenticate(request, user=user)
+            response = TranscriptionBatchViewSet.as_view({'get': 'retrieve'})(request, pk=batch.id)
+            self.assertEqual(response.status_code, expected_status)
+
+class ExtractiveSummaryTest(SimpleTestCase):
+    THEME = [
+        "Podcast marketing starts with knowing your audience.",
+        "The audience decides which podcast marketing works.",
+        "Good podcast marketing turns listeners into an audience.",
+    ]
+
+    def test_selects_central_sentences_in_original_order(self):
+        asides = [
+            "The weather was cold yesterday.",
+            "My cat sleeps all day long.",
+            "Traffic on the bridge was terrible.",
+            "Lunch included fresh bread.",
+            "Someone rang the doorbell twice.",
+        ]
+        text = " ".join([asides[0], self.THEME[0], asides[1], self.THEME[1], asides[2], asides[3], self.THEME[2], asides[4]])
+
+        self.assertEqual(summarize(text, 3), " ".join(self.THEME))
+        self.assertEqual(summarize(text, 3, method='centroid'), " ".join(self.THEME))
+        self.assertLessEqual(len(summarize(text, 8, max_chars=120)), 120)
+        with self.assertRaises(ValueError):
+            summarize(text, 3, method='unknown')
+
+    def test_unpunctuated_transcript_is_split_into_word_runs(self):
+        sentences = split_sentences(" ".join(["word"] * 95))
+        self.assertEqual([len(sentence.split()) for sentence in sentences], [30, 30, 30, 5])
+
+    def test_one_hour_transcript_is_summarized_quickly(self):
+        rng = np.random.default_rng(0)
+        words = [f"term{rank}" for rank in rng.zipf(1.3, size=20000) if rank < 20000][:9500]
+        text = ". ".join(" ".join(words[start:start + 14]) for start in range(0, len(words), 14))
+
+        started = time.perf_counter()
+        summary = summarize(text, 8)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(len(split_sentences(summary)), 8)
+
 # Human tasks (commented):
 # TODO: Implement actual AI-powered summary generation for more comprehensive testing
 # TODO: Implement actual keyword extraction algorithm for more comprehensive testing
@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TranscriptViewSet
+from .views import (
+    TranscriptViewSet, TranscriptionBatchViewSet, TranscriptionStatusStreamView, TranscriptionStatusView
+)
 
 router = DefaultRouter()
 router.register(r'transcripts', TranscriptViewSet)
+router.register(r'batches', TranscriptionBatchViewSet)
 
 urlpatterns = [
+    path('status/<str:task_id>/', TranscriptionStatusView.as_view(), name='transcription-status'),
+    path('status/<str:task_id>/stream/', TranscriptionStatusStreamView.as_view(), name='transcription-status-stream'),
     path('', include(router.urls)),
 ]
 
@@ -0,0 +1,115 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework import mixins, status, viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Transcript, TranscriptionBatch
+from apps.episodes.models import Episode
+from .serializers import TranscriptSerializer, TranscriptionBatchSerializer
+from services.transcription_status import LONG_POLL_SECONDS, get_status_store
+from tasks.transcription_tasks import start_transcription_batch
+
+
+class TranscriptViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for handling CRUD operations for Transcripts
+    """
+    queryset = Transcript.objects.all()
+    serializer_class = TranscriptSerializer
+    permission_classes = [IsAuthenticated]
+
+
+class TranscriptionBatchViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet for starting batch transcriptions and reporting their aggregate progress
+    """
+    serializer_class = TranscriptionBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # Return only the batches started by the authenticated user
+        return TranscriptionBatch.objects.filter(user=self.request.user)
+
+    def create(self, request):
+        """
+        Start transcribing a list of episodes with bounded concurrency
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        episode_ids = serializer.validated_data['episode_ids']
+
+        # Check if the user has permission to transcribe every episode
+        if Episode.objects.filter(id__in=episode_ids).exclude(podcast__user=request.user).exists():
+            return Response({"error": "You don't have permission to transcribe these episodes."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        batch = start_transcription_batch(
+            request.user,
+            episode_ids,
+            serializer.validated_data.get('max_concurrency'),
+        )
+        return Response(batch.get_progress(), status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        """
+        Get the progress of a batch from its single progress record
+        """
+        return Response(self.get_object().get_progress())
+
+
+class TranscriptionStatusView(APIView):
+    """
+    Long-poll endpoint for the progress of a transcription task
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id):
+        """
+        Get the latest progress event, waiting up to ?wait= seconds for one newer than ?since=
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            wait = min(float(request.query_params.get('wait', 0)), LONG_POLL_SECONDS)
+        except ValueError:
+            return Response({"error": "since and wait must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        store = get_status_store()
+        event = store.wait(task_id, since, wait) if wait > 0 else store.get(task_id)
+        if event is None:
+            return Response({"error": "Unknown transcription task"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(event)
+
+
+class TranscriptionStatusStreamView(APIView):
+    """
+    Server-Sent Events stream of the progress of a transcription task
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id):
+        """
+        Stream progress events until the task completes, fails or goes silent, resuming after Last-Event-ID
+        """
+        try:
+            since = int(request.headers.get('Last-Event-ID') or request.query_params.get('since', 0))
+        except ValueError:
+            return Response({"error": "since must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        store = get_status_store()
+        if store.get(task_id) is None:
+            return Response({"error": "Unknown transcription task"}, status=status.HTTP_404_NOT_FOUND)
+
+        def events():
+            for event in store.stream(task_id, since):
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield f"id: {event['sequence']}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
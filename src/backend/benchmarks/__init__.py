@@ -0,0 +1,5 @@
+"""
+Offline benchmarks for the backend services.
+
+Each module is runnable on its own, e.g. `python -m benchmarks.transcription_memory` from src/backend.
+"""
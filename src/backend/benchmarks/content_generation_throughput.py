@@ -0,0 +1,273 @@
+"""
+Measures content generation against a local fake completion server that misbehaves.
+
+Drives ContentGenerationService directly (one call per episode and platform, no retry)
+and the generate_marketing_content Celery task (all platforms of an episode in one
+call, retried on failure), on --workers threads standing in for worker slots, and the
+bulk mode, which submits every generation as batch jobs of --batch-size requests and
+saves each job's output with bulk inserts. Episodes live in a throwaway SQLite
+database. Tasks run eagerly, so Celery retries happen immediately instead of after
+their countdown.
+
+For each scenario it reports p50/p95 latency per unit of work, throughput, and wasted
+calls: completion requests beyond those a clean run makes (one per generation, or one
+per task), spent on 429s, server errors, malformed responses and retried work.
+Duplicate rows are contents saved by attempts that failed later on and were retried.
+The latency of a batch generation is the time until its job was ingested.
+
+--server-rpm makes the fake server enforce a request budget like the real API, and
+--limiter-rpm budgets requests on the client side with the in-memory rate limiter,
+which should turn those 429s into short waits.
+
+Usage: python -m benchmarks.content_generation_throughput [--episodes 40] [--workers 8]
+       [--latency 0.3] [--latency-sigma 0.5] [--error-rate 0.05] [--rate-limit-rate 0.05]
+       [--malformed-rate 0.05] [--server-rpm 0] [--limiter-rpm 0] [--batch-size 40]
+       [--scenarios service task batch]
+"""
+import argparse
+import logging
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+
+from benchmarks.fake_llm_server import FakeLLMServer
+
+MODEL = 'gpt-3.5-turbo-instruct'
+PLATFORMS = ['twitter', 'facebook', 'linkedin']
+TRANSCRIPT = ("Today we talk about building a podcast audience from scratch. "
+              "Our guest explains why consistency beats virality for independent shows. ") * 20
+
+
+def configure_django(api_base, database_path, max_concurrency, requests_per_minute=0, batch_size=40):
+    """
+    Sets up Django with the apps generation needs and creates their tables.
+
+    Args:
+        api_base (str): Base URL of the fake completion server
+        database_path (str): SQLite database file, shared by all worker threads
+        max_concurrency (int): Requests in flight on the shared completion client
+        requests_per_minute (int): Client-side request budget, no rate limiting when 0
+        batch_size (int): Requests per batch job in the bulk mode
+    """
+    settings.configure(
+        INSTALLED_APPS=[
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'apps.authentication',
+            'apps.podcasts',
+            'apps.episodes',
+            'apps.transcripts',
+            'apps.marketing',
+            'apps.social_media',
+        ],
+        AUTH_USER_MODEL='authentication.User',
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': database_path,
+                               'OPTIONS': {'timeout': 30}}},
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        USE_TZ=True,
+        OPENAI_API_KEY='test',
+        LLM_API_BASE=api_base,
+        LLM_MAX_CONCURRENCY=max_concurrency,
+        LLM_TIMEOUT_SECONDS=30.0,
+        LLM_RATE_LIMITER_BACKEND='memory' if requests_per_minute else '',
+        LLM_REQUESTS_PER_MINUTE=requests_per_minute,
+        LLM_TOKENS_PER_MINUTE=10 ** 9,
+        LLM_RATE_LIMIT_BURST_SECONDS=1.0,
+        CONTENT_GENERATION_MODEL=MODEL,
+        CONTENT_GENERATION_BATCH_SIZE=batch_size,
+        CONTENT_GENERATION_BATCH_POLL_SECONDS=0.05,
+        CONTENT_GENERATION_BATCH_COMPLETION_WINDOW='24h',
+        TRANSCRIPT_BRIEF_STRATEGY='extractive',
+        TRANSCRIPT_CONDENSATION_MODEL='gpt-3.5-turbo',
+        TRANSCRIPT_BRIEF_MAX_TOKENS=400,
+        TRANSCRIPT_CHUNK_TOKENS=2500,
+        TRANSCRIPT_BRIEF_CACHE_TIMEOUT=3600,
+    )
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def create_episodes(count, label):
+    """
+    Creates episodes with transcripts under one podcast.
+
+    Args:
+        count (int): Number of episodes
+        label (str): Distinguishes the episodes of each scenario
+
+    Returns:
+        list: The episodes
+    """
+    from apps.authentication.models import User
+    from apps.episodes.models import Episode
+    from apps.podcasts.models import Podcast
+    from apps.transcripts.models import Transcript
+
+    user = User.objects.create(email=f"{label}@example.com")
+    podcast = Podcast.objects.create(title=f"{label} podcast", description="Benchmark podcast",
+                                     cover_image_url="https://example.com/cover.png", user=user)
+    episodes = []
+    for index in range(count):
+        episode = Episode.objects.create(podcast=podcast, title=f"{label} episode {index}",
+                                         description="Growing an audience", audio_file_url="https://example.com/a.mp3")
+        Transcript.objects.create(episode=episode, content=TRANSCRIPT)
+        episodes.append(episode)
+    return episodes
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def timed(function, *args):
+    """Runs a function, returning whether it succeeded and how long it took"""
+    from django.db import connection
+
+    started = time.perf_counter()
+    try:
+        succeeded = function(*args)
+    except Exception:
+        succeeded = False
+    finally:
+        # Worker threads open their own connection
+        connection.close()
+    return succeeded, time.perf_counter() - started
+
+
+def run_service(episodes, platforms, workers):
+    """
+    Generates content for every episode and platform with ContentGenerationService.
+
+    Returns:
+        tuple: (outcomes of each generation, generations per success, calls per success)
+    """
+    from services.content_generation import ContentGenerationService
+
+    service = ContentGenerationService(settings.OPENAI_API_KEY, settings.CONTENT_GENERATION_MODEL)
+
+    def generate(episode, platform):
+        service.generate_and_save_content(episode, platform)
+        return True
+
+    with ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(timed, generate, episode, platform) for episode in episodes for platform in platforms]
+        return [future.result() for future in futures], 1, 1
+
+
+def run_task(episodes, platforms, workers):
+    """
+    Generates content for every episode with the generate_marketing_content task.
+
+    Returns:
+        tuple: (outcomes of each task, generations per success, calls per success)
+    """
+    from tasks.marketing_tasks import generate_marketing_content
+
+    def generate(episode):
+        return generate_marketing_content.apply(args=(episode.id, platforms)).successful()
+
+    with ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(timed, generate, episode) for episode in episodes]
+        return [future.result() for future in futures], len(platforms), 1
+
+
+def run_batch(episodes, platforms, workers):
+    """
+    Generates content for every episode and platform in batch jobs with BatchContentGenerationService.
+
+    Returns:
+        tuple: (outcomes of each generation, generations per success, calls per success)
+    """
+    from apps.marketing.models import ContentGenerationBatch
+    from services.batch_generation import BatchContentGenerationService
+
+    batch = ContentGenerationBatch.objects.create(user=episodes[0].podcast.user,
+                                                  episode_ids=[episode.id for episode in episodes], platforms=platforms,
+                                                  batch_size=settings.CONTENT_GENERATION_BATCH_SIZE)
+    service = BatchContentGenerationService(settings.OPENAI_API_KEY, settings.CONTENT_GENERATION_MODEL)
+    results = []
+    started = time.perf_counter()
+
+    def record(progress):
+        # Generations finished since the last report completed when their job was ingested
+        elapsed = time.perf_counter() - started
+        succeeded = progress['succeeded'] - sum(1 for succeeded, _ in results if succeeded)
+        failed = progress['failed'] - sum(1 for succeeded, _ in results if not succeeded)
+        results.extend([(True, elapsed)] * succeeded + [(False, elapsed)] * failed)
+
+    service.run(batch, on_progress=record)
+    return results, 1, 1
+
+
+SCENARIOS = {
+    'service': run_service,
+    'task': run_task,
+    'batch': run_batch,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--episodes', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--latency-sigma', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.05)
+    parser.add_argument('--malformed-rate', type=float, default=0.05)
+    parser.add_argument('--server-rpm', type=int, default=0)
+    parser.add_argument('--limiter-rpm', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    args = parser.parse_args()
+    # Failures are expected here; their log lines would bury the table
+    logging.disable(logging.ERROR)
+
+    server = FakeLLMServer(latency=args.latency, latency_sigma=args.latency_sigma, error_rate=args.error_rate,
+                           rate_limit_rate=args.rate_limit_rate, malformed_rate=args.malformed_rate, seed=args.seed,
+                           requests_per_minute=args.server_rpm)
+    with server, tempfile.TemporaryDirectory() as directory:
+        configure_django(server.api_base, os.path.join(directory, 'benchmark.sqlite3'), args.workers, args.limiter_rpm,
+                         args.batch_size)
+        from apps.marketing.models import MarketingContent
+
+        print(f"{args.episodes} episodes x {len(PLATFORMS)} platforms, {args.workers} workers, "
+              f"{args.latency}s latency (sigma {args.latency_sigma}), {args.rate_limit_rate:.0%} 429s, "
+              f"{args.error_rate:.0%} errors, {args.malformed_rate:.0%} malformed")
+        print(f"{'scenario':>8} {'units':>6} {'failed':>6} {'wall s':>7} {'gen/s':>6} {'p50 s':>6} {'p95 s':>6} "
+              f"{'calls':>6} {'wasted':>6} {'429':>5} {'5xx':>5} {'malf':>5} {'dup rows':>8}")
+
+        for scenario in args.scenarios:
+            episodes = create_episodes(args.episodes, scenario)
+            requests_before, outcomes_before = server.requests, server.outcomes.copy()
+
+            started = time.perf_counter()
+            results, generations_per_unit, calls_per_unit = SCENARIOS[scenario](episodes, PLATFORMS, args.workers)
+            elapsed = time.perf_counter() - started
+
+            latencies = [latency for succeeded, latency in results if succeeded]
+            generations = len(latencies) * generations_per_unit
+            calls = server.requests - requests_before
+            outcomes = server.outcomes - outcomes_before
+            rows = MarketingContent.objects.filter(episode__in=episodes).count()
+            print(f"{scenario:>8} {len(results):>6} {len(results) - len(latencies):>6} {elapsed:>7.2f} "
+                  f"{generations / elapsed:>6.1f} {percentile(latencies, 50):>6.2f} {percentile(latencies, 95):>6.2f} "
+                  f"{calls:>6} {calls - len(latencies) * calls_per_unit:>6} {outcomes['rate_limited']:>5} {outcomes['error']:>5} "
+                  f"{outcomes['malformed']:>5} {rows - generations:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""
+Local stand-in for an OpenAI-compatible completion API, for benchmarks.
+
+Serves /chat/completions and /completions over keep-alive HTTP/1.1, sleeping before
+answering each request with a canned completion. Prompts asking for one key per
+platform get a JSON object holding a canned post for each platform they list. Latency is --latency seconds, or
+log-normally distributed around it with --latency-sigma. Streaming requests get their
+first chunk after --first-token-latency and the rest spread over the remaining latency.
+
+A share of requests can fail the way a real API does: --rate-limit-rate answers 429
+at once with a Retry-After header, --error-rate answers 500 after the latency, and
+--malformed-rate answers 200 with a JSON body cut off halfway. Outcomes are drawn from
+a seeded generator, so runs are reproducible. With --requests-per-minute, requests
+beyond that budget (with one second of burst) are refused with 429 and the exact
+Retry-After, like the real API.
+
+It also stands in for the batch API: JSONL files uploaded to /files are run by
+/batches jobs in the background, BATCH_PARALLELISM requests at a time each taking the
+sampled latency. Errors and malformed responses are injected per request, into the
+error file and as cut-off output lines; batch requests are never rate limited.
+
+Usage: python -m benchmarks.fake_llm_server [--port 8765] [--latency 0.5] [--latency-sigma 0.0]
+       [--first-token-latency 0.2] [--error-rate 0.0] [--rate-limit-rate 0.0] [--malformed-rate 0.0]
+       [--requests-per-minute 0]
+"""
+import argparse
+import email.parser
+import email.policy
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STREAM_CHUNK_CHARS = 8
+BATCH_PARALLELISM = 64
+CANNED_CONTENT = json.dumps({
+    "headline": "A new episode is out",
+    "main_content": "We talk about everything you need to know.",
+    "hashtags": ["#podcast", "#newepisode", "#listen"],
+    "cta": "Listen now",
+})
+CANNED_POST = "A new episode is out: we talk about everything you need to know. Listen now"
+
+
+def canned_content(prompt):
+    """Returns the canned completion of a prompt, with one section per platform for multi-platform prompts"""
+    if 'one key per platform' not in prompt:
+        return CANNED_CONTENT
+    # Platforms are listed one per line as "- name", optionally followed by ": limits"
+    platforms = [line.strip()[2:].split(':')[0].strip() for line in prompt.splitlines() if line.strip().startswith('- ')]
+    # Prompts asking for structured sections get the canned object, the others a plain post
+    section = json.loads(CANNED_CONTENT) if '"headline"' in prompt else CANNED_POST
+    return json.dumps({platform: section for platform in platforms})
+
+
+def request_prompt(request):
+    """Returns the prompt text of a completion or chat completion request"""
+    if 'messages' in request:
+        return '\n'.join(str(message.get('content', '')) for message in request['messages'])
+    prompt = request.get('prompt', '')
+    return prompt if isinstance(prompt, str) else '\n'.join(prompt)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if parts[:2] == ['v1', 'batches'] and len(parts) == 3 and parts[2] in self.server.batches:
+            with self.server.lock:
+                batch = self.server.batches[parts[2]]
+                batch = dict(batch, request_counts=dict(batch['request_counts']))
+            self.send_json(200, batch)
+        elif parts[:2] == ['v1', 'files'] and parts[3:] == ['content'] and parts[2] in self.server.files:
+            body = self.server.files[parts[2]]
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.path == '/v1/files':
+            self.upload_file(body)
+            return
+        request = json.loads(body or b'{}')
+        if self.path == '/v1/batches':
+            self.send_json(200, self.server.create_batch(request))
+            return
+        with self.server.lock:
+            self.server.requests += 1
+        if self.path not in ('/v1/chat/completions', '/v1/completions'):
+            self.send_error(404)
+            return
+
+        retry_after = self.server.admit()
+        outcome = 'rate_limited' if retry_after else self.server.draw_outcome()
+        if outcome == 'rate_limited':
+            self.send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                           {'Retry-After': f"{retry_after or self.server.retry_after:.3f}"})
+            return
+        latency = self.server.sample_latency()
+        if outcome == 'error':
+            time.sleep(latency)
+            self.send_json(500, {"error": {"message": "The server had an error", "type": "server_error"}})
+            return
+        if request.get('stream'):
+            try:
+                self.stream_completion(request, latency, outcome == 'malformed')
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped reading, e.g. a cancelled stream
+                self.close_connection = True
+            return
+
+        time.sleep(latency)
+        content = canned_content(request_prompt(request))
+        if self.path == '/v1/chat/completions':
+            choice = {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        else:
+            choice = {"index": 0, "text": content, "finish_reason": "stop"}
+        self.send_json(200, {"object": "completion", "model": request.get("model"), "choices": [choice]},
+                       truncate=outcome == 'malformed')
+
+    def upload_file(self, body):
+        # Multipart form with the 'purpose' and 'file' fields
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('ascii')
+        form = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+        fields = {part.get_param('name', header='content-disposition'): part for part in form.iter_parts()}
+        content = fields['file'].get_payload(decode=True)
+        file_id = self.server.store_file(content)
+        self.send_json(200, {'id': file_id, 'object': 'file', 'bytes': len(content),
+                             'filename': fields['file'].get_filename(), 'purpose': fields['purpose'].get_content()})
+
+    def stream_completion(self, request, latency, malformed=False):
+        pieces = [CANNED_CONTENT[start:start + STREAM_CHUNK_CHARS] for start in range(0, len(CANNED_CONTENT), STREAM_CHUNK_CHARS)]
+        first_token_latency = min(self.server.first_token_latency, latency)
+        interval = (latency - first_token_latency) / len(pieces)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        time.sleep(first_token_latency)
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(interval)
+            if self.path == '/v1/chat/completions':
+                choice = {"index": 0, "delta": {"content": piece}, "finish_reason": None}
+            else:
+                choice = {"index": 0, "text": piece, "finish_reason": None}
+            data = json.dumps({'model': request.get('model'), 'choices': [choice]})
+            if malformed and index == len(pieces) // 2:
+                data = data[:len(data) // 2]
+            self.write_chunk(f"data: {data}\n\n")
+        self.write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+
+    def send_json(self, status, payload, headers=None, truncate=False):
+        body = json.dumps(payload).encode('utf-8')
+        if truncate:
+            body = body[:len(body) // 2]
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """Threaded fake completion server; use as a context manager to serve in the background"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, port=0, latency=0.5, first_token_latency=0.2, latency_sigma=0.0, error_rate=0.0,
+                 rate_limit_rate=0.0, malformed_rate=0.0, retry_after=1.0, seed=0, requests_per_minute=0):
+        super().__init__(('127.0.0.1', port), FakeLLMHandler)
+        self.latency = latency
+        self.first_token_latency = first_token_latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        self.requests_per_minute = requests_per_minute
+        self.requests = 0
+        self.outcomes = Counter()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self._budget = None
+        self.files = {}
+        self.batches = {}
+        self._ids = itertools.count(1)
+
+    def admit(self):
+        """Takes one request from the per-minute budget; returns 0, or the seconds until one is available"""
+        if not self.requests_per_minute:
+            return 0
+        rate = self.requests_per_minute / 60
+        capacity = max(1.0, rate)
+        with self.lock:
+            now = time.monotonic()
+            level, updated = self._budget or (capacity, now)
+            level = min(capacity, level + (now - updated) * rate)
+            if level < 1:
+                self._budget = (level, now)
+                self.outcomes['rate_limited'] += 1
+                return (1 - level) / rate
+            self._budget = (level - 1, now)
+            return 0
+
+    def draw_outcome(self, rate_limits=True):
+        """Picks how to answer a request: 'ok', 'rate_limited', 'error' or 'malformed'"""
+        rate_limit_rate = self.rate_limit_rate if rate_limits else 0.0
+        with self.lock:
+            draw = self.random.random()
+            if draw < rate_limit_rate:
+                outcome = 'rate_limited'
+            elif draw < rate_limit_rate + self.error_rate:
+                outcome = 'error'
+            elif draw < rate_limit_rate + self.error_rate + self.malformed_rate:
+                outcome = 'malformed'
+            else:
+                outcome = 'ok'
+            self.outcomes[outcome] += 1
+        return outcome
+
+    def sample_latency(self):
+        """Returns the latency of one response, log-normal around self.latency when latency_sigma is set"""
+        if not self.latency_sigma:
+            return self.latency
+        with self.lock:
+            return self.latency * self.random.lognormvariate(0.0, self.latency_sigma)
+
+    def store_file(self, content):
+        """Keeps an uploaded or generated file and returns its ID"""
+        with self.lock:
+            file_id = f"file-{next(self._ids)}"
+            self.files[file_id] = content
+        return file_id
+
+    def create_batch(self, request):
+        """Starts a batch job over an uploaded JSONL file and returns its batch object"""
+        lines = [json.loads(line) for line in self.files[request['input_file_id']].splitlines() if line.strip()]
+        with self.lock:
+            batch = {
+                'id': f"batch-{next(self._ids)}",
+                'object': 'batch',
+                'endpoint': request['endpoint'],
+                'input_file_id': request['input_file_id'],
+                'completion_window': request.get('completion_window', '24h'),
+                'status': 'in_progress',
+                'output_file_id': None,
+                'error_file_id': None,
+                'request_counts': {'total': len(lines), 'completed': 0, 'failed': 0},
+            }
+            self.batches[batch['id']] = batch
+            created = dict(batch, request_counts=dict(batch['request_counts']))
+        threading.Thread(target=self.run_batch, args=(batch['id'], lines), daemon=True).start()
+        return created
+
+    def run_batch(self, batch_id, lines):
+        """Answers the requests of a batch job in waves, then publishes its output and error files"""
+        output, errors = [], []
+        for start in range(0, len(lines), BATCH_PARALLELISM):
+            wave = lines[start:start + BATCH_PARALLELISM]
+            time.sleep(self.sample_latency())
+            failed = 0
+            for line in wave:
+                with self.lock:
+                    self.requests += 1
+                outcome = self.draw_outcome(rate_limits=False)
+                result = {'id': f"batch_req_{next(self._ids)}", 'custom_id': line['custom_id'], 'error': None}
+                if outcome == 'error':
+                    failed += 1
+                    result['response'] = {'status_code': 500, 'body': {'error': {'message': 'The server had an error'}}}
+                    errors.append(json.dumps(result))
+                    continue
+                choice = {"index": 0, "text": CANNED_CONTENT, "finish_reason": "stop"}
+                result['response'] = {'status_code': 200, 'body': {'object': 'completion', 'choices': [choice],
+                                                                    'model': line['body'].get('model')}}
+                text = json.dumps(result)
+                output.append(text[:len(text) // 2] if outcome == 'malformed' else text)
+            with self.lock:
+                counts = self.batches[batch_id]['request_counts']
+                counts['completed'] += len(wave) - failed
+                counts['failed'] += failed
+
+        output_file_id = self.store_file(''.join(line + '\n' for line in output).encode('utf-8'))
+        error_file_id = self.store_file(''.join(line + '\n' for line in errors).encode('utf-8')) if errors else None
+        with self.lock:
+            self.batches[batch_id].update(status='completed', output_file_id=output_file_id, error_file_id=error_file_id)
+
+    @property
+    def api_base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--latency-sigma', type=float, default=0.0)
+    parser.add_argument('--first-token-latency', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    parser.add_argument('--requests-per-minute', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.port, args.latency, args.first_token_latency, args.latency_sigma, args.error_rate,
+                           args.rate_limit_rate, args.malformed_rate, seed=args.seed,
+                           requests_per_minute=args.requests_per_minute)
+    print(f"Serving fake completions at {server.api_base} with {args.latency}s latency")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Local stand-in for the publishing endpoints of the social platforms, for benchmarks.
+
+Serves the Facebook feed, Twitter v2 tweets, LinkedIn UGC posts and Instagram media
+endpoints over keep-alive HTTP/1.1, each under a prefix named after its platform, e.g.
+/facebook/me/feed. Every request sleeps for --latency seconds, or its platform's entry
+in platform_latencies, before answering with a new post ID, and --error-rate of them
+answer 500 instead. With --requests-per-minute, each platform admits requests like a
+token bucket holding one second of that budget, and answers the rest 429 with a
+Retry-After header, as the platforms throttle bursts. The server tracks how many
+requests were in flight at once, which shows whether a client really overlaps them.
+
+Usage: python -m benchmarks.fake_social_server [--port 8766] [--latency 0.2] [--error-rate 0.0]
+       [--requests-per-minute 0]
+"""
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PLATFORMS = ['facebook', 'twitter', 'linkedin', 'instagram']
+
+
+class FakeSocialHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        platform, _, path = self.path.lstrip('/').partition('/')
+        path = path.split('?')[0]
+        response = self.server.post_response(platform, path)
+        if response is None:
+            self.send_error(404)
+            return
+        retry_after = self.server.draw_throttle(platform)
+        if retry_after:
+            self.send_json(429, {'error': {'message': 'Rate limit exceeded'}}, {'Retry-After': f"{retry_after:.3f}"})
+            return
+
+        self.server.begin_request(platform)
+        try:
+            time.sleep(self.server.platform_latencies.get(platform, self.server.latency))
+            if self.server.draw_error():
+                self.send_json(500, {'error': {'message': 'An unexpected error has occurred'}})
+            else:
+                self.send_json(200, response)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, e.g. a post that timed out
+            self.close_connection = True
+        finally:
+            self.server.end_request()
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSocialServer(ThreadingHTTPServer):
+    """Threaded fake platform server; use as a context manager to serve in the background"""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, port=0, latency=0.2, error_rate=0.0, seed=0, platform_latencies=None, requests_per_minute=0):
+        super().__init__(('127.0.0.1', port), FakeSocialHandler)
+        self.latency = latency
+        self.platform_latencies = platform_latencies or {}
+        self.error_rate = error_rate
+        self.requests_per_minute = requests_per_minute
+        self.requests = Counter()
+        self.throttled = Counter()
+        self._buckets = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def post_response(self, platform, path):
+        """Returns the body answering a publishing request, or None for an unknown endpoint"""
+        post_id = next(self._ids)
+        parts = path.split('/')
+        if platform == 'facebook' and len(parts) == 2 and parts[1] == 'feed':
+            return {'id': f"{parts[0]}_{post_id}"}
+        if platform == 'twitter' and path == '2/tweets':
+            return {'data': {'id': str(post_id)}}
+        if platform == 'linkedin' and path == 'v2/ugcPosts':
+            return {'id': f"urn:li:share:{post_id}"}
+        if platform == 'instagram' and len(parts) == 2 and parts[1] in ('media', 'media_publish'):
+            return {'id': str(post_id)}
+        return None
+
+    def begin_request(self, platform):
+        with self.lock:
+            self.requests[platform] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def end_request(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def draw_throttle(self, platform):
+        """Takes a request from the platform's budget; returns the seconds until one is free if it is spent"""
+        if not self.requests_per_minute:
+            return 0.0
+        rate = self.requests_per_minute / 60
+        now = time.monotonic()
+        with self.lock:
+            level, updated = self._buckets.get(platform, (rate, now))
+            level = min(rate, level + (now - updated) * rate)
+            if level < 1:
+                self._buckets[platform] = (level, now)
+                self.throttled[platform] += 1
+                return (1 - level) / rate
+            self._buckets[platform] = (level - 1, now)
+            return 0.0
+
+    def reset(self):
+        """Refills every platform's budget and clears the throttling and in-flight counts"""
+        with self.lock:
+            self._buckets.clear()
+            self.throttled.clear()
+            self.max_in_flight = 0
+
+    def draw_error(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    @property
+    def api_bases(self):
+        """Base URL to configure for each platform, e.g. in settings.SOCIAL_API_BASES"""
+        return {platform: f"http://127.0.0.1:{self.server_address[1]}/{platform}" for platform in PLATFORMS}
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests-per-minute', type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeSocialServer(args.port, args.latency, args.error_rate, args.seed,
+                              requests_per_minute=args.requests_per_minute)
+    print(f"Serving fake platform endpoints at {server.api_bases['facebook'].rsplit('/', 1)[0]} "
+          f"with {args.latency}s latency")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
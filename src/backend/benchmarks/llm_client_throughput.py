@@ -0,0 +1,66 @@
+"""
+Measures generation throughput of one process against a local fake completion server.
+
+The baseline makes blocking calls one at a time on a new connection each, like a worker
+slot calling openai.ChatCompletion.create. LLMClient keeps up to --concurrency requests
+in flight over pooled connections, so throughput should grow with concurrency until the
+pool is saturated.
+
+Usage: python -m benchmarks.llm_client_throughput [--requests 64] [--latency 0.5] [--concurrency 1 8 32 64]
+"""
+import argparse
+import json
+import time
+import urllib.request
+
+from benchmarks.fake_llm_server import FakeLLMServer
+from services.llm_client import LLMClient
+
+MODEL = 'gpt-3.5-turbo'
+MESSAGES = [{"role": "user", "content": "Generate marketing content for a podcast episode."}]
+
+
+def blocking_call(api_base):
+    request = urllib.request.Request(
+        f"{api_base}/chat/completions",
+        data=json.dumps({"model": MODEL, "messages": MESSAGES}).encode('utf-8'),
+        headers={'Content-Type': 'application/json', 'Authorization': 'Bearer test'},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    with FakeLLMServer(latency=args.latency) as server:
+        print(f"{args.requests} requests, {args.latency}s server latency")
+        print(f"{'client':>16} {'wall s':>8} {'req/s':>8} {'speedup':>8}")
+
+        baseline_requests = min(args.requests, 8)
+        started = time.perf_counter()
+        for _ in range(baseline_requests):
+            blocking_call(server.api_base)
+        baseline = (time.perf_counter() - started) / baseline_requests * args.requests
+        print(f"{'blocking':>16} {baseline:>8.2f} {args.requests / baseline:>8.1f} {1:>7.1f}x")
+
+        for concurrency in args.concurrency:
+            client = LLMClient('test', api_base=server.api_base, max_concurrency=concurrency)
+            try:
+                started = time.perf_counter()
+                results = client.chat_completions(MODEL, [MESSAGES] * args.requests)
+                elapsed = time.perf_counter() - started
+            finally:
+                client.close()
+            failures = sum(isinstance(result, Exception) for result in results)
+            label = f"pooled x{concurrency}"
+            print(f"{label:>16} {elapsed:>8.2f} {args.requests / elapsed:>8.1f} {baseline / elapsed:>7.1f}x"
+                  + (f"  {failures} failed" if failures else ""))
+
+
+if __name__ == '__main__':
+    main()
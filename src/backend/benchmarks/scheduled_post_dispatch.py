@@ -0,0 +1,203 @@
+"""
+Measures how punctually scheduled posts are published by ScheduledPostDispatcher.
+
+Schedules --posts posts, spread evenly over --spread seconds starting --lead seconds
+from now and over the four platforms, in a throwaway SQLite database, then runs
+--dispatchers dispatcher processes side by side against it and local fake platform
+endpoints. Each count in --dispatchers is a separate round with fresh posts.
+
+For each round it reports how many posts were published, how many requests reached the
+platforms beyond one per post (Instagram posts make two) - any would be double posts -
+and the p50/p95/max lateness: seconds between a post's scheduled time and the moment a
+dispatcher started publishing it.
+
+SQLite stands in for PostgreSQL: it has no row locks, so the dispatchers queue on its
+single writer lock instead of skipping each other's rows, but claims stay exclusive.
+
+Usage: python -m benchmarks.scheduled_post_dispatch [--posts 2000] [--spread 10] [--lead 2]
+       [--dispatchers 1 4] [--latency 0.05] [--batch-size 500] [--lookahead 5] [--poll 1]
+"""
+import argparse
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+
+from benchmarks.fake_social_server import PLATFORMS, FakeSocialServer
+
+
+def configure_django(api_bases, database_path):
+    """
+    Sets up Django with the apps dispatching needs.
+
+    Args:
+        api_bases (dict): Base URL of each fake platform
+        database_path (str): SQLite database file, shared by all dispatcher processes
+    """
+    settings.configure(
+        INSTALLED_APPS=[
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'apps.authentication',
+            'apps.podcasts',
+            'apps.episodes',
+            'apps.social_media',
+        ],
+        AUTH_USER_MODEL='authentication.User',
+        # Transactions take the write lock up front, or two claims reading at once would deadlock
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': database_path,
+                               'OPTIONS': {'timeout': 30, 'transaction_mode': 'IMMEDIATE'}}},
+        USE_TZ=True,
+        SOCIAL_API_BASES=api_bases,
+        FACEBOOK_ACCESS_TOKEN='test', FACEBOOK_PAGE_ID='me',
+        TWITTER_OAUTH2_ACCESS_TOKEN='test',
+        LINKEDIN_ACCESS_TOKEN='test', LINKEDIN_AUTHOR_URN='urn:li:person:test',
+        INSTAGRAM_ACCESS_TOKEN='test', INSTAGRAM_ACCOUNT_ID='17841400000000000',
+        SOCIAL_PUBLISH_MAX_CONCURRENCY=64,
+        SOCIAL_PUBLISH_TIMEOUT_SECONDS=30.0,
+        SOCIAL_RATE_LIMITER_BACKEND='',
+        SOCIAL_DISPATCH_BATCH_SIZE=500,
+        SOCIAL_DISPATCH_LOOKAHEAD_SECONDS=5.0,
+        SOCIAL_DISPATCH_POLL_SECONDS=1.0,
+        SOCIAL_DISPATCH_CLAIM_TIMEOUT_SECONDS=600.0,
+    )
+    django.setup()
+
+
+def schedule_posts(count, lead, spread, label):
+    """
+    Creates scheduled posts of one episode, spread evenly over a time window.
+
+    Args:
+        count (int): Number of posts
+        lead (float): Seconds from now until the first post is due
+        spread (float): Seconds over which the posts are due
+        label (str): Distinguishes the posts of each round
+
+    Returns:
+        datetime: When the last post is due
+    """
+    from django.utils import timezone
+
+    from apps.authentication.models import User
+    from apps.episodes.models import Episode
+    from apps.podcasts.models import Podcast
+    from apps.social_media.models import SocialMediaPost
+
+    user = User.objects.create(email=f"{label}@example.com")
+    podcast = Podcast.objects.create(title=f"{label} podcast", description="Benchmark podcast",
+                                     cover_image_url="https://example.com/cover.png", user=user)
+    episode = Episode.objects.create(podcast=podcast, title=f"{label} episode", description="Growing an audience",
+                                     audio_file_url="https://example.com/a.mp3")
+    first = timezone.now() + timedelta(seconds=lead)
+    SocialMediaPost.objects.bulk_create([
+        SocialMediaPost(episode=episode, platform=PLATFORMS[index % len(PLATFORMS)], content=f"New episode #{index}",
+                        media_url='https://example.com/episode.jpg', status='scheduled',
+                        scheduled_time=first + timedelta(seconds=spread * index / count))
+        for index in range(count)
+    ], batch_size=500)
+    return first + timedelta(seconds=spread)
+
+
+def run_dispatcher(api_bases, database_path, options, until, results):
+    """Runs one dispatcher process until a wall-clock time, then reports its stats and lateness"""
+    import asyncio
+
+    configure_django(api_bases, database_path)
+    # Failures are counted in the table; their log lines would bury it
+    logging.disable(logging.ERROR)
+
+    from services.post_dispatcher import ScheduledPostDispatcher
+    from services.social_publishing import get_publishing_client
+
+    dispatcher = ScheduledPostDispatcher(**options)
+
+    async def dispatch():
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(max(0.0, until - time.time()), stop.set)
+        try:
+            await dispatcher.run(stop)
+        finally:
+            await get_publishing_client().close()
+
+    asyncio.run(dispatch())
+    results.put((dispatcher.get_stats(), list(dispatcher.lateness)))
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--spread', type=float, default=10.0)
+    parser.add_argument('--lead', type=float, default=2.0)
+    parser.add_argument('--dispatchers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--lookahead', type=float, default=5.0)
+    parser.add_argument('--poll', type=float, default=1.0)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    options = {'batch_size': args.batch_size, 'lookahead_seconds': args.lookahead, 'poll_seconds': args.poll}
+    with FakeSocialServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'benchmark.sqlite3')
+        configure_django(server.api_bases, database_path)
+        from django.core.management import call_command
+        from django.db import connection, connections
+
+        from apps.social_media.models import SocialMediaPost
+
+        call_command('migrate', run_syncdb=True, verbosity=0)
+        with connection.cursor() as cursor:
+            # Lets the dispatchers read while one of them writes
+            cursor.execute('PRAGMA journal_mode=WAL')
+
+        print(f"{args.posts} posts due over {args.spread}s, {args.latency}s platform latency, batches of "
+              f"{args.batch_size}, {args.lookahead}s lookahead, {args.poll}s poll")
+        print(f"{'dispatchers':>11} {'posts':>6} {'published':>9} {'failed':>6} {'extra reqs':>10} "
+              f"{'p50 late s':>10} {'p95 late s':>10} {'max late s':>10}")
+
+        for count in args.dispatchers:
+            last_due = schedule_posts(args.posts, args.lead, args.spread, f"round-{count}")
+            requests_before = sum(server.requests.values())
+            connections.close_all()
+
+            results = context.Queue()
+            until = last_due.timestamp() + 2.0
+            processes = [
+                context.Process(target=run_dispatcher, args=(
+                    server.api_bases, database_path, dict(options, name=f"dispatcher-{index}"), until, results))
+                for index in range(count)
+            ]
+            for process in processes:
+                process.start()
+            reports = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+            published = sum(stats['published'] for stats, _ in reports)
+            failed = sum(stats['failed'] for stats, _ in reports)
+            lateness = [seconds for _, samples in reports for seconds in samples]
+            expected = args.posts + args.posts // len(PLATFORMS)
+            extra = sum(server.requests.values()) - requests_before - expected
+            rows = SocialMediaPost.objects.filter(episode__title=f"round-{count} episode", status='published').count()
+            assert rows == published, f"{rows} rows published but dispatchers report {published}"
+            print(f"{count:>11} {args.posts:>6} {published:>9} {failed:>6} {extra:>10} "
+                  f"{percentile(lateness, 50):>10.3f} {percentile(lateness, 95):>10.3f} {max(lateness, default=0):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Measures concurrent social publishing against local fake platform endpoints.
+
+Publishes --posts posts, spread over the four platforms, from a single event loop
+with every post started at once, through three clients:
+
+  blocking  each request made synchronously inside the coroutine, as the SDK calls in
+            SocialMediaIntegrationService did: the loop stalls, so posts run one by one
+  executor  the same synchronous requests handed to a ThreadPoolExecutor of --workers
+            threads, the minimal fix that leaves the SDKs in place
+  engine    the shared non-blocking PublishingClient, up to --concurrency requests in
+            flight on one connection pool
+  limited   the same client waiting on an in-memory SocialRateLimiter, which budgets
+            --limiter-rpm requests per minute to each platform
+
+With --server-rpm, the fake platforms answer 429 to requests beyond that budget, as the
+real ones throttle bursts from many workers. Instagram posts make two requests (media
+container, then publish). For each client it reports throughput, p50/p95 latency per
+post, the requests refused with 429, and the most requests the server saw in flight at
+once; for the limited client, how many requests waited for capacity and for how long.
+
+Usage: python -m benchmarks.social_publishing_throughput [--posts 200] [--latency 0.2]
+       [--workers 8] [--concurrency 64] [--server-rpm 0] [--limiter-rpm 0]
+       [--clients blocking executor engine limited]
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from benchmarks.fake_social_server import PLATFORMS, FakeSocialServer
+
+
+def blocking_request(platform, method, url, data=None, json_body=None, headers=None):
+    """Sends one request synchronously, like the platform SDKs, and returns the decoded response"""
+    from services.social_publishing import PublishError
+
+    headers = dict(headers or {})
+    if json_body is not None:
+        body = json.dumps(json_body).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    else:
+        body = urllib.parse.urlencode(data or {}).encode('utf-8')
+    request = urllib.request.Request(url, data=body, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        raise PublishError(platform, e.code, e.read().decode('utf-8', 'replace'))
+
+
+class BlockingClient:
+    """Makes each request synchronously inside the coroutine, blocking the event loop"""
+
+    async def request(self, platform, method, url, account=None, json=None, **kwargs):
+        return blocking_request(platform, method, url, json_body=json, **kwargs)
+
+    async def close(self):
+        pass
+
+
+class ExecutorClient:
+    """Runs each synchronous request on a bounded thread pool, so the event loop stays free"""
+
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(workers)
+
+    async def request(self, platform, method, url, account=None, json=None, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, lambda: blocking_request(platform, method, url, json_body=json, **kwargs))
+
+    async def close(self):
+        self.executor.shutdown()
+
+
+def make_client(name, args):
+    """Builds the client a scenario publishes with"""
+    from services.social_publishing import PublishingClient
+    from services.social_rate_limiter import InMemorySocialRateLimiter
+
+    if name == 'blocking':
+        return BlockingClient()
+    if name == 'executor':
+        return ExecutorClient(args.workers)
+    if name == 'limited':
+        # The fake platforms admit one second of their budget at once, so the limiter bursts no more
+        limits = {platform: {'requests_per_minute': args.limiter_rpm} for platform in PLATFORMS}
+        return PublishingClient(max_concurrency=args.concurrency,
+                                rate_limiter=InMemorySocialRateLimiter(limits, burst_seconds=1.0))
+    return PublishingClient(max_concurrency=args.concurrency)
+
+
+async def publish_all(client, posts):
+    """
+    Publishes every post concurrently from the running event loop.
+
+    Returns:
+        list: (succeeded, latency) of each post
+    """
+    from services.social_publishing import get_publisher
+
+    async def publish(platform, content):
+        started = time.perf_counter()
+        try:
+            await get_publisher(platform, client=client).publish(content, 'https://example.com/episode.jpg')
+            succeeded = True
+        except Exception:
+            succeeded = False
+        return succeeded, time.perf_counter() - started
+
+    try:
+        return await asyncio.gather(*(publish(platform, content) for platform, content in posts))
+    finally:
+        await client.close()
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+CLIENTS = ['blocking', 'executor', 'engine', 'limited']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--server-rpm', type=int, default=0, help='Requests per minute each fake platform admits')
+    parser.add_argument('--limiter-rpm', type=int, default=0, help='Defaults to 90%% of --server-rpm')
+    parser.add_argument('--clients', nargs='+', choices=CLIENTS, default=CLIENTS)
+    args = parser.parse_args()
+    args.limiter_rpm = args.limiter_rpm or int(args.server_rpm * 0.9)
+
+    with FakeSocialServer(latency=args.latency, requests_per_minute=args.server_rpm) as server:
+        settings.configure(
+            SOCIAL_API_BASES=server.api_bases,
+            FACEBOOK_ACCESS_TOKEN='test', FACEBOOK_PAGE_ID='me',
+            TWITTER_OAUTH2_ACCESS_TOKEN='test',
+            LINKEDIN_ACCESS_TOKEN='test', LINKEDIN_AUTHOR_URN='urn:li:person:test',
+            INSTAGRAM_ACCESS_TOKEN='test', INSTAGRAM_ACCOUNT_ID='17841400000000000',
+        )
+        posts = [(PLATFORMS[index % len(PLATFORMS)], f"New episode out now #{index}") for index in range(args.posts)]
+
+        print(f"{args.posts} posts over {len(PLATFORMS)} platforms, {args.latency}s latency, "
+              f"{args.workers} executor workers, {args.concurrency} engine connections, "
+              f"{args.server_rpm or 'unlimited'} server rpm, {args.limiter_rpm or 'unlimited'} limiter rpm")
+        print(f"{'client':>9} {'posts':>6} {'failed':>6} {'wall s':>7} {'posts/s':>8} {'p50 s':>6} {'p95 s':>6} "
+              f"{'429s':>5} {'in flight':>9} {'waited':>6} {'avg wait s':>10}")
+
+        for name in args.clients:
+            server.reset()
+            client = make_client(name, args)
+            started = time.perf_counter()
+            results = asyncio.run(publish_all(client, posts))
+            elapsed = time.perf_counter() - started
+
+            latencies = [latency for succeeded, latency in results if succeeded]
+            waited, average_wait = '-', '-'
+            if getattr(client, 'rate_limiter', None) is not None:
+                metrics = client.rate_limiter.get_metrics().values()
+                waited = sum(platform['waited'] for platform in metrics)
+                average_wait = f"{sum(platform['wait_seconds_total'] for platform in metrics) / max(1, waited):.2f}"
+            print(f"{name:>9} {len(results):>6} {len(results) - len(latencies):>6} {elapsed:>7.2f} "
+                  f"{len(latencies) / elapsed:>8.1f} {percentile(latencies, 50):>6.2f} {percentile(latencies, 95):>6.2f} "
+                  f"{sum(server.throttled.values()):>5} {server.max_in_flight:>9} {waited:>6} {average_wait:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Measures what constructing SocialMediaIntegrationService costs a view or task.
+
+The platform SDKs are replaced by stand-ins that take --setup-latency seconds to create
+a client, and --login-latency seconds for the Instagram login, which is a real network
+round trip in instagram_private_api. Each scenario constructs the service --iterations
+times, as that many requests or task runs would:
+
+  eager     every platform client created in the constructor, as it used to be
+  lazy      the constructor alone, as the service is now
+  lazy+use  the constructor, then the publisher of one platform, which posts over the
+            connection pool shared by every service in the process and logs in to nothing
+
+For each scenario it reports the total and per-construction time, and how many clients
+were created and logged in.
+
+Usage: python -m benchmarks.social_service_startup [--iterations 100] [--setup-latency 0.02]
+       [--login-latency 0.5] [--platform twitter]
+"""
+import argparse
+import sys
+import time
+import types
+from collections import Counter
+
+from django.conf import settings
+
+created = Counter()
+
+
+def install_fake_sdks(setup_latency, login_latency):
+    """Registers stand-ins for the platform SDK modules that only take time to create their clients"""
+    def client(name, latency):
+        def __init__(self, *args, **kwargs):
+            time.sleep(latency)
+            created[name] += 1
+        return type(name, (), {'__init__': __init__})
+
+    facebook = types.ModuleType('facebook')
+    facebook.GraphAPI = client('facebook', setup_latency)
+    tweepy = types.ModuleType('tweepy')
+    tweepy.OAuthHandler = type('OAuthHandler', (), {'__init__': lambda self, *args: None,
+                                                    'set_access_token': lambda self, *args: None})
+    tweepy.API = client('twitter', setup_latency)
+    linkedin_package = types.ModuleType('linkedin')
+    linkedin_package.linkedin = types.ModuleType('linkedin.linkedin')
+    linkedin_package.linkedin.LinkedInApplication = client('linkedin', setup_latency)
+    instagram = types.ModuleType('instagram_private_api')
+    instagram.Client = client('instagram', setup_latency + login_latency)
+    sys.modules.update({
+        'facebook': facebook,
+        'tweepy': tweepy,
+        'linkedin': linkedin_package,
+        'linkedin.linkedin': linkedin_package.linkedin,
+        'instagram_private_api': instagram,
+    })
+
+
+def construct_eager():
+    """Constructs the service and creates every platform client, as the constructor used to"""
+    import facebook
+    import tweepy
+    from instagram_private_api import Client as InstagramAPI
+    from linkedin import linkedin
+    from services.social_media_integration import SocialMediaIntegrationService
+
+    service = SocialMediaIntegrationService()
+    auth = tweepy.OAuthHandler(settings.TWITTER_CONSUMER_KEY, settings.TWITTER_CONSUMER_SECRET)
+    auth.set_access_token(settings.TWITTER_ACCESS_TOKEN, settings.TWITTER_ACCESS_TOKEN_SECRET)
+    service.platform_apis = {
+        'facebook': facebook.GraphAPI(access_token=settings.FACEBOOK_ACCESS_TOKEN),
+        'twitter': tweepy.API(auth),
+        'linkedin': linkedin.LinkedInApplication(token=settings.LINKEDIN_ACCESS_TOKEN),
+        'instagram': InstagramAPI(username=settings.INSTAGRAM_USERNAME, password=settings.INSTAGRAM_PASSWORD),
+    }
+    return service
+
+
+def construct_lazy():
+    from services.social_media_integration import SocialMediaIntegrationService
+
+    return SocialMediaIntegrationService()
+
+
+def construct_and_get_publisher(platform):
+    """Constructs the service, then the publisher a post to the platform goes through"""
+    from services.social_publishing import get_publisher
+
+    construct_lazy()
+    return get_publisher(platform)
+
+
+SCENARIOS = {
+    'eager': lambda platform: construct_eager(),
+    'lazy': lambda platform: construct_lazy(),
+    'lazy+use': construct_and_get_publisher,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--setup-latency', type=float, default=0.02)
+    parser.add_argument('--login-latency', type=float, default=0.5)
+    parser.add_argument('--platform', default='twitter')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    install_fake_sdks(args.setup_latency, args.login_latency)
+    settings.configure(
+        FACEBOOK_ACCESS_TOKEN='test',
+        TWITTER_CONSUMER_KEY='test', TWITTER_CONSUMER_SECRET='test',
+        TWITTER_ACCESS_TOKEN='test', TWITTER_ACCESS_TOKEN_SECRET='test',
+        LINKEDIN_ACCESS_TOKEN='test',
+        INSTAGRAM_USERNAME='test', INSTAGRAM_PASSWORD='test',
+        FACEBOOK_PAGE_ID='me', TWITTER_OAUTH2_ACCESS_TOKEN='test', LINKEDIN_AUTHOR_URN='urn:li:person:test',
+        INSTAGRAM_ACCESS_TOKEN='test', INSTAGRAM_ACCOUNT_ID='test',
+        SOCIAL_API_BASES={}, SOCIAL_PUBLISH_MAX_CONCURRENCY=64, SOCIAL_PUBLISH_TIMEOUT_SECONDS=30.0,
+        SOCIAL_RATE_LIMITER_BACKEND='',
+        INSTALLED_APPS=['django.contrib.auth', 'django.contrib.contenttypes', 'apps.authentication',
+                        'apps.podcasts', 'apps.episodes', 'apps.social_media'],
+        AUTH_USER_MODEL='authentication.User',
+    )
+    import django
+
+    django.setup()
+
+    print(f"{args.iterations} constructions, {args.setup_latency}s per client, "
+          f"{args.login_latency}s Instagram login")
+    print(f"{'scenario':>9} {'total s':>8} {'per call ms':>11} {'clients':>7} {'logins':>6}")
+    for name in args.scenarios:
+        created.clear()
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            SCENARIOS[name](args.platform)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>9} {elapsed:>8.3f} {elapsed / args.iterations * 1000:>11.3f} "
+              f"{sum(created.values()):>7} {created['instagram']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Measures peak memory of the transcription pipeline for growing audio sizes.
+
+Compares loading the whole object before recognition with streaming it in ranged
+chunks. Streamed peak memory should stay flat as the file grows.
+
+Usage: python -m benchmarks.transcription_memory [--sizes-mb 32 128 300] [--workers 8]
+"""
+import argparse
+import tracemalloc
+
+from services.recognizers import LocalRecognizer
+from services.transcription_pipeline import SAMPLE_RATE_HERTZ, ChunkedTranscriptionPipeline
+
+# Matches services.storage.STREAM_CHUNK_SIZE, which cannot be imported without S3 credentials
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def synthetic_chunks(total_bytes, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Simulates ranged reads of a silent LINEAR16 object without materializing it.
+
+    Args:
+        total_bytes (int): Size of the simulated object
+        chunk_size (int): Size of each ranged read
+
+    Yields:
+        bytes: Consecutive chunks of the object
+    """
+    for start in range(0, total_bytes, chunk_size):
+        yield bytes(min(chunk_size, total_bytes - start))
+
+
+def measure_peak(run):
+    """
+    Runs a callable under tracemalloc and returns its peak traced allocation in MB.
+    """
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[32, 128, 300])
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    pipeline = ChunkedTranscriptionPipeline(LocalRecognizer(), max_workers=args.workers)
+
+    print(f"{'size MB':>8} {'audio min':>10} {'loaded peak MB':>15} {'streamed peak MB':>17}")
+    for size_mb in args.sizes_mb:
+        total_bytes = size_mb * 1024 * 1024
+        loaded = measure_peak(lambda: pipeline.transcribe(b''.join(synthetic_chunks(total_bytes)), SAMPLE_RATE_HERTZ))
+        streamed = measure_peak(lambda: pipeline.transcribe_stream(synthetic_chunks(total_bytes), SAMPLE_RATE_HERTZ))
+        minutes = total_bytes / (SAMPLE_RATE_HERTZ * 2) / 60
+        print(f"{size_mb:>8} {minutes:>10.1f} {loaded:>15.1f} {streamed:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Measures transcription wall-clock time against worker count with the local recognizer.
+
+The local engine spends latency plus real_time_factor seconds per second of audio on
+every window, so it behaves like a remote engine without needing one. Wall-clock time
+should fall roughly in proportion to the number of workers.
+
+Usage: python -m benchmarks.transcription_throughput [--minutes 60] [--workers 1 2 4 8 16]
+"""
+import argparse
+import time
+
+from services.recognizers import LocalRecognizer
+from services.transcription_pipeline import SAMPLE_RATE_HERTZ, SAMPLE_WIDTH_BYTES, ChunkedTranscriptionPipeline
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def synthetic_chunks(total_bytes, chunk_size=CHUNK_SIZE):
+    """
+    Simulates ranged reads of a silent LINEAR16 object without materializing it.
+
+    Args:
+        total_bytes (int): Size of the simulated object
+        chunk_size (int): Size of each ranged read
+
+    Yields:
+        bytes: Consecutive chunks of the object
+    """
+    for start in range(0, total_bytes, chunk_size):
+        yield bytes(min(chunk_size, total_bytes - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=float, default=60.0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--real-time-factor', type=float, default=0.005)
+    parser.add_argument('--latency', type=float, default=0.1)
+    args = parser.parse_args()
+
+    recognizer = LocalRecognizer(real_time_factor=args.real_time_factor, latency=args.latency)
+    total_bytes = int(args.minutes * 60 * SAMPLE_RATE_HERTZ) * SAMPLE_WIDTH_BYTES
+
+    print(f"{args.minutes:.0f} min of audio, rtf={args.real_time_factor}, latency={args.latency}s")
+    print(f"{'workers':>8} {'wall s':>8} {'speedup':>8} {'words':>7}")
+    baseline = None
+    for workers in args.workers:
+        pipeline = ChunkedTranscriptionPipeline(recognizer, max_workers=workers)
+        started = time.perf_counter()
+        result = pipeline.transcribe_stream(synthetic_chunks(total_bytes), SAMPLE_RATE_HERTZ)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x {len(result['words']):>7}")
+
+
+if __name__ == '__main__':
+    main()
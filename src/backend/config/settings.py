@@ -118,6 +118,80 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Redis settings
+REDIS_URL = env('REDIS_URL', default='redis://localhost:6379/1')
+
+# Cache settings
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+}
+
+# Transcription settings
+TRANSCRIPTION_RECOGNIZER = env('TRANSCRIPTION_RECOGNIZER', default='google')
+TRANSCRIPTION_RECOGNIZER_OPTIONS = env.json('TRANSCRIPTION_RECOGNIZER_OPTIONS', default={})
+TRANSCRIPTION_MAX_WORKERS = env.int('TRANSCRIPTION_MAX_WORKERS', default=8)
+TRANSCRIPTION_WINDOW_SECONDS = env.float('TRANSCRIPTION_WINDOW_SECONDS', default=55.0)
+TRANSCRIPTION_OVERLAP_SECONDS = env.float('TRANSCRIPTION_OVERLAP_SECONDS', default=2.0)
+TRANSCRIPTION_TRIM_SILENCE = env.bool('TRANSCRIPTION_TRIM_SILENCE', default=True)
+TRANSCRIPTION_SILENCE_THRESHOLD_DB = env.float('TRANSCRIPTION_SILENCE_THRESHOLD_DB', default=-45.0)
+TRANSCRIPTION_MIN_SILENCE_SECONDS = env.float('TRANSCRIPTION_MIN_SILENCE_SECONDS', default=2.0)
+TRANSCRIPTION_BATCH_MAX_CONCURRENCY = env.int('TRANSCRIPTION_BATCH_MAX_CONCURRENCY', default=10)
+TRANSCRIPTION_STATUS_STORE = env('TRANSCRIPTION_STATUS_STORE', default='redis')
+
+# Content generation settings
+OPENAI_API_KEY = env('OPENAI_API_KEY', default='')
+LLM_API_BASE = env('LLM_API_BASE', default='https://api.openai.com/v1')
+LLM_MAX_CONCURRENCY = env.int('LLM_MAX_CONCURRENCY', default=32)
+LLM_TIMEOUT_SECONDS = env.float('LLM_TIMEOUT_SECONDS', default=60.0)
+LLM_RATE_LIMITER_BACKEND = env('LLM_RATE_LIMITER_BACKEND', default='redis')  # Empty to disable
+LLM_REQUESTS_PER_MINUTE = env.int('LLM_REQUESTS_PER_MINUTE', default=3500)
+LLM_TOKENS_PER_MINUTE = env.int('LLM_TOKENS_PER_MINUTE', default=90000)
+LLM_RATE_LIMIT_BURST_SECONDS = env.float('LLM_RATE_LIMIT_BURST_SECONDS', default=1.0)
+CONTENT_GENERATION_MODEL = env('CONTENT_GENERATION_MODEL', default='gpt-3.5-turbo-instruct')
+CONTENT_GENERATION_BATCH_SIZE = env.int('CONTENT_GENERATION_BATCH_SIZE', default=500)  # Requests per batch job
+CONTENT_GENERATION_BATCH_POLL_SECONDS = env.float('CONTENT_GENERATION_BATCH_POLL_SECONDS', default=60.0)
+CONTENT_GENERATION_BATCH_COMPLETION_WINDOW = env('CONTENT_GENERATION_BATCH_COMPLETION_WINDOW', default='24h')
+TRANSCRIPT_BRIEF_STRATEGY = env('TRANSCRIPT_BRIEF_STRATEGY', default='extractive')
+TRANSCRIPT_CONDENSATION_MODEL = env('TRANSCRIPT_CONDENSATION_MODEL', default='gpt-3.5-turbo')
+TRANSCRIPT_BRIEF_MAX_TOKENS = env.int('TRANSCRIPT_BRIEF_MAX_TOKENS', default=400)
+TRANSCRIPT_CHUNK_TOKENS = env.int('TRANSCRIPT_CHUNK_TOKENS', default=2500)
+TRANSCRIPT_BRIEF_CACHE_TIMEOUT = env.int('TRANSCRIPT_BRIEF_CACHE_TIMEOUT', default=30 * 24 * 60 * 60)
+
+# Social media settings
+FACEBOOK_ACCESS_TOKEN = env('FACEBOOK_ACCESS_TOKEN', default='')
+FACEBOOK_PAGE_ID = env('FACEBOOK_PAGE_ID', default='me')
+TWITTER_CONSUMER_KEY = env('TWITTER_CONSUMER_KEY', default='')
+TWITTER_CONSUMER_SECRET = env('TWITTER_CONSUMER_SECRET', default='')
+TWITTER_ACCESS_TOKEN = env('TWITTER_ACCESS_TOKEN', default='')
+TWITTER_ACCESS_TOKEN_SECRET = env('TWITTER_ACCESS_TOKEN_SECRET', default='')
+TWITTER_OAUTH2_ACCESS_TOKEN = env('TWITTER_OAUTH2_ACCESS_TOKEN', default='')  # User-context token for the v2 API
+LINKEDIN_ACCESS_TOKEN = env('LINKEDIN_ACCESS_TOKEN', default='')
+LINKEDIN_AUTHOR_URN = env('LINKEDIN_AUTHOR_URN', default='')
+INSTAGRAM_USERNAME = env('INSTAGRAM_USERNAME', default='')
+INSTAGRAM_PASSWORD = env('INSTAGRAM_PASSWORD', default='')
+INSTAGRAM_ACCOUNT_ID = env('INSTAGRAM_ACCOUNT_ID', default='')
+INSTAGRAM_ACCESS_TOKEN = env('INSTAGRAM_ACCESS_TOKEN', default='')
+SOCIAL_API_BASES = env.json('SOCIAL_API_BASES', default={})  # Per-platform API base URL overrides
+SOCIAL_PUBLISH_MAX_CONCURRENCY = env.int('SOCIAL_PUBLISH_MAX_CONCURRENCY', default=64)
+SOCIAL_PUBLISH_TIMEOUT_SECONDS = env.float('SOCIAL_PUBLISH_TIMEOUT_SECONDS', default=30.0)
+SOCIAL_PUBLISH_PLATFORM_TIMEOUTS = env.json('SOCIAL_PUBLISH_PLATFORM_TIMEOUTS', default={})  # Per-platform overrides
+SOCIAL_RATE_LIMITER_BACKEND = env('SOCIAL_RATE_LIMITER_BACKEND', default='redis')  # Empty to disable
+# Requests per minute for the app and for each connected account; a missing or zero budget is not limited
+SOCIAL_RATE_LIMITS = env.json('SOCIAL_RATE_LIMITS', default={
+    'facebook': {'requests_per_minute': 200, 'account_requests_per_minute': 60},
+    'twitter': {'requests_per_minute': 100, 'account_requests_per_minute': 13},
+    'linkedin': {'requests_per_minute': 100, 'account_requests_per_minute': 10},
+    'instagram': {'requests_per_minute': 100, 'account_requests_per_minute': 3},
+})
+SOCIAL_RATE_LIMIT_BURST_SECONDS = env.float('SOCIAL_RATE_LIMIT_BURST_SECONDS', default=10.0)
+SOCIAL_DISPATCH_BATCH_SIZE = env.int('SOCIAL_DISPATCH_BATCH_SIZE', default=500)  # Scheduled posts claimed at once
+SOCIAL_DISPATCH_LOOKAHEAD_SECONDS = env.float('SOCIAL_DISPATCH_LOOKAHEAD_SECONDS', default=5.0)
+SOCIAL_DISPATCH_POLL_SECONDS = env.float('SOCIAL_DISPATCH_POLL_SECONDS', default=1.0)
+SOCIAL_DISPATCH_CLAIM_TIMEOUT_SECONDS = env.float('SOCIAL_DISPATCH_CLAIM_TIMEOUT_SECONDS', default=600.0)
+
 # Logging configuration
 LOGGING = {
     'version': 1,
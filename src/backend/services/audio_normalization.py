@@ -0,0 +1,412 @@
+import logging
+import wave
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from .transcription_pipeline import SAMPLE_RATE_HERTZ, SAMPLE_WIDTH_BYTES, open_wav_stream
+
+logger = logging.getLogger(__name__)
+
+# Global constants
+BLOCK_FRAMES = 256 * 1024  # Input frames decoded and processed at a time
+FRAME_SECONDS = 0.03  # Analysis frame used for silence detection
+SILENCE_THRESHOLD_DB = -45.0
+MIN_SILENCE_SECONDS = 2.0
+SILENCE_PADDING_SECONDS = 0.25
+NORMALIZATION_VERSION = 1  # Bump whenever the output of the normalizer changes
+
+INT_SAMPLE_FORMATS = {2: '<i2', 4: '<i4'}
+
+
+def decode_samples(frames: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """
+    Decodes interleaved PCM frames to float32 samples in [-1, 1)
+
+    Args:
+        frames (bytes): Whole PCM frames
+        sample_width (int): Bytes per sample, 1 (unsigned) or 2, 3, 4 (signed)
+        channels (int): Number of interleaved channels
+
+    Returns:
+        np.ndarray: Array of shape (frame_count, channels)
+    """
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values -= (values & 0x800000) << 1  # Sign-extend the 24-bit values
+        samples = values.astype(np.float32) / float(1 << 23)
+    elif sample_width in INT_SAMPLE_FORMATS:
+        scale = float(1 << (8 * sample_width - 1))
+        samples = np.frombuffer(frames, dtype=INT_SAMPLE_FORMATS[sample_width]).astype(np.float32) / scale
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width} bytes")
+    return samples.reshape(-1, channels)
+
+
+def read_audio_blocks(chunks: Iterable[bytes], sample_rate: int = SAMPLE_RATE_HERTZ,
+                      block_frames: int = BLOCK_FRAMES) -> Tuple[Iterator[np.ndarray], int]:
+    """
+    Decodes a stream of WAV or headerless LINEAR16 mono chunks into blocks of float samples
+
+    Args:
+        chunks (Iterable[bytes]): WAV file bytes or raw LINEAR16 mono PCM, in order
+        sample_rate (int): Sample rate assumed for headerless PCM
+        block_frames (int): Frames decoded per block
+
+    Returns:
+        tuple: An iterator of (frame_count, channels) float32 arrays and their sample rate
+    """
+    wav_file, pcm_chunks = open_wav_stream(chunks)
+
+    if wav_file is None:
+        def pcm_blocks():
+            pending = b''
+            for chunk in pcm_chunks:
+                pending += chunk
+                size = len(pending) - len(pending) % SAMPLE_WIDTH_BYTES
+                if size >= block_frames * SAMPLE_WIDTH_BYTES:
+                    yield decode_samples(pending[:size], SAMPLE_WIDTH_BYTES, 1)
+                    pending = pending[size:]
+            size = len(pending) - len(pending) % SAMPLE_WIDTH_BYTES
+            if size:
+                yield decode_samples(pending[:size], SAMPLE_WIDTH_BYTES, 1)
+
+        return pcm_blocks(), sample_rate
+
+    def wav_blocks():
+        with wav_file:
+            sample_width, channels = wav_file.getsampwidth(), wav_file.getnchannels()
+            for frames in iter(lambda: wav_file.readframes(block_frames), b''):
+                yield decode_samples(frames, sample_width, channels)
+
+    return wav_blocks(), wav_file.getframerate()
+
+
+class LinearResampler:
+    """
+    Streaming sample-rate converter using linear interpolation
+
+    When downsampling, a moving average as wide as the rate ratio is applied first to
+    attenuate content above the new Nyquist frequency.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int = SAMPLE_RATE_HERTZ):
+        """
+        Initializes the resampler
+
+        Args:
+            source_rate (int): Sample rate of the input
+            target_rate (int): Sample rate of the output
+        """
+        if source_rate <= 0 or target_rate <= 0:
+            raise ValueError("Sample rates must be positive")
+        self.step = source_rate / target_rate
+        self.filter_width = int(round(self.step)) if self.step > 1 else 1
+        self.filter_history = np.zeros(self.filter_width - 1, dtype=np.float32)
+        self.tail = np.zeros(0, dtype=np.float32)  # Input samples still needed for interpolation
+        self.position = 0.0  # Index in tail + block of the next output sample
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resamples the next block of a mono stream
+
+        Args:
+            samples (np.ndarray): Consecutive float32 input samples
+
+        Returns:
+            np.ndarray: The output samples that can be produced so far
+        """
+        if self.step == 1:
+            return samples
+
+        if self.filter_width > 1:
+            padded = np.concatenate([self.filter_history, samples])
+            self.filter_history = padded[len(padded) - (self.filter_width - 1):]
+            cumulative = np.concatenate([[0.0], np.cumsum(padded, dtype=np.float64)])
+            samples = ((cumulative[self.filter_width:] - cumulative[:-self.filter_width]) / self.filter_width).astype(np.float32)
+
+        buffer = np.concatenate([self.tail, samples])
+        last = len(buffer) - 1
+        if last < self.position:
+            self.tail = buffer
+            return np.zeros(0, dtype=np.float32)
+
+        count = int((last - self.position) // self.step) + 1
+        positions = self.position + self.step * np.arange(count)
+        output = np.interp(positions, np.arange(len(buffer)), buffer).astype(np.float32)
+
+        next_position = self.position + self.step * count
+        keep_from = min(int(next_position), last)
+        self.tail = buffer[keep_from:]
+        self.position = next_position - keep_from
+        return output
+
+
+class OffsetMap:
+    """Maps times in trimmed audio back to times in the original audio"""
+
+    def __init__(self, segments: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE_HERTZ):
+        """
+        Initializes the map
+
+        Args:
+            segments (list): (output_sample, input_sample) pairs where each kept run of
+                audio starts, in ascending order
+            sample_rate (int): Sample rate both sample positions refer to
+        """
+        self.segments = [tuple(segment) for segment in segments] or [(0, 0)]
+        self.sample_rate = sample_rate
+        self.output_starts = np.array([segment[0] for segment in self.segments], dtype=np.float64) / sample_rate
+        self.shifts = np.array([segment[1] - segment[0] for segment in self.segments], dtype=np.float64) / sample_rate
+
+    def to_original(self, seconds):
+        """
+        Converts times in the trimmed audio to times in the original audio
+
+        Args:
+            seconds (float | np.ndarray): Times in the trimmed audio
+
+        Returns:
+            float | np.ndarray: Times in the original audio
+        """
+        index = np.searchsorted(self.output_starts, seconds, side='right') - 1
+        return seconds + self.shifts[np.maximum(index, 0)]
+
+    def remap_words(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Shifts word timestamps from the trimmed audio back onto the original timeline
+
+        Args:
+            words (list): Word dicts with 'start_time' and 'end_time'
+
+        Returns:
+            list: Copies of the words with original times, rounded to milliseconds
+        """
+        if not words or len(self.segments) == 1 and self.segments[0] == (0, 0):
+            return words
+        starts = self.to_original(np.array([word['start_time'] for word in words], dtype=np.float64))
+        ends = self.to_original(np.array([word['end_time'] for word in words], dtype=np.float64))
+        return [
+            dict(word, start_time=round(start, 3), end_time=round(end, 3))
+            for word, start, end in zip(words, starts.tolist(), ends.tolist())
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'sample_rate': self.sample_rate, 'segments': [list(segment) for segment in self.segments]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'OffsetMap':
+        return cls(data['segments'], data['sample_rate'])
+
+
+class SilenceTrimmer:
+    """
+    Streaming remover of long silences
+
+    Frames whose RMS level is below the threshold are silent. A silent run at least
+    min_silence_seconds long is cut down to padding_seconds on each side; shorter runs
+    are kept as is. Every cut is recorded so timestamps can be mapped back.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE_HERTZ, threshold_db: float = SILENCE_THRESHOLD_DB,
+                 min_silence_seconds: float = MIN_SILENCE_SECONDS,
+                 padding_seconds: float = SILENCE_PADDING_SECONDS, frame_seconds: float = FRAME_SECONDS):
+        """
+        Initializes the trimmer
+
+        Args:
+            sample_rate (int): Sample rate of the input
+            threshold_db (float): Level in dBFS below which a frame is silent
+            min_silence_seconds (float): Shortest silence that is trimmed
+            padding_seconds (float): Silence kept on each side of a trimmed region
+            frame_seconds (float): Length of the analysis frames
+        """
+        if padding_seconds < 0 or min_silence_seconds <= 2 * padding_seconds:
+            raise ValueError("min_silence_seconds must be longer than twice the padding")
+        self.sample_rate = sample_rate
+        self.frame_samples = max(int(frame_seconds * sample_rate), 1)
+        self.threshold = 10 ** (threshold_db / 20)
+        self.min_silence = int(min_silence_seconds * sample_rate)
+        self.padding = int(padding_seconds * sample_rate)
+
+        self.remainder = np.zeros(0, dtype=np.float32)  # Partial analysis frame
+        self.held = np.zeros(0, dtype=np.float32)  # Undecided samples of the current silent run
+        self.dropping = False
+        self.input_position = 0
+        self.output_position = 0
+        self.segments = [(0, 0)]
+
+    @property
+    def offset_map(self) -> OffsetMap:
+        return OffsetMap(self.segments, self.sample_rate)
+
+    @property
+    def removed_seconds(self) -> float:
+        return (self.input_position - self.output_position) / self.sample_rate
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Trims the next block of a mono stream
+
+        Args:
+            samples (np.ndarray): Consecutive float32 samples
+
+        Returns:
+            np.ndarray: The samples that are kept, as far as they can be decided yet
+        """
+        buffer = np.concatenate([self.remainder, samples])
+        frame_count = len(buffer) // self.frame_samples
+        self.remainder = buffer[frame_count * self.frame_samples:]
+        return self._process_frames(buffer[:frame_count * self.frame_samples])
+
+    def flush(self) -> np.ndarray:
+        """
+        Decides the remaining samples at the end of the stream
+
+        Returns:
+            np.ndarray: The samples that are kept
+        """
+        output = [self._process_frames(self.remainder)] if len(self.remainder) else []
+        self.remainder = np.zeros(0, dtype=np.float32)
+        output.append(self._release_held())
+        return np.concatenate(output)
+
+    def _process_frames(self, samples: np.ndarray) -> np.ndarray:
+        frame_count = -(-len(samples) // self.frame_samples)
+        if not frame_count:
+            return samples
+        frames = np.pad(samples, (0, frame_count * self.frame_samples - len(samples)))
+        levels = np.sqrt(np.mean(np.square(frames.reshape(frame_count, self.frame_samples)), axis=1))
+        silent = levels < self.threshold
+
+        # Process runs of equal classification rather than single frames
+        boundaries = np.flatnonzero(np.diff(silent.astype(np.int8))) + 1
+        starts = np.concatenate([[0], boundaries])
+        ends = np.concatenate([boundaries, [frame_count]])
+        output = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            run = samples[start * self.frame_samples:end * self.frame_samples]
+            if silent[start]:
+                output.append(self._silence(run))
+            else:
+                output.append(self._release_held())
+                output.append(self._emit(run))
+        return np.concatenate(output)
+
+    def _silence(self, run: np.ndarray) -> np.ndarray:
+        self.held = np.concatenate([self.held, run])
+        output = []
+        if not self.dropping and len(self.held) >= self.min_silence:
+            output.append(self._emit(self.held[:self.padding]))
+            self.held = self.held[self.padding:]
+            self.dropping = True
+        if self.dropping and len(self.held) > self.padding:
+            self._drop(len(self.held) - self.padding)
+            self.held = self.held[len(self.held) - self.padding:]
+        return np.concatenate(output) if output else np.zeros(0, dtype=np.float32)
+
+    def _release_held(self) -> np.ndarray:
+        held, self.held, self.dropping = self.held, np.zeros(0, dtype=np.float32), False
+        return self._emit(held)
+
+    def _emit(self, samples: np.ndarray) -> np.ndarray:
+        self.input_position += len(samples)
+        self.output_position += len(samples)
+        return samples
+
+    def _drop(self, count: int):
+        self.input_position += count
+        if self.segments[-1][0] == self.output_position:
+            self.segments[-1] = (self.output_position, self.input_position)
+        else:
+            self.segments.append((self.output_position, self.input_position))
+
+
+class AudioNormalizer:
+    """Converts uploads to 16 kHz mono LINEAR16 and removes long silences before recognition"""
+
+    def __init__(self, trim_silence: bool = True, threshold_db: float = SILENCE_THRESHOLD_DB,
+                 min_silence_seconds: float = MIN_SILENCE_SECONDS,
+                 padding_seconds: float = SILENCE_PADDING_SECONDS):
+        """
+        Initializes the normalizer
+
+        Args:
+            trim_silence (bool): Whether to remove long silences
+            threshold_db (float): Level in dBFS below which audio is silent
+            min_silence_seconds (float): Shortest silence that is trimmed
+            padding_seconds (float): Silence kept on each side of a trimmed region
+        """
+        self.trim_silence = trim_silence
+        self.threshold_db = threshold_db
+        self.min_silence_seconds = min_silence_seconds
+        self.padding_seconds = padding_seconds
+
+    @property
+    def options(self) -> Dict[str, Any]:
+        """
+        Returns everything that affects the normalized output, for cache keys
+        """
+        return {
+            'version': NORMALIZATION_VERSION,
+            'sample_rate': SAMPLE_RATE_HERTZ,
+            'trim_silence': self.trim_silence,
+            'threshold_db': self.threshold_db,
+            'min_silence_seconds': self.min_silence_seconds,
+            'padding_seconds': self.padding_seconds,
+        }
+
+    def normalize(self, chunks: Iterable[bytes], output: BinaryIO,
+                  sample_rate: int = SAMPLE_RATE_HERTZ) -> Dict[str, Any]:
+        """
+        Writes a normalized WAV file for a stream of audio chunks
+
+        The stream is processed block by block, so memory stays bounded regardless of
+        the length of the audio.
+
+        Args:
+            chunks (Iterable[bytes]): WAV file bytes or raw LINEAR16 mono PCM, in order
+            output (BinaryIO): Writable file object receiving the 16 kHz mono WAV
+            sample_rate (int): Sample rate assumed for headerless PCM
+
+        Returns:
+            dict: 'offset_map', 'duration' of the normalized audio and 'original_duration'
+        """
+        blocks, source_rate = read_audio_blocks(chunks, sample_rate)
+        resampler = LinearResampler(source_rate, SAMPLE_RATE_HERTZ)
+        trimmer = SilenceTrimmer(
+            SAMPLE_RATE_HERTZ, self.threshold_db, self.min_silence_seconds, self.padding_seconds
+        ) if self.trim_silence else None
+
+        def write(samples):
+            pcm = np.clip(np.round(samples * 32768.0), -32768, 32767).astype('<i2')
+            wav_file.writeframes(pcm.tobytes())
+
+        with wave.open(output, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(SAMPLE_WIDTH_BYTES)
+            wav_file.setframerate(SAMPLE_RATE_HERTZ)
+
+            input_samples = 0
+            for block in blocks:
+                mono = block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+                resampled = resampler.process(mono)
+                input_samples += len(resampled)
+                write(trimmer.process(resampled) if trimmer else resampled)
+            if trimmer:
+                write(trimmer.flush())
+
+        offset_map = trimmer.offset_map if trimmer else OffsetMap([(0, 0)])
+        removed = trimmer.removed_seconds if trimmer else 0.0
+        original_duration = input_samples / SAMPLE_RATE_HERTZ
+        logger.info(
+            f"Normalized {original_duration:.1f}s of {source_rate} Hz audio, removed {removed:.1f}s of silence"
+        )
+        return {
+            'offset_map': offset_map,
+            'duration': original_duration - removed,
+            'original_duration': original_duration,
+        }
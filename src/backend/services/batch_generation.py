@@ -0,0 +1,234 @@
+import json
+import logging
+import time
+from typing import Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.episodes.models import Episode
+from apps.marketing.models import ContentGenerationBatch, MarketingContent
+from services.content_generation import COMPLETION_PARAMS, ContentGenerationService
+from services.llm_client import LLMClient, get_llm_client
+
+# Global constants
+BATCH_ENDPOINT = '/v1/completions'
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}  # Batch jobs that will not change any more
+INSERT_BATCH_SIZE = 500
+
+
+def request_id(episode_id: int, platform: str) -> str:
+    """Returns the custom_id identifying the request for an episode and platform in a batch job"""
+    return f"{episode_id}:{platform}"
+
+
+def parse_request_id(custom_id: str) -> Tuple[int, str]:
+    """Returns the episode ID and platform of a batch request's custom_id"""
+    episode_id, platform = custom_id.split(':', 1)
+    return int(episode_id), platform
+
+
+class BatchContentGenerationService:
+    """
+    Generates marketing content for a back catalog through the batch API
+
+    Requests are written to JSONL files of at most batch_size lines, each submitted as
+    one batch job, which the API runs offline at a lower price and outside the per-minute
+    limits. All jobs are submitted up front by start and checked together by poll; the
+    output of each finished job is saved with bulk inserts and counted in the
+    ContentGenerationBatch row. Submitted jobs are recorded on the row, so a restarted
+    run resumes polling them instead of submitting the requests again. A poll checks each
+    job once and returns, so tasks can schedule the next one instead of waiting.
+    """
+
+    def __init__(self, api_key: str, model: str, llm_client: Optional[LLMClient] = None,
+                 content_service: Optional[ContentGenerationService] = None, poll_seconds: Optional[float] = None):
+        """
+        Initialize the service
+
+        :param api_key: OpenAI API key
+        :param model: AI model to be used
+        :param llm_client: Client for the files and batches endpoints, defaults to the shared client of this process
+        :param content_service: Builds the prompts and formats the completions, as for single generations
+        :param poll_seconds: Seconds between checks of running jobs in run, defaults to settings.CONTENT_GENERATION_BATCH_POLL_SECONDS
+        """
+        self.model = model
+        self.llm_client = llm_client or get_llm_client(api_key)
+        self.content_service = content_service or ContentGenerationService(api_key, model, llm_client=self.llm_client)
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.CONTENT_GENERATION_BATCH_POLL_SECONDS
+        self.logger = logging.getLogger(__name__)
+
+    def build_requests(self, episodes: List[Episode], platforms: List[str]) -> List[dict]:
+        """
+        Build one batch request line per episode and platform
+
+        :param episodes: Episode instances
+        :param platforms: Social media platforms
+        :return: Request lines with their custom_id, endpoint and completion body
+        """
+        return [
+            {
+                'custom_id': request_id(episode.id, platform),
+                'method': 'POST',
+                'url': BATCH_ENDPOINT,
+                'body': dict(COMPLETION_PARAMS, model=self.model, prompt=self.content_service.build_prompt(episode, platform)),
+            }
+            for episode in episodes
+            for platform in platforms
+        ]
+
+    def submit(self, requests: List[dict], name: str) -> str:
+        """
+        Upload request lines as a JSONL file and start a batch job running them
+
+        :param requests: Request lines
+        :param name: Name of the uploaded file
+        :return: ID of the batch job
+        """
+        content = ''.join(json.dumps(request) + '\n' for request in requests).encode('utf-8')
+        input_file = self.llm_client.upload_file(name, content)
+        job = self.llm_client.create_batch(input_file['id'], BATCH_ENDPOINT, settings.CONTENT_GENERATION_BATCH_COMPLETION_WINDOW)
+        return job['id']
+
+    def ingest(self, job: dict, request_ids: List[str]) -> Tuple[int, List[str]]:
+        """
+        Save the content generated by a finished batch job
+
+        Requests without a successful response in the output file, including those of a
+        failed or expired job and lines that cannot be parsed, are reported as failed.
+
+        :param job: Batch object of the finished job
+        :param request_ids: custom_id of each request submitted in the job
+        :return: Number of contents saved, and the custom_id of each failed request
+        """
+        contents = {}
+        if job.get('output_file_id'):
+            for line in self.llm_client.file_content(job['output_file_id']).splitlines():
+                try:
+                    result = json.loads(line)
+                    response = result['response']
+                    if response['status_code'] != 200:
+                        continue
+                    episode_id, platform = parse_request_id(result['custom_id'])
+                    content = self.content_service.format_completion(response['body'], platform)
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    self.logger.warning(f"Skipping unreadable line of batch job {job['id']}: {str(e)}")
+                    continue
+                contents[result['custom_id']] = MarketingContent(
+                    episode_id=episode_id,
+                    platform=platform,
+                    content=content,
+                    status='draft'
+                )
+
+        rows = [contents[custom_id] for custom_id in request_ids if custom_id in contents]
+        MarketingContent.objects.bulk_create(rows, batch_size=INSERT_BATCH_SIZE)
+        return len(rows), [custom_id for custom_id in request_ids if custom_id not in contents]
+
+    def start(self, batch: ContentGenerationBatch) -> ContentGenerationBatch:
+        """
+        Submit the jobs of a batch that have not been submitted yet
+
+        :param batch: ContentGenerationBatch to start or resume
+        :return: The batch, with its running jobs recorded
+        """
+        if not batch.submitted:
+            self._submit_pending(batch)
+        return batch
+
+    def poll(self, batch: ContentGenerationBatch, on_progress: Optional[Callable[[dict], None]] = None) -> bool:
+        """
+        Check each running job of a batch once, ingesting the jobs that finished
+
+        :param batch: Started ContentGenerationBatch
+        :param on_progress: Called with the batch progress after each finished job
+        :return: Whether jobs are still running
+        """
+        for job_id, request_ids in list(batch.jobs.items()):
+            job = self.llm_client.retrieve_batch(job_id)
+            if job['status'] not in TERMINAL_STATUSES:
+                continue
+
+            # The contents and the progress row are saved together, so a job is never ingested twice
+            with transaction.atomic():
+                succeeded, failed_requests = self.ingest(job, request_ids)
+                del batch.jobs[job_id]
+                batch.jobs_completed += 1
+                batch.succeeded += succeeded
+                batch.failed += len(failed_requests)
+                batch.failed_requests = batch.failed_requests + failed_requests
+                if not batch.jobs:
+                    batch.status = 'completed'
+                batch.save()
+
+            self.logger.info(
+                f"Content generation batch {batch.id}: job {batch.jobs_completed}/{batch.jobs_total} "
+                f"{job['status']}, {succeeded} saved, {len(failed_requests)} failed"
+            )
+            if on_progress:
+                on_progress(batch.get_progress())
+        return bool(batch.jobs)
+
+    def run(self, batch: ContentGenerationBatch,
+            on_progress: Optional[Callable[[dict], None]] = None) -> ContentGenerationBatch:
+        """
+        Generate the content of a batch, waiting for every job in this thread
+
+        For scripts and benchmarks; tasks start the batch and schedule each poll instead.
+
+        :param batch: ContentGenerationBatch to run or resume
+        :param on_progress: Called with the batch progress after each finished job
+        :return: The completed batch
+        """
+        self.start(batch)
+        if on_progress:
+            on_progress(batch.get_progress())
+
+        while batch.jobs:
+            time.sleep(self.poll_seconds)
+            self.poll(batch, on_progress)
+        return batch
+
+    def _submit_pending(self, batch: ContentGenerationBatch) -> None:
+        """
+        Submit the requests of a batch as jobs of at most batch_size requests
+
+        Requests for content that already exists are skipped, so a back catalog can be
+        submitted again to fill in whatever failed. Each job is recorded as soon as it is
+        submitted, and a resumed run continues with the next one.
+        """
+        episodes = Episode.objects.filter(id__in=batch.episode_ids).select_related('transcript').in_bulk()
+        existing = set(
+            MarketingContent.objects.filter(episode_id__in=batch.episode_ids, platform__in=batch.platforms)
+            .values_list('episode_id', 'platform')
+        )
+        missing = [episode_id for episode_id in batch.episode_ids if episode_id not in episodes]
+        batch.failed_requests = [request_id(episode_id, platform) for episode_id in missing for platform in batch.platforms]
+        batch.failed = len(batch.failed_requests)
+        batch.skipped = len(existing)
+
+        pairs = [
+            (episodes[episode_id], platform)
+            for episode_id in batch.episode_ids if episode_id in episodes
+            for platform in batch.platforms if (episode_id, platform) not in existing
+        ]
+        # Nothing has been ingested before every job is submitted, so the pairs are the same on resume
+        for start in range(batch.jobs_total * batch.batch_size, len(pairs), batch.batch_size):
+            requests = [
+                request
+                for episode, platform in pairs[start:start + batch.batch_size]
+                for request in self.build_requests([episode], [platform])
+            ]
+            job_id = self.submit(requests, f"content-generation-batch-{batch.id}-{batch.jobs_total}.jsonl")
+            batch.jobs[job_id] = [request['custom_id'] for request in requests]
+            batch.jobs_total += 1
+            batch.save()
+
+        batch.submitted = True
+        if not batch.jobs:
+            batch.status = 'completed'
+        batch.save()
+        self.logger.info(
+            f"Content generation batch {batch.id}: submitted {len(pairs)} requests in {batch.jobs_total} jobs, "
+            f"skipped {batch.skipped} existing contents"
+        )
@@ -1,22 +1,32 @@
-import openai
+import json
 import logging
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from django.db import transaction
 from apps.marketing.models import MarketingContent
 from apps.episodes.models import Episode
+from services.llm_client import LLMClient, completion_text, get_llm_client
+from services.transcript_condensation import TranscriptCondenser
+
+# Global constants
+COMPLETION_PARAMS = {'max_tokens': 150, 'n': 1, 'stop': None, 'temperature': 0.7}
 
 class ContentGenerationService:
     """Service class for generating marketing content using AI"""
 
-    def __init__(self, api_key: str, model: str):
+    def __init__(self, api_key: str, model: str, llm_client: Optional[LLMClient] = None,
+                 condenser: Optional[TranscriptCondenser] = None):
         """
         Initialize the ContentGenerationService with OpenAI API key and model
 
         :param api_key: OpenAI API key
         :param model: AI model to be used
+        :param llm_client: Completion client, defaults to the shared connection-pooled client of this process
+        :param condenser: Builds the cached episode brief used in prompts
         """
         self.api_key = api_key
         self.model = model
-        openai.api_key = self.api_key
+        self.llm_client = llm_client or get_llm_client(self.api_key)
+        self.condenser = condenser or TranscriptCondenser(llm_client=self.llm_client)
         self.logger = logging.getLogger(__name__)
 
     def generate_content(self, episode: Episode, platform: str) -> str:
@@ -28,27 +38,14 @@ class ContentGenerationService:
         :return: Generated marketing content
         """
         try:
-            # Extract relevant information from the episode
-            episode_info = self._extract_episode_info(episode)
-
-            # Construct a prompt for the AI model
-            prompt = self._construct_prompt(episode_info, platform)
+            # Construct a prompt for the AI model from the episode information
+            prompt = self.build_prompt(episode, platform)
 
             # Call the OpenAI API to generate content
-            response = openai.Completion.create(
-                engine=self.model,
-                prompt=prompt,
-                max_tokens=150,
-                n=1,
-                stop=None,
-                temperature=0.7,
-            )
+            response = self.llm_client.completion(self.model, prompt, **COMPLETION_PARAMS)
 
             # Process and format the generated content
-            generated_content = response.choices[0].text.strip()
-            formatted_content = self._format_content(generated_content, platform)
-
-            return formatted_content
+            return self.format_completion(response, platform)
         except Exception as e:
             self.logger.error(f"Error generating content: {str(e)}")
             raise
@@ -86,6 +83,115 @@ class ContentGenerationService:
         content = self.generate_content(episode, platform)
         return self.save_generated_content(episode, platform, content)
 
+    def generate_and_save_contents(self, episode: Episode, platforms: List[str]) -> Dict[str, MarketingContent]:
+        """
+        Generate and save marketing content for several platforms with a single completion
+
+        The episode information is sent once and the model answers with one post per
+        platform; platforms missing from the answer are generated on their own. All rows
+        are inserted with one query.
+
+        :param episode: Episode instance
+        :param platforms: Social media platforms
+        :return: Saved MarketingContent instances by platform
+        """
+        platforms = list(dict.fromkeys(platforms))
+        contents = {}
+        if len(platforms) > 1:
+            try:
+                prompt = self._construct_multi_platform_prompt(self._extract_episode_info(episode), platforms)
+                params = dict(COMPLETION_PARAMS, max_tokens=COMPLETION_PARAMS['max_tokens'] * len(platforms))
+                response = self.llm_client.completion(self.model, prompt, **params)
+                contents = self.format_multi_platform_completion(response, platforms)
+            except Exception as e:
+                self.logger.error(f"Error generating content: {str(e)}")
+                raise
+
+        for platform in platforms:
+            if platform not in contents:
+                # Fall back to a single-platform completion for posts missing from the answer
+                contents[platform] = self.generate_content(episode, platform)
+
+        try:
+            with transaction.atomic():
+                marketing_contents = MarketingContent.objects.bulk_create([
+                    MarketingContent(episode=episode, platform=platform, content=contents[platform], status='draft')
+                    for platform in platforms
+                ])
+        except Exception as e:
+            self.logger.error(f"Error saving generated content: {str(e)}")
+            raise
+        return dict(zip(platforms, marketing_contents))
+
+    def stream_content(self, episode: Episode, platform: str) -> Iterator[Tuple[str, Union[str, MarketingContent]]]:
+        """
+        Generate and save marketing content, yielding the text as the model produces it
+
+        :param episode: Episode instance
+        :param platform: Social media platform
+        :return: Iterator of ('token', text) events followed by one ('content', MarketingContent) event
+        """
+        try:
+            prompt = self.build_prompt(episode, platform)
+
+            parts = []
+            for text in self.llm_client.stream_completion(self.model, prompt, **COMPLETION_PARAMS):
+                parts.append(text)
+                yield 'token', text
+
+            formatted_content = self._format_content(''.join(parts), platform)
+        except Exception as e:
+            self.logger.error(f"Error streaming content: {str(e)}")
+            raise
+        yield 'content', self.save_generated_content(episode, platform, formatted_content)
+
+    def build_prompt(self, episode: Episode, platform: str) -> str:
+        """
+        Build the completion prompt for an episode and platform
+
+        :param episode: Episode instance
+        :param platform: Social media platform
+        :return: Prompt text
+        """
+        return self._construct_prompt(self._extract_episode_info(episode), platform)
+
+    def format_completion(self, response: dict, platform: str) -> str:
+        """
+        Format the text of a completion response for a platform
+
+        :param response: Completion response
+        :param platform: Social media platform
+        :return: Formatted content
+        """
+        return self._format_content(completion_text(response), platform)
+
+    def format_multi_platform_completion(self, response: dict, platforms: List[str]) -> Dict[str, str]:
+        """
+        Format the posts of a multi-platform completion response
+
+        The response is read from its first JSON object, so text around it is ignored.
+
+        :param response: Completion response
+        :param platforms: Social media platforms that were requested
+        :return: Formatted content of each platform whose post is present
+        """
+        text = completion_text(response)
+        try:
+            posts, _ = json.JSONDecoder().raw_decode(text, text.index('{'))
+        except ValueError:
+            self.logger.warning("Multi-platform completion holds no JSON object")
+            return {}
+
+        posts = {str(key).lower(): value for key, value in posts.items()}
+        contents = {}
+        for platform in platforms:
+            post = posts.get(platform.lower())
+            if isinstance(post, str) and post.strip():
+                contents[platform] = self._format_content(post.strip(), platform)
+            else:
+                self.logger.warning(f"Multi-platform completion has no {platform} post")
+        return contents
+
     def _extract_episode_info(self, episode: Episode) -> dict:
         """
         Extract relevant information from the episode
@@ -93,10 +199,12 @@ class ContentGenerationService:
         :param episode: Episode instance
         :return: Dictionary containing episode information
         """
+        transcript = self._get_transcript(episode)
         return {
             'title': episode.title,
             'description': episode.description,
-            'transcript': self._get_transcript(episode)
+            'transcript': transcript,
+            'brief': self.condenser.get_brief(transcript) if transcript else None
         }
 
     def _get_transcript(self, episode: Episode) -> Optional[str]:
@@ -121,8 +229,25 @@ class ContentGenerationService:
         """
         return f"Generate a {platform} post for a podcast episode titled '{episode_info['title']}'. " \
                f"Episode description: {episode_info['description']}. " \
-               f"Use the following transcript excerpt if available: " \
-               f"{episode_info['transcript'][:500] if episode_info['transcript'] else 'No transcript available.'}"
+               f"Use the following episode brief if available: " \
+               f"{episode_info['brief'] or 'No transcript available.'}"
+
+    def _construct_multi_platform_prompt(self, episode_info: dict, platforms: List[str]) -> str:
+        """
+        Construct a prompt asking for one post per platform in a single JSON object
+
+        :param episode_info: Dictionary containing episode information
+        :param platforms: Social media platforms
+        :return: Constructed prompt
+        """
+        targets = '\n'.join(f"- {platform}" for platform in platforms)
+        return f"Generate a post for each of the following platforms for a podcast episode titled " \
+               f"'{episode_info['title']}'.\nTarget platforms:\n{targets}\n" \
+               f"Episode description: {episode_info['description']}. " \
+               f"Use the following episode brief if available: " \
+               f"{episode_info['brief'] or 'No transcript available.'}\n" \
+               f"Format the response as a JSON object with one key per platform name exactly as listed above, " \
+               f"each value being the text of that platform's post."
 
     def _format_content(self, content: str, platform: str) -> str:
         """
@@ -140,7 +265,5 @@ class ContentGenerationService:
         return content
 
 # TODO: Implement error handling and retries for API calls to OpenAI
-# TODO: Implement rate limiting to comply with OpenAI API usage limits
 # TODO: Create unit tests for the ContentGenerationService class
-# TODO: Consider implementing a caching mechanism to store generated content temporarily
 # TODO: Explore options for content customization based on user preferences or platform-specific requirements
\ No newline at end of file
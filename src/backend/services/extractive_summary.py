@@ -0,0 +1,171 @@
+import re
+from typing import List, Optional
+
+import numpy as np
+
+# Global constants
+DEFAULT_SUMMARY_SENTENCES = 8
+PSEUDO_SENTENCE_WORDS = 30  # Sentence length used for transcripts without punctuation
+MIN_SENTENCE_WORDS = 4
+REDUNDANCY_THRESHOLD = 0.8  # Cosine similarity above which a sentence repeats one already selected
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+SCORING_METHODS = ('textrank', 'centroid')
+
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+TERM_PATTERN = re.compile(r"[a-z0-9']+")
+STOP_WORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being both but by can could
+did do does doing down during each even few for from further get got had has have having he her here hers
+him his how i if in into is it its itself just know like me more most my no nor not now of off on once only
+or other our ours out over own really right same she should so some such than that the their theirs them
+then there these they this those through to too um uh under until up us very was we well were what when
+where which while who whom why will with would yeah you your yours
+""".split())
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits text into sentences, or into fixed-length word runs when it has no punctuation
+
+    Args:
+        text (str): The text
+
+    Returns:
+        list: The sentences, in order
+    """
+    sentences = []
+    for sentence in SENTENCE_PATTERN.split(text.strip()):
+        words = sentence.split()
+        # Recognizers without punctuation produce one huge "sentence"
+        if len(words) > PSEUDO_SENTENCE_WORDS * 2:
+            sentences.extend(' '.join(words[start:start + PSEUDO_SENTENCE_WORDS])
+                             for start in range(0, len(words), PSEUDO_SENTENCE_WORDS))
+        elif words:
+            sentences.append(' '.join(words))
+    return sentences
+
+
+def tfidf_matrix(sentences: List[str]) -> np.ndarray:
+    """
+    Builds L2-normalized TF-IDF vectors of sentences
+
+    Weights are computed over the sparse (sentence, term) pairs. Only terms shared by
+    at least two sentences are kept as columns of the dense result, since a term found
+    in a single sentence adds nothing to the similarity between sentences; it still
+    counts towards the sentence's norm.
+
+    Args:
+        sentences (list): The sentences
+
+    Returns:
+        np.ndarray: Float32 matrix with one row per sentence and one column per shared term
+    """
+    sentence_ids, terms = [], []
+    for index, sentence in enumerate(sentences):
+        tokens = [token for token in TERM_PATTERN.findall(sentence.lower()) if token not in STOP_WORDS]
+        sentence_ids.extend([index] * len(tokens))
+        terms.extend(tokens)
+    if not terms:
+        return np.zeros((len(sentences), 0), dtype=np.float32)
+
+    vocabulary, term_ids = np.unique(np.array(terms), return_inverse=True)
+    cells, counts = np.unique(np.array(sentence_ids) * len(vocabulary) + term_ids.ravel(), return_counts=True)
+    rows, columns = np.divmod(cells, len(vocabulary))
+
+    document_frequency = np.bincount(columns, minlength=len(vocabulary))
+    idf = np.log((1.0 + len(sentences)) / (1.0 + document_frequency)) + 1.0
+    weights = np.log1p(counts) * idf[columns]
+    norms = np.sqrt(np.bincount(rows, weights * weights, minlength=len(sentences)))
+    weights /= norms[rows]
+
+    shared = document_frequency >= 2
+    shared_columns = np.cumsum(shared) - 1
+    keep = shared[columns]
+    vectors = np.zeros((len(sentences), int(shared.sum())), dtype=np.float32)
+    vectors[rows[keep], shared_columns[columns[keep]]] = weights[keep]
+    return vectors
+
+
+def textrank_scores(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scores sentences by PageRank over their cosine similarity graph
+
+    Args:
+        vectors (np.ndarray): L2-normalized sentence vectors
+
+    Returns:
+        np.ndarray: One score per sentence
+    """
+    count = vectors.shape[0]
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences with no similar sentence spread their rank evenly
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight > 0, out_weight, 1.0), 1.0 / count)
+    transition = np.ascontiguousarray(transition.T, dtype=np.float32)
+
+    scores = np.full(count, 1.0 / count, dtype=np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1.0 - DAMPING) / count + DAMPING * (transition @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def centroid_scores(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scores sentences by cosine similarity to the centroid of all sentences
+
+    Args:
+        vectors (np.ndarray): L2-normalized sentence vectors
+
+    Returns:
+        np.ndarray: One score per sentence
+    """
+    centroid = vectors.mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    return vectors @ (centroid / norm) if norm > 0 else np.zeros(vectors.shape[0], dtype=np.float32)
+
+
+def summarize(text: str, max_sentences: int = DEFAULT_SUMMARY_SENTENCES, method: str = 'textrank',
+              max_chars: Optional[int] = None) -> str:
+    """
+    Extracts the most salient sentences of a text, in their original order
+
+    Args:
+        text (str): The text to summarize
+        max_sentences (int): Number of sentences to keep
+        method (str): 'textrank' or 'centroid'
+        max_chars (int): Length budget of the summary; sentences that would exceed it are skipped
+
+    Returns:
+        str: The selected sentences joined by spaces
+    """
+    if method not in SCORING_METHODS:
+        raise ValueError(f"Unknown summary scoring method: {method}")
+
+    sentences = split_sentences(text or '')
+    if len(sentences) <= max_sentences and (max_chars is None or len(' '.join(sentences)) <= max_chars):
+        return ' '.join(sentences)
+
+    vectors = tfidf_matrix(sentences)
+    scores = textrank_scores(vectors) if method == 'textrank' else centroid_scores(vectors)
+    # Fillers such as "Yeah, exactly." are never worth a slot, unless there is nothing else
+    lengths = np.array([len(sentence.split()) for sentence in sentences])
+    if np.count_nonzero(lengths >= MIN_SENTENCE_WORDS) >= max_sentences:
+        scores = np.where(lengths >= MIN_SENTENCE_WORDS, scores, -np.inf)
+
+    selected, length = [], -1
+    for index in np.argsort(-scores, kind='stable'):
+        if len(selected) == max_sentences or not np.isfinite(scores[index]):
+            break
+        if max_chars is not None and length + 1 + len(sentences[index]) > max_chars:
+            continue
+        if selected and (vectors[selected] @ vectors[index]).max(initial=0.0) > REDUNDANCY_THRESHOLD:
+            continue
+        selected.append(index)
+        length += 1 + len(sentences[index])
+    return ' '.join(sentences[index] for index in sorted(selected))
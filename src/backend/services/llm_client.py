@@ -0,0 +1,427 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+
+from .llm_rate_limiter import RateLimiter, get_rate_limiter, request_tokens
+
+# Global constants
+DEFAULT_API_BASE = 'https://api.openai.com/v1'
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_TIMEOUT_SECONDS = 60.0
+
+
+class LLMError(Exception):
+    """Raised when the completion API responds with an error status"""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        self.status = status
+        self.retry_after = retry_after
+        super().__init__(f"Completion API returned {status}: {message}")
+
+
+class AsyncLLMClient:
+    """
+    Asyncio client for OpenAI-compatible completion APIs
+
+    All requests share one persistent connection pool, and a semaphore bounds the
+    number in flight, so a single worker can keep dozens of generations running
+    while it waits on the network. With a rate limiter, each request first waits
+    for its share of the request and token budgets.
+    """
+
+    def __init__(self, api_key: str, api_base: str = DEFAULT_API_BASE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initializes the client; the connection pool is created on first use inside the event loop
+
+        Args:
+            api_key (str): API key sent as a bearer token
+            api_base (str): Base URL of the API
+            max_concurrency (int): Maximum number of requests in flight, also the size of the connection pool
+            timeout (float): Total seconds allowed per request
+            rate_limiter (RateLimiter): Budgets requests and tokens per minute, no limit when omitted
+        """
+        self.api_key = api_key
+        self.api_base = api_base.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._session = None
+        self._semaphore = None
+
+    def _get_session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Authorization': f"Bearer {self.api_key}"},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _throttle(self, payload):
+        # Waiting happens before taking a connection, so throttled requests do not hold one
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(request_tokens(payload))
+
+    async def request(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Posts a JSON payload and returns the decoded response
+
+        Args:
+            path (str): Endpoint path, e.g. '/chat/completions'
+            payload (dict): Request body
+
+        Returns:
+            dict: Decoded response body
+
+        Raises:
+            LLMError: If the API responds with an error status
+        """
+        session = self._get_session()
+        await self._throttle(payload)
+        async with self._semaphore:
+            async with session.post(f"{self.api_base}{path}", json=payload) as response:
+                await raise_for_status(response)
+                return await response.json(content_type=None)
+
+    async def stream(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Posts a streaming request and yields each server-sent chunk as it arrives
+
+        Args:
+            path (str): Endpoint path, e.g. '/chat/completions'
+            payload (dict): Request body, sent with 'stream' set
+
+        Yields:
+            dict: Decoded chunks, until the API sends [DONE]
+
+        Raises:
+            LLMError: If the API responds with an error status
+        """
+        session = self._get_session()
+        await self._throttle(payload)
+        async with self._semaphore:
+            async with session.post(f"{self.api_base}{path}", json=dict(payload, stream=True)) as response:
+                await raise_for_status(response)
+                async for line in response.content:
+                    line = line.strip()
+                    if not line.startswith(b'data:'):
+                        continue
+                    data = line[len(b'data:'):].strip()
+                    if data == b'[DONE]':
+                        return
+                    yield json.loads(data)
+
+    async def chat_completion(self, model: str, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        """
+        Requests a chat completion
+
+        Args:
+            model (str): Model name
+            messages (list): Chat messages with 'role' and 'content'
+            **params: Additional request parameters such as max_tokens or temperature
+
+        Returns:
+            dict: The chat completion response
+        """
+        return await self.request('/chat/completions', dict(params, model=model, messages=messages))
+
+    async def completion(self, model: str, prompt: str, **params) -> Dict[str, Any]:
+        """
+        Requests a text completion
+
+        Args:
+            model (str): Model name
+            prompt (str): Prompt text
+            **params: Additional request parameters such as max_tokens or temperature
+
+        Returns:
+            dict: The completion response
+        """
+        return await self.request('/completions', dict(params, model=model, prompt=prompt))
+
+    async def call(self, method: str, path: str, **kwargs) -> bytes:
+        """
+        Sends a request to an endpoint other than completions, without drawing on the rate limiter
+
+        Args:
+            method (str): HTTP method
+            path (str): Endpoint path, e.g. '/batches'
+            **kwargs: Request arguments for aiohttp, such as json or data
+
+        Returns:
+            bytes: Response body
+
+        Raises:
+            LLMError: If the API responds with an error status
+        """
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.request(method, f"{self.api_base}{path}", **kwargs) as response:
+                await raise_for_status(response)
+                return await response.read()
+
+    async def upload_file(self, filename: str, content: bytes, purpose: str = 'batch') -> Dict[str, Any]:
+        """
+        Uploads a file, e.g. the JSONL input of a batch job
+
+        Args:
+            filename (str): Name of the uploaded file
+            content (bytes): File content
+            purpose (str): Intended use of the file
+
+        Returns:
+            dict: The file object, with its 'id'
+        """
+        import aiohttp
+
+        form = aiohttp.FormData()
+        form.add_field('purpose', purpose)
+        form.add_field('file', content, filename=filename, content_type='application/jsonl')
+        return json.loads(await self.call('POST', '/files', data=form))
+
+    async def create_batch(self, input_file_id: str, endpoint: str, completion_window: str = '24h') -> Dict[str, Any]:
+        """
+        Creates a batch job running every request of an uploaded JSONL file
+
+        Args:
+            input_file_id (str): ID of the uploaded input file
+            endpoint (str): Endpoint all requests of the file are sent to, e.g. '/v1/completions'
+            completion_window (str): Time the API has to finish the job
+
+        Returns:
+            dict: The batch object, with its 'id' and 'status'
+        """
+        payload = {'input_file_id': input_file_id, 'endpoint': endpoint, 'completion_window': completion_window}
+        return json.loads(await self.call('POST', '/batches', json=payload))
+
+    async def retrieve_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Returns the batch object of a job, with its status, request counts and output file"""
+        return json.loads(await self.call('GET', f"/batches/{batch_id}"))
+
+    async def file_content(self, file_id: str) -> bytes:
+        """Downloads the content of a file, e.g. the JSONL output of a batch job"""
+        return await self.call('GET', f"/files/{file_id}/content")
+
+    async def close(self) -> None:
+        """Closes the connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class LLMClient:
+    """
+    Synchronous façade over AsyncLLMClient for Celery tasks and views
+
+    Calls are run on an event loop owned by a background thread, so requests made from
+    any number of threads share the connection pool and the concurrency bound.
+    """
+
+    def __init__(self, api_key: str, api_base: str = DEFAULT_API_BASE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initializes the client and starts its event loop thread
+
+        Args:
+            api_key (str): API key sent as a bearer token
+            api_base (str): Base URL of the API
+            max_concurrency (int): Maximum number of requests in flight
+            timeout (float): Total seconds allowed per request
+            rate_limiter (RateLimiter): Budgets requests and tokens per minute, no limit when omitted
+        """
+        self.async_client = AsyncLLMClient(api_key, api_base, max_concurrency, timeout, rate_limiter)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='llm-client', daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """
+        Schedules a coroutine on the client's event loop
+
+        Args:
+            coroutine (Coroutine): Coroutine using self.async_client
+
+        Returns:
+            Future: Resolves to the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def chat_completion(self, model: str, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        """Requests a chat completion and waits for the response"""
+        return self.submit(self.async_client.chat_completion(model, messages, **params)).result()
+
+    def completion(self, model: str, prompt: str, **params) -> Dict[str, Any]:
+        """Requests a text completion and waits for the response"""
+        return self.submit(self.async_client.completion(model, prompt, **params)).result()
+
+    def upload_file(self, filename: str, content: bytes, purpose: str = 'batch') -> Dict[str, Any]:
+        """Uploads a file and waits for the file object"""
+        return self.submit(self.async_client.upload_file(filename, content, purpose)).result()
+
+    def create_batch(self, input_file_id: str, endpoint: str, completion_window: str = '24h') -> Dict[str, Any]:
+        """Creates a batch job and waits for the batch object"""
+        return self.submit(self.async_client.create_batch(input_file_id, endpoint, completion_window)).result()
+
+    def retrieve_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Fetches the current batch object of a job"""
+        return self.submit(self.async_client.retrieve_batch(batch_id)).result()
+
+    def file_content(self, file_id: str) -> bytes:
+        """Downloads the content of a file"""
+        return self.submit(self.async_client.file_content(file_id)).result()
+
+    def stream(self, path: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Relays the chunks of a streaming request to synchronous code as they arrive
+
+        Closing the iterator early cancels the request.
+
+        Args:
+            path (str): Endpoint path, e.g. '/chat/completions'
+            payload (dict): Request body
+
+        Yields:
+            dict: Decoded chunks
+        """
+        chunks = queue.Queue()
+        done = object()
+
+        async def relay():
+            try:
+                async for chunk in self.async_client.stream(path, payload):
+                    chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(done)
+
+        future = self.submit(relay())
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            future.cancel()
+
+    def stream_chat_completion(self, model: str, messages: List[Dict[str, str]], **params) -> Iterator[str]:
+        """Streams a chat completion, yielding the text of each chunk"""
+        for chunk in self.stream('/chat/completions', dict(params, model=model, messages=messages)):
+            text = chat_completion_delta(chunk)
+            if text:
+                yield text
+
+    def stream_completion(self, model: str, prompt: str, **params) -> Iterator[str]:
+        """Streams a text completion, yielding the text of each chunk"""
+        for chunk in self.stream('/completions', dict(params, model=model, prompt=prompt)):
+            text = completion_text_delta(chunk)
+            if text:
+                yield text
+
+    def chat_completions(self, model: str, conversations: Iterable[List[Dict[str, str]]],
+                         **params) -> List[Any]:
+        """
+        Requests several chat completions concurrently
+
+        Args:
+            model (str): Model name
+            conversations (Iterable[list]): Messages of each request
+            **params: Request parameters shared by all requests
+
+        Returns:
+            list: Responses in request order; a failed request yields its exception instead
+        """
+        futures = [self.submit(self.async_client.chat_completion(model, messages, **params)) for messages in conversations]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self) -> None:
+        """Closes the connection pool and stops the event loop thread"""
+        self.submit(self.async_client.close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+async def raise_for_status(response) -> None:
+    """Raises LLMError for an error response, with the Retry-After delay of a 429"""
+    if response.status >= 400:
+        retry_after = response.headers.get('Retry-After')
+        raise LLMError(
+            response.status,
+            await response.text(),
+            float(retry_after) if retry_after else None,
+        )
+
+
+def chat_completion_text(response: Dict[str, Any]) -> str:
+    """Returns the message text of the first choice of a chat completion response"""
+    return response['choices'][0]['message']['content'].strip()
+
+
+def completion_text(response: Dict[str, Any]) -> str:
+    """Returns the text of the first choice of a completion response"""
+    return response['choices'][0]['text'].strip()
+
+
+def chat_completion_delta(chunk: Dict[str, Any]) -> str:
+    """Returns the text added by a streamed chat completion chunk"""
+    choices = chunk.get('choices') or [{}]
+    return (choices[0].get('delta') or {}).get('content') or ''
+
+
+def completion_text_delta(chunk: Dict[str, Any]) -> str:
+    """Returns the text added by a streamed completion chunk"""
+    choices = chunk.get('choices') or [{}]
+    return choices[0].get('text') or ''
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(api_key: Optional[str] = None) -> LLMClient:
+    """
+    Returns the process-wide client for an API key, configured from settings
+
+    Clients draw from the shared rate limiter, so all workers stay within one budget.
+    A new client is created after a fork, since the event loop thread does not survive it.
+
+    Args:
+        api_key (str): API key, defaults to settings.OPENAI_API_KEY
+
+    Returns:
+        LLMClient: The shared client
+    """
+    api_key = api_key or settings.OPENAI_API_KEY
+    with _clients_lock:
+        key = (os.getpid(), api_key)
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = LLMClient(
+                api_key,
+                api_base=settings.LLM_API_BASE,
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                timeout=settings.LLM_TIMEOUT_SECONDS,
+                rate_limiter=get_rate_limiter(),
+            )
+        return client
@@ -0,0 +1,227 @@
+import abc
+import asyncio
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+# Global constants
+CHARS_PER_TOKEN = 4  # Rough average for English text
+DEFAULT_COMPLETION_TOKENS = 256  # Assumed completion size of requests without max_tokens
+
+# Refills each bucket of KEYS for the time elapsed since it was last updated, then
+# reserves the cost of the request from all of them. Levels may go negative: the
+# caller is told how long to wait until the deepest debt is paid back, so requests
+# are granted in arrival order without any of them polling.
+# ARGV holds (capacity, refill per second, cost) for each key, then the key TTL.
+RESERVE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local ttl = tonumber(ARGV[#ARGV])
+local wait = 0
+for index, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[index * 3 - 2])
+    local rate = tonumber(ARGV[index * 3 - 1])
+    local cost = tonumber(ARGV[index * 3])
+    local state = redis.call('HMGET', key, 'level', 'updated')
+    local level = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - updated) * rate) - cost
+    if level < 0 then
+        wait = math.max(wait, -level / rate)
+    end
+    redis.call('HSET', key, 'level', tostring(level), 'updated', tostring(now))
+    redis.call('EXPIRE', key, ttl)
+end
+return tostring(wait)
+"""
+
+
+def request_tokens(payload: Dict[str, Any]) -> int:
+    """
+    Estimates the tokens a completion request counts against the token budget
+
+    The API counts the prompt and max_tokens when it admits a request, so both are
+    estimated here from the payload.
+
+    Args:
+        payload (dict): Body of a chat completion or completion request
+
+    Returns:
+        int: Approximate prompt tokens plus completion tokens
+    """
+    if 'messages' in payload:
+        prompt_chars = sum(len(message.get('content') or '') for message in payload['messages'])
+    else:
+        prompt = payload.get('prompt') or ''
+        prompt_chars = sum(map(len, prompt)) if isinstance(prompt, list) else len(prompt)
+    return math.ceil(prompt_chars / CHARS_PER_TOKEN) + payload.get('max_tokens', DEFAULT_COMPLETION_TOKENS)
+
+
+class RateLimiter(abc.ABC):
+    """
+    Token buckets budgeting completion requests and tokens per minute
+
+    Each bucket refills continuously at its per-minute budget and holds at most
+    burst_seconds worth of it, since the API enforces its limits over short intervals
+    as well. A request reserves one request and its tokens, and is told exactly how
+    long to wait for them rather than trying and being refused.
+    """
+
+    name: str
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None,
+                 burst_seconds: Optional[float] = None):
+        """
+        Initializes the limiter
+
+        Args:
+            requests_per_minute (int): Request budget, defaults to settings.LLM_REQUESTS_PER_MINUTE
+            tokens_per_minute (int): Token budget, defaults to settings.LLM_TOKENS_PER_MINUTE
+            burst_seconds (float): Seconds of budget that can be spent at once, defaults to settings.LLM_RATE_LIMIT_BURST_SECONDS
+        """
+        self.requests_per_minute = requests_per_minute or settings.LLM_REQUESTS_PER_MINUTE
+        self.tokens_per_minute = tokens_per_minute or settings.LLM_TOKENS_PER_MINUTE
+        self.burst_seconds = burst_seconds or settings.LLM_RATE_LIMIT_BURST_SECONDS
+
+    def buckets(self, tokens: int) -> List[Tuple[str, float, float, float]]:
+        """Returns (name, capacity, refill per second, cost) of each bucket a request draws from"""
+        return [
+            (bucket, per_minute / 60 * self.burst_seconds, per_minute / 60, cost)
+            for bucket, per_minute, cost in (
+                ('requests', self.requests_per_minute, 1),
+                ('tokens', self.tokens_per_minute, tokens),
+            )
+        ]
+
+    @abc.abstractmethod
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserves capacity for one request
+
+        Args:
+            tokens (int): Tokens the request counts against the budget
+
+        Returns:
+            float: Seconds to wait before sending the request
+        """
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Reserves capacity for one request and sleeps until it is available
+
+        Args:
+            tokens (int): Tokens the request counts against the budget
+
+        Returns:
+            float: Seconds waited
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens: int) -> float:
+        """Reserves capacity for one request and waits for it without blocking the event loop"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Rate limiter shared by all workers
+
+    The buckets live in Redis and are updated by one script using the Redis clock, so
+    every worker draws from the same budget whatever its own clock says.
+    """
+
+    name = 'redis'
+    prefix = 'llm-rate-limit'
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, burst_seconds=None,
+                 url: Optional[str] = None, client=None):
+        """
+        Initializes the limiter
+
+        Args:
+            requests_per_minute (int): Request budget
+            tokens_per_minute (int): Token budget
+            burst_seconds (float): Seconds of budget that can be spent at once
+            url (str): Redis URL, defaults to settings.REDIS_URL
+            client (redis.Redis): Client to reuse, created from url when omitted
+        """
+        import redis
+
+        super().__init__(requests_per_minute, tokens_per_minute, burst_seconds)
+        self.client = client or redis.Redis.from_url(url or settings.REDIS_URL)
+        self.script = self.client.register_script(RESERVE_SCRIPT)
+
+    def reserve(self, tokens):
+        buckets = self.buckets(tokens)
+        arguments = [value for _, capacity, rate, cost in buckets for value in (capacity, rate, cost)]
+        # A bucket left alone for a full burst is full again, so it can simply expire
+        ttl = math.ceil(self.burst_seconds) + 60
+        return float(self.script(keys=[f"{self.prefix}:{name}" for name, *_ in buckets], args=arguments + [ttl]))
+
+    async def acquire_async(self, tokens):
+        # The script is a network round trip, which must not stall the event loop
+        delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Per-process rate limiter for development, tests and single-worker deployments"""
+
+    name = 'memory'
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, burst_seconds=None):
+        super().__init__(requests_per_minute, tokens_per_minute, burst_seconds)
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens):
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for name, capacity, rate, cost in self.buckets(tokens):
+                level, updated = self._levels.get(name, (capacity, now))
+                level = min(capacity, level + (now - updated) * rate) - cost
+                if level < 0:
+                    wait = max(wait, -level / rate)
+                self._levels[name] = (level, now)
+        return wait
+
+
+RATE_LIMITERS = {
+    RedisRateLimiter.name: RedisRateLimiter,
+    InMemoryRateLimiter.name: InMemoryRateLimiter,
+}
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Returns the process-wide rate limiter selected by settings.LLM_RATE_LIMITER_BACKEND
+
+    Returns:
+        RateLimiter: The shared limiter, or None when rate limiting is disabled
+    """
+    global _rate_limiter
+    if not settings.LLM_RATE_LIMITER_BACKEND:
+        return None
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            try:
+                limiter_class = RATE_LIMITERS[settings.LLM_RATE_LIMITER_BACKEND]
+            except KeyError:
+                raise ValueError(f"Unknown LLM rate limiter backend: {settings.LLM_RATE_LIMITER_BACKEND}")
+            _rate_limiter = limiter_class()
+        return _rate_limiter
@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import logging
+import os
+import socket
+import statistics
+import time
+import uuid
+from collections import deque
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.social_media.models import SocialMediaPost
+from services.social_publishing import PublishError, get_publisher
+
+# Global constants
+LATENESS_SAMPLES = 10000  # Recent publications kept for the lateness statistics
+UPDATE_BATCH_SIZE = 500
+STALE_CLAIM_CHECK_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledPostDispatcher:
+    """
+    Publishes scheduled posts at their scheduled time
+
+    Every poll_seconds the dispatcher claims the scheduled posts due within the next
+    lookahead_seconds, in batches of at most batch_size, and keeps them in a heap ordered
+    by scheduled time. It sleeps until the earliest one is due or the next poll, whichever
+    comes first, and starts publishing each post as soon as it is due, so posts go out
+    within a second of their time without querying the database for each of them. The
+    outcomes are likewise written back in bulk on every pass.
+
+    Any number of dispatchers can run side by side. A claim locks the due rows with
+    SELECT ... FOR UPDATE SKIP LOCKED, so dispatchers never wait on each other's batches,
+    and moves them from 'scheduled' to 'publishing' under a claim token; only the claimant
+    publishes a post or records its outcome. Posts still waiting in the heap are handed
+    back when a dispatcher stops. A post left claimed for longer than
+    claim_timeout_seconds, by a dispatcher that died, may or may not have been published,
+    so it is marked failed instead of being published again.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, lookahead_seconds: Optional[float] = None,
+                 poll_seconds: Optional[float] = None, claim_timeout_seconds: Optional[float] = None,
+                 name: Optional[str] = None):
+        """
+        Initializes the dispatcher
+
+        Args:
+            batch_size (int): Most posts claimed at once, defaults to settings.SOCIAL_DISPATCH_BATCH_SIZE
+            lookahead_seconds (float): How far ahead of their time posts are claimed, defaults to settings.SOCIAL_DISPATCH_LOOKAHEAD_SECONDS
+            poll_seconds (float): Seconds between claims, defaults to settings.SOCIAL_DISPATCH_POLL_SECONDS
+            claim_timeout_seconds (float): Seconds after which an unfinished claim is failed, defaults to settings.SOCIAL_DISPATCH_CLAIM_TIMEOUT_SECONDS
+            name (str): Identifies the dispatcher in the claims, defaults to the host name and process ID
+        """
+        self.batch_size = batch_size or settings.SOCIAL_DISPATCH_BATCH_SIZE
+        self.lookahead_seconds = lookahead_seconds if lookahead_seconds is not None else settings.SOCIAL_DISPATCH_LOOKAHEAD_SECONDS
+        self.poll_seconds = poll_seconds or settings.SOCIAL_DISPATCH_POLL_SECONDS
+        self.claim_timeout_seconds = claim_timeout_seconds or settings.SOCIAL_DISPATCH_CLAIM_TIMEOUT_SECONDS
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.published = 0
+        self.failed = 0
+        self.lateness = deque(maxlen=LATENESS_SAMPLES)
+        self._heap = []
+        self._tasks = set()
+        self._outcomes = []
+
+    def claim_due(self) -> List[SocialMediaPost]:
+        """
+        Claims the scheduled posts due within the lookahead, earliest first
+
+        Returns:
+            list: The claimed posts, at most batch_size
+        """
+        now = timezone.now()
+        token = f"{self.name}:{uuid.uuid4().hex[:12]}"
+        with transaction.atomic():
+            post_ids = list(
+                SocialMediaPost.objects.select_for_update(skip_locked=True)
+                .filter(status='scheduled', scheduled_time__lte=now + timedelta(seconds=self.lookahead_seconds))
+                .order_by('scheduled_time')
+                .values_list('id', flat=True)[:self.batch_size]
+            )
+            if not post_ids:
+                return []
+            # The status check keeps claims exclusive on databases without row locks
+            SocialMediaPost.objects.filter(id__in=post_ids, status='scheduled').update(
+                status='publishing', claimed_by=token, claimed_at=now)
+        return list(SocialMediaPost.objects.filter(claimed_by=token, status='publishing'))
+
+    def release(self, posts: List[SocialMediaPost]) -> int:
+        """
+        Hands claimed posts that were not published back to the other dispatchers
+
+        Args:
+            posts (list): Posts claimed by this dispatcher
+
+        Returns:
+            int: Number of posts released
+        """
+        released = 0
+        for claimed_by in {post.claimed_by for post in posts}:
+            released += SocialMediaPost.objects.filter(
+                id__in=[post.id for post in posts if post.claimed_by == claimed_by],
+                claimed_by=claimed_by,
+                status='publishing',
+            ).update(status='scheduled', claimed_by=None, claimed_at=None)
+        return released
+
+    def fail_stale_claims(self, post_ids: Optional[List[int]] = None) -> int:
+        """
+        Marks posts claimed longer than claim_timeout_seconds ago as failed
+
+        Args:
+            post_ids (list): Only check these posts, defaults to every post
+
+        Returns:
+            int: Number of posts failed
+        """
+        cutoff = timezone.now() - timedelta(seconds=self.claim_timeout_seconds)
+        stale = SocialMediaPost.objects.filter(status='publishing', claimed_at__lt=cutoff)
+        if post_ids is not None:
+            stale = stale.filter(id__in=post_ids)
+        failed = stale.update(status='failed')
+        if failed:
+            logger.warning(f"Marked {failed} posts failed whose dispatcher stopped while publishing them")
+        return failed
+
+    def record(self, posts: List[SocialMediaPost]) -> int:
+        """
+        Saves the outcome of published posts that are still claimed by this dispatcher
+
+        Args:
+            posts (list): Posts with their new status and post_id
+
+        Returns:
+            int: Number of posts saved
+        """
+        # A claim failed as stale belongs to nobody any more
+        claimed = set(
+            SocialMediaPost.objects.filter(
+                id__in=[post.id for post in posts],
+                claimed_by__in={post.claimed_by for post in posts},
+                status='publishing',
+            ).values_list('id', flat=True)
+        )
+        now = timezone.now()
+        for post in posts:
+            post.updated_at = now
+        return SocialMediaPost.objects.bulk_update(
+            [post for post in posts if post.id in claimed], ['status', 'post_id', 'updated_at'],
+            batch_size=UPDATE_BATCH_SIZE,
+        )
+
+    async def publish(self, post: SocialMediaPost) -> None:
+        """
+        Publishes a claimed post and queues its outcome to be recorded
+
+        Args:
+            post (SocialMediaPost): Post claimed by this dispatcher
+        """
+        self.lateness.append((timezone.now() - post.scheduled_time).total_seconds())
+        try:
+            response = await get_publisher(post.platform).publish(post.content, post.media_url)
+            post.status, post.post_id = 'published', response['id']
+            self.published += 1
+        except (PublishError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error publishing scheduled post {post.id} to {post.platform}: {str(e)}")
+            post.status = 'failed'
+            self.failed += 1
+        self._outcomes.append(post)
+
+    async def _record_outcomes(self) -> None:
+        if self._outcomes:
+            posts, self._outcomes = self._outcomes, []
+            await sync_to_async(self.record)(posts)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Dispatches scheduled posts until stop is set
+
+        Args:
+            stop (asyncio.Event): Set to stop the dispatcher; posts being published are finished first
+        """
+        stop = stop or asyncio.Event()
+        next_poll = next_stale_check = time.monotonic()
+        try:
+            while not stop.is_set():
+                if time.monotonic() >= next_stale_check:
+                    await sync_to_async(self.fail_stale_claims)()
+                    next_stale_check = time.monotonic() + STALE_CLAIM_CHECK_SECONDS
+                if time.monotonic() >= next_poll:
+                    claimed = await sync_to_async(self.claim_due)()
+                    for post in claimed:
+                        heapq.heappush(self._heap, (post.scheduled_time, post.id, post))
+                    # A full batch means more posts are due, so they are claimed straight away
+                    next_poll = time.monotonic() + (0 if len(claimed) == self.batch_size else self.poll_seconds)
+
+                now = timezone.now()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, post = heapq.heappop(self._heap)
+                    task = asyncio.create_task(self.publish(post))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                await self._record_outcomes()
+
+                wake = next_poll - time.monotonic()
+                if self._heap:
+                    wake = min(wake, (self._heap[0][0] - timezone.now()).total_seconds())
+                try:
+                    await asyncio.wait_for(stop.wait(), max(0.0, wake))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._heap:
+                released = await sync_to_async(self.release)([post for _, _, post in self._heap])
+                logger.info(f"Dispatcher {self.name} released {released} claimed posts")
+                self._heap.clear()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._record_outcomes()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns the posts published so far and how late they started
+
+        Returns:
+            dict: 'published', 'failed', 'pending' in the heap, and the p50, p95 and max
+            seconds between the scheduled time and the start of publishing
+        """
+        lateness = sorted(self.lateness)
+        return {
+            'published': self.published,
+            'failed': self.failed,
+            'pending': len(self._heap),
+            'lateness_p50': statistics.median(lateness) if lateness else 0.0,
+            'lateness_p95': lateness[int(0.95 * (len(lateness) - 1))] if lateness else 0.0,
+            'lateness_max': lateness[-1] if lateness else 0.0,
+        }
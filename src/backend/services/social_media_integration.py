@@ -1,50 +1,37 @@
 import logging
 import asyncio
-from typing import Dict, Any
+import aiohttp
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 
-# Assuming these imports will be available in the future
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from src.backend.apps.social_media.models import SocialMediaPost
+from django.db import transaction
+from django.utils import timezone
 
-# Third-party imports
-import facebook
-import tweepy
-from linkedin import linkedin
-from instagram_private_api import Client as InstagramAPI
+from apps.social_media.models import SocialMediaPost
+from services.social_publishing import PUBLISHERS, PublishError, get_publisher
 
 logger = logging.getLogger(__name__)
 
+
 class SocialMediaIntegrationService:
     """
     A service class that handles integration with various social media platforms for posting marketing content.
     """
 
-    def __init__(self):
-        """
-        Initializes the SocialMediaIntegrationService with API clients for each supported platform.
+    def __init__(self, credentials: Optional[Dict[str, Dict[str, str]]] = None):
         """
-        self.platform_apis: Dict[str, Any] = {}
-        self.platform_credentials: Dict[str, Dict[str, str]] = {}
+        Initializes the SocialMediaIntegrationService.
 
-        # Set up Facebook API client
-        self.platform_apis['facebook'] = facebook.GraphAPI(access_token=settings.FACEBOOK_ACCESS_TOKEN)
+        Nothing is created or logged in to here: posts go through the publishers, which
+        share the connection pool of the process-wide publishing client.
 
-        # Set up Twitter API client
-        auth = tweepy.OAuthHandler(settings.TWITTER_CONSUMER_KEY, settings.TWITTER_CONSUMER_SECRET)
-        auth.set_access_token(settings.TWITTER_ACCESS_TOKEN, settings.TWITTER_ACCESS_TOKEN_SECRET)
-        self.platform_apis['twitter'] = tweepy.API(auth)
-
-        # Set up LinkedIn API client
-        self.platform_apis['linkedin'] = linkedin.LinkedInApplication(
-            token=settings.LINKEDIN_ACCESS_TOKEN
-        )
-
-        # Set up Instagram API client
-        self.platform_apis['instagram'] = InstagramAPI(
-            username=settings.INSTAGRAM_USERNAME,
-            password=settings.INSTAGRAM_PASSWORD
-        )
+        Args:
+            credentials (dict): Tokens and IDs of the account to post as on each platform,
+                defaulting to the account configured in settings.
+        """
+        self.credentials: Dict[str, Dict[str, str]] = credentials or {}
 
     async def post_content(self, platform: str, content: str, media_url: str, episode_id: int) -> Dict[str, Any]:
         """
@@ -59,24 +46,94 @@ class SocialMediaIntegrationService:
         Returns:
             Dict[str, Any]: Response containing post ID and status.
         """
-        if platform not in self.platform_apis:
+        if platform not in PUBLISHERS:
             raise ValueError(f"Unsupported platform: {platform}")
 
         post_method = getattr(self, f"post_to_{platform}")
         response = await post_method(content, media_url)
 
         # Create and save a SocialMediaPost object
-        social_media_post = SocialMediaPost(
+        social_media_post = self._build_post(platform, content, episode_id, response)
+        await social_media_post.asave()
+
+        return response
+
+    async def publish_everywhere(self, content: Union[str, Dict[str, str]], media_url: str, episode_id: int,
+                                 platforms: Optional[List[str]] = None,
+                                 timeouts: Optional[Dict[str, float]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Posts content to several platforms at once.
+
+        Every platform is posted to concurrently, so the whole fan-out takes as long as the
+        slowest platform rather than the sum of them. A platform that fails or exceeds its
+        timeout does not affect the others. Timeouts apply to each request sent, never to
+        the time spent waiting for rate limit budget. The SocialMediaPost rows of all
+        platforms, published or failed, are then inserted in one transaction.
+
+        Args:
+            content (str or dict): The content to be posted, or the content for each platform.
+            media_url (str): URL of the media to be attached to the posts.
+            episode_id (int): ID of the associated podcast episode.
+            platforms (list): Platforms to post to, defaults to the platforms of content
+                when it is a dict, or to every supported platform.
+            timeouts (dict): Seconds allowed per request to each platform, defaulting to
+                settings.SOCIAL_PUBLISH_PLATFORM_TIMEOUTS, then settings.SOCIAL_PUBLISH_TIMEOUT_SECONDS.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Response of each platform, containing post ID and status,
+            or the error message.
+        """
+        if platforms is None:
+            platforms = list(content) if isinstance(content, dict) else list(PUBLISHERS)
+        unsupported = [platform for platform in platforms if platform not in PUBLISHERS]
+        if unsupported:
+            raise ValueError(f"Unsupported platform: {', '.join(unsupported)}")
+        contents = content if isinstance(content, dict) else dict.fromkeys(platforms, content)
+        timeouts = {**settings.SOCIAL_PUBLISH_PLATFORM_TIMEOUTS, **(timeouts or {})}
+
+        responses = dict(zip(platforms, await asyncio.gather(*(
+            self._publish(platform, contents[platform], media_url,
+                          timeouts.get(platform, settings.SOCIAL_PUBLISH_TIMEOUT_SECONDS))
+            for platform in platforms
+        ))))
+
+        posts = [self._build_post(platform, contents[platform], episode_id, response)
+                 for platform, response in responses.items()]
+        await sync_to_async(self._save_posts)(posts)
+        return responses
+
+    def _build_post(self, platform: str, content: str, episode_id: int, response: Dict[str, Any]) -> SocialMediaPost:
+        """
+        Builds the SocialMediaPost recording the outcome of a post.
+
+        Args:
+            platform (str): The social media platform posted to.
+            content (str): The content posted.
+            episode_id (int): ID of the associated podcast episode.
+            response (Dict[str, Any]): Response of the platform's post method.
+
+        Returns:
+            SocialMediaPost: Unsaved post, published or failed.
+        """
+        return SocialMediaPost(
             platform=platform,
             content=content,
-            media_url=media_url,
             episode_id=episode_id,
             post_id=response.get('id'),
-            status='published'
+            scheduled_time=timezone.now(),
+            status='published' if response.get('status') == 'success' else 'failed'
         )
-        await social_media_post.save()
 
-        return response
+    @staticmethod
+    def _save_posts(posts: List[SocialMediaPost]) -> None:
+        """
+        Inserts posts in one transaction.
+
+        Args:
+            posts (List[SocialMediaPost]): Unsaved posts.
+        """
+        with transaction.atomic():
+            SocialMediaPost.objects.bulk_create(posts)
 
     async def post_to_facebook(self, content: str, media_url: str) -> Dict[str, Any]:
         """
@@ -89,20 +146,7 @@ class SocialMediaIntegrationService:
         Returns:
             Dict[str, Any]: Response from Facebook API.
         """
-        try:
-            post_data = {
-                'message': content,
-                'link': media_url
-            }
-            response = self.platform_apis['facebook'].put_object(
-                parent_object='me',
-                connection_name='feed',
-                **post_data
-            )
-            return {'id': response['id'], 'status': 'success'}
-        except facebook.GraphAPIError as e:
-            logger.error(f"Error posting to Facebook: {str(e)}")
-            return {'status': 'error', 'message': str(e)}
+        return await self._publish('facebook', content, media_url)
 
     async def post_to_twitter(self, content: str, media_url: str) -> Dict[str, Any]:
         """
@@ -115,20 +159,7 @@ class SocialMediaIntegrationService:
         Returns:
             Dict[str, Any]: Response from Twitter API.
         """
-        try:
-            media_ids = []
-            if media_url:
-                media = self.platform_apis['twitter'].media_upload(media_url)
-                media_ids.append(media.media_id)
-
-            tweet = self.platform_apis['twitter'].update_status(
-                status=content,
-                media_ids=media_ids
-            )
-            return {'id': tweet.id, 'status': 'success'}
-        except tweepy.TweepError as e:
-            logger.error(f"Error posting to Twitter: {str(e)}")
-            return {'status': 'error', 'message': str(e)}
+        return await self._publish('twitter', content, media_url)
 
     async def post_to_linkedin(self, content: str, media_url: str) -> Dict[str, Any]:
         """
@@ -141,24 +172,7 @@ class SocialMediaIntegrationService:
         Returns:
             Dict[str, Any]: Response from LinkedIn API.
         """
-        try:
-            post_data = {
-                'comment': content,
-                'content': {
-                    'title': 'New Podcast Episode',
-                    'description': content[:100],
-                    'submitted-url': media_url,
-                    'submitted-image-url': media_url,
-                },
-                'visibility': {
-                    'code': 'anyone'
-                }
-            }
-            response = self.platform_apis['linkedin'].submit_share(post_data)
-            return {'id': response['updateKey'], 'status': 'success'}
-        except linkedin.LinkedInError as e:
-            logger.error(f"Error posting to LinkedIn: {str(e)}")
-            return {'status': 'error', 'message': str(e)}
+        return await self._publish('linkedin', content, media_url)
 
     async def post_to_instagram(self, content: str, media_url: str) -> Dict[str, Any]:
         """
@@ -171,24 +185,14 @@ class SocialMediaIntegrationService:
         Returns:
             Dict[str, Any]: Response from Instagram API.
         """
-        try:
-            # Download media from media_url
-            # This step would require additional implementation to download the media file
-            media_path = await self._download_media(media_url)
-
-            response = self.platform_apis['instagram'].post_photo(
-                media_path,
-                caption=content
-            )
-            return {'id': response['media']['id'], 'status': 'success'}
-        except Exception as e:
-            logger.error(f"Error posting to Instagram: {str(e)}")
-            return {'status': 'error', 'message': str(e)}
+        return await self._publish('instagram', content, media_url)
 
     async def schedule_post(self, platform: str, content: str, media_url: str, episode_id: int, scheduled_time: datetime) -> Dict[str, Any]:
         """
         Schedules a post for a future date on the specified platform.
 
+        The post is published at its scheduled time by the dispatch_scheduled_posts command.
+
         Args:
             platform (str): The social media platform to post to.
             content (str): The content to be posted.
@@ -199,10 +203,12 @@ class SocialMediaIntegrationService:
         Returns:
             Dict[str, Any]: Response containing scheduled post ID and status.
         """
-        if scheduled_time <= datetime.now():
+        if platform not in PUBLISHERS:
+            raise ValueError(f"Unsupported platform: {platform}")
+        if scheduled_time <= timezone.now():
             raise ValueError("Scheduled time must be in the future")
 
-        # Create a SocialMediaPost object with scheduled status
+        # The dispatchers claim the post shortly before its time and publish it then
         social_media_post = SocialMediaPost(
             platform=platform,
             content=content,
@@ -211,10 +217,7 @@ class SocialMediaIntegrationService:
             status='scheduled',
             scheduled_time=scheduled_time
         )
-        await social_media_post.save()
-
-        # Here you would implement platform-specific scheduling logic
-        # For simplicity, we'll just return the created post's ID
+        await social_media_post.asave()
         return {'id': social_media_post.id, 'status': 'scheduled'}
 
     async def get_post_analytics(self, platform: str, post_id: str) -> Dict[str, Any]:
@@ -228,7 +231,7 @@ class SocialMediaIntegrationService:
         Returns:
             Dict[str, Any]: Analytics data for the post.
         """
-        if platform not in self.platform_apis:
+        if platform not in PUBLISHERS:
             raise ValueError(f"Unsupported platform: {platform}")
 
         # Implement platform-specific analytics retrieval
@@ -245,23 +248,36 @@ class SocialMediaIntegrationService:
 
         return analytics
 
-    async def _download_media(self, media_url: str) -> str:
+    async def _publish(self, platform: str, content: str, media_url: str,
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
         """
-        Downloads media from the given URL.
+        Publishes a post through the shared non-blocking publishing client.
+
+        The SDK clients block, which stalled the event loop for the whole of every post;
+        here each post only awaits its HTTP requests, so many can be in flight on one loop.
 
         Args:
-            media_url (str): The URL of the media to download.
+            platform (str): The social media platform to post to.
+            content (str): The content to be posted.
+            media_url (str): URL of the media to be attached to the post.
+            timeout (float): Seconds allowed per request, defaults to the publishing client's timeout.
 
         Returns:
-            str: The local path of the downloaded media.
+            Dict[str, Any]: Response containing post ID and status, or the error message.
         """
-        # This method should be implemented to download media files
-        # It's a placeholder for now
-        return "/tmp/downloaded_media.jpg"
+        publisher = get_publisher(platform, self.credentials.get(platform), timeout=timeout)
+        try:
+            return await publisher.publish(content, media_url)
+        except asyncio.TimeoutError:
+            timeout = publisher.timeout or publisher.client.timeout
+            logger.error(f"Posting to {platform} timed out after {timeout}s")
+            return {'status': 'error', 'message': f"Timed out after {timeout}s"}
+        except (PublishError, aiohttp.ClientError) as e:
+            logger.error(f"Error posting to {platform}: {str(e)}")
+            return {'status': 'error', 'message': str(e)}
 
 # Pending human tasks:
 # TODO: Implement proper error handling and retry mechanisms for API calls
 # TODO: Set up secure storage for API keys and tokens
-# TODO: Implement rate limiting to comply with each platform's API usage policies
 # TODO: Create unit tests for each social media platform integration
 # TODO: Implement a mechanism to refresh expired tokens automatically
\ No newline at end of file
@@ -0,0 +1,344 @@
+import abc
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Coroutine, Dict, Optional
+
+from django.conf import settings
+
+from services.social_rate_limiter import SocialRateLimiter, get_social_rate_limiter
+
+# Global constants
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+class PublishError(Exception):
+    """Raised when a platform API responds with an error status"""
+
+    def __init__(self, platform: str, status: int, message: str, retry_after: Optional[float] = None):
+        self.platform = platform
+        self.status = status
+        self.retry_after = retry_after
+        super().__init__(f"{platform} API returned {status}: {message}")
+
+
+class PublishingClient:
+    """
+    Non-blocking HTTP client shared by the publishers of every platform
+
+    Requests are sent from an event loop owned by a background thread, so callers on
+    any event loop, including the short-lived loops of asyncio.run in tasks and
+    commands, share one persistent connection pool. A semaphore bounds the requests in
+    flight on it, so a single loop keeps many posts waiting on the platforms at once
+    instead of blocking on each SDK call in turn. With a rate limiter, each request
+    first waits for capacity in the budgets of its platform and account, on the
+    caller's loop and before taking a slot, so waiting posts do not hold connections.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 rate_limiter: Optional[SocialRateLimiter] = None):
+        """
+        Initializes the client and starts its event loop thread; the connection pool is created on first use
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight
+            timeout (float): Total seconds allowed per request
+            rate_limiter (SocialRateLimiter): Budgets requests per platform and account, None for no limit
+        """
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._session = None
+        self._semaphore = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='publishing-client', daemon=True)
+        self._thread.start()
+
+    def _get_session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session, self._semaphore
+
+    async def _run(self, coroutine: Coroutine) -> Any:
+        """Runs a coroutine on the client's event loop and awaits its result from the caller's loop"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._loop))
+
+    async def request(self, platform: str, method: str, url: str, account: str = '',
+                      timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Sends a request to a platform API and returns the decoded response
+
+        Waits for capacity first when the client has a rate limiter. The timeout only
+        starts once the request is sent, so time spent waiting for the budget never
+        counts against it.
+
+        Args:
+            platform (str): Platform the request is for, reported in errors
+            method (str): HTTP method
+            url (str): Full URL of the endpoint
+            account (str): Account the request is made for, whose budget it draws from
+            timeout (float): Total seconds allowed for the HTTP request, defaults to the client's timeout
+            **kwargs: Request arguments for aiohttp, such as data, json or headers
+
+        Returns:
+            dict: Decoded response body
+
+        Raises:
+            PublishError: If the platform responds with an error status
+            asyncio.TimeoutError: If the platform does not answer within the timeout
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(platform, account)
+        return await self._run(self._send(platform, method, url, timeout, **kwargs))
+
+    async def _send(self, platform: str, method: str, url: str, timeout: Optional[float], **kwargs) -> Dict[str, Any]:
+        import aiohttp
+
+        if timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+        session, semaphore = self._get_session()
+        async with semaphore:
+            async with session.request(method, url, **kwargs) as response:
+                if response.status >= 400:
+                    retry_after = response.headers.get('Retry-After')
+                    raise PublishError(
+                        platform,
+                        response.status,
+                        await response.text(),
+                        float(retry_after) if retry_after else None,
+                    )
+                return await response.json(content_type=None)
+
+    async def close(self) -> None:
+        """Closes the connection pool; the next request opens a new one"""
+        await self._run(self._close_session())
+
+    async def _close_session(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class Publisher(abc.ABC):
+    """
+    Posts to one platform through its HTTP API
+
+    Subclasses translate a post into the platform's requests; credentials hold the
+    tokens and IDs of the account posting.
+    """
+
+    name: str
+    default_api_base: str
+
+    def __init__(self, client: PublishingClient, credentials: Dict[str, str], api_base: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        """
+        Initializes the publisher
+
+        Args:
+            client (PublishingClient): Client the requests are sent with
+            credentials (dict): Tokens and IDs of the account posting
+            api_base (str): Base URL of the platform API, defaults to default_api_base
+            timeout (float): Seconds allowed per request, defaults to the client's timeout
+        """
+        self.client = client
+        self.credentials = credentials
+        self.api_base = (api_base or self.default_api_base).rstrip('/')
+        self.timeout = timeout
+
+    @abc.abstractmethod
+    async def publish(self, content: str, media_url: Optional[str]) -> Dict[str, Any]:
+        """
+        Publishes a post
+
+        Args:
+            content (str): Text of the post
+            media_url (str): URL of the media attached to the post, if any
+
+        Returns:
+            dict: The platform's ID of the post under 'id', and 'status'
+
+        Raises:
+            PublishError: If the platform refuses the post
+        """
+
+    @property
+    def account(self) -> str:
+        """Identifies the account posting in the rate limits, without exposing its token"""
+        return hashlib.sha256(self.credentials['access_token'].encode('utf-8')).hexdigest()[:16]
+
+    async def post(self, path: str, **kwargs) -> Dict[str, Any]:
+        """Posts to an endpoint of the platform API"""
+        return await self.client.request(self.name, 'POST', f"{self.api_base}{path}", account=self.account,
+                                         timeout=self.timeout, **kwargs)
+
+
+class FacebookPublisher(Publisher):
+    """Posts to the feed of a page through the Graph API"""
+
+    name = 'facebook'
+    default_api_base = 'https://graph.facebook.com/v18.0'
+
+    async def publish(self, content, media_url):
+        data = {'message': content, 'access_token': self.credentials['access_token']}
+        if media_url:
+            data['link'] = media_url
+        response = await self.post(f"/{self.credentials['page_id']}/feed", data=data)
+        return {'id': response['id'], 'status': 'success'}
+
+    @property
+    def account(self):
+        # 'me' is whichever page the token belongs to
+        page_id = self.credentials['page_id']
+        return super().account if page_id == 'me' else page_id
+
+
+class TwitterPublisher(Publisher):
+    """Posts a tweet through the v2 API with an OAuth 2.0 user token"""
+
+    name = 'twitter'
+    default_api_base = 'https://api.twitter.com'
+
+    async def publish(self, content, media_url):
+        # Media uploads still need the v1.1 API, so the media is linked instead
+        text = f"{content} {media_url}" if media_url else content
+        response = await self.post('/2/tweets', json={'text': text},
+                                   headers={'Authorization': f"Bearer {self.credentials['access_token']}"})
+        return {'id': response['data']['id'], 'status': 'success'}
+
+
+class LinkedInPublisher(Publisher):
+    """Shares an article through the UGC posts API"""
+
+    name = 'linkedin'
+    default_api_base = 'https://api.linkedin.com'
+
+    async def publish(self, content, media_url):
+        share = {'shareCommentary': {'text': content}, 'shareMediaCategory': 'NONE'}
+        if media_url:
+            share.update(shareMediaCategory='ARTICLE', media=[{
+                'status': 'READY',
+                'originalUrl': media_url,
+                'title': {'text': 'New Podcast Episode'},
+                'description': {'text': content[:100]},
+            }])
+        payload = {
+            'author': self.credentials['author_urn'],
+            'lifecycleState': 'PUBLISHED',
+            'specificContent': {'com.linkedin.ugc.ShareContent': share},
+            'visibility': {'com.linkedin.ugc.MemberNetworkVisibility': 'PUBLIC'},
+        }
+        response = await self.post('/v2/ugcPosts', json=payload, headers={
+            'Authorization': f"Bearer {self.credentials['access_token']}",
+            'X-Restli-Protocol-Version': '2.0.0',
+        })
+        return {'id': response['id'], 'status': 'success'}
+
+    @property
+    def account(self):
+        return self.credentials['author_urn']
+
+
+class InstagramPublisher(Publisher):
+    """Publishes a photo through the Instagram Graph API, which fetches the media itself"""
+
+    name = 'instagram'
+    default_api_base = 'https://graph.facebook.com/v18.0'
+
+    async def publish(self, content, media_url):
+        account, token = self.credentials['account_id'], self.credentials['access_token']
+        container = await self.post(f"/{account}/media",
+                                    data={'image_url': media_url, 'caption': content, 'access_token': token})
+        response = await self.post(f"/{account}/media_publish",
+                                   data={'creation_id': container['id'], 'access_token': token})
+        return {'id': response['id'], 'status': 'success'}
+
+    @property
+    def account(self):
+        return self.credentials['account_id']
+
+
+PUBLISHERS = {
+    FacebookPublisher.name: FacebookPublisher,
+    TwitterPublisher.name: TwitterPublisher,
+    LinkedInPublisher.name: LinkedInPublisher,
+    InstagramPublisher.name: InstagramPublisher,
+}
+
+
+def default_credentials(platform: str) -> Dict[str, str]:
+    """
+    Returns the credentials of the account configured in settings for a platform
+
+    Args:
+        platform (str): Platform name
+
+    Returns:
+        dict: Tokens and IDs the platform's publisher needs
+    """
+    credentials = {
+        'facebook': {'access_token': settings.FACEBOOK_ACCESS_TOKEN, 'page_id': settings.FACEBOOK_PAGE_ID},
+        'twitter': {'access_token': settings.TWITTER_OAUTH2_ACCESS_TOKEN},
+        'linkedin': {'access_token': settings.LINKEDIN_ACCESS_TOKEN, 'author_urn': settings.LINKEDIN_AUTHOR_URN},
+        'instagram': {'access_token': settings.INSTAGRAM_ACCESS_TOKEN, 'account_id': settings.INSTAGRAM_ACCOUNT_ID},
+    }
+    return credentials[platform]
+
+
+def get_publisher(platform: str, credentials: Optional[Dict[str, str]] = None,
+                  client: Optional[PublishingClient] = None, timeout: Optional[float] = None) -> Publisher:
+    """
+    Returns a publisher for a platform, configured from settings
+
+    Args:
+        platform (str): Platform name
+        credentials (dict): Account to post as, defaults to the account configured in settings
+        client (PublishingClient): Client to send requests with, defaults to the shared client of this process
+        timeout (float): Seconds allowed per request, defaults to the client's timeout
+
+    Returns:
+        Publisher: The platform's publisher
+
+    Raises:
+        ValueError: If the platform is not supported
+    """
+    try:
+        publisher_class = PUBLISHERS[platform]
+    except KeyError:
+        raise ValueError(f"Unsupported platform: {platform}")
+    return publisher_class(
+        client or get_publishing_client(),
+        credentials or default_credentials(platform),
+        settings.SOCIAL_API_BASES.get(platform),
+        timeout,
+    )
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_publishing_client() -> PublishingClient:
+    """
+    Returns the process-wide publishing client, configured from settings
+
+    Returns:
+        PublishingClient: The shared client
+    """
+    with _clients_lock:
+        client = _clients.get(os.getpid())
+        if client is None:
+            client = _clients[os.getpid()] = PublishingClient(
+                max_concurrency=settings.SOCIAL_PUBLISH_MAX_CONCURRENCY,
+                timeout=settings.SOCIAL_PUBLISH_TIMEOUT_SECONDS,
+                rate_limiter=get_social_rate_limiter(),
+            )
+        return client
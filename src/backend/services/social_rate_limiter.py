@@ -0,0 +1,273 @@
+import abc
+import asyncio
+import bisect
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+# Refills each bucket of KEYS but the last for the time elapsed since it was last
+# updated, then takes one request from all of them. Levels may go negative: the caller
+# is told how long to wait until the deepest debt is paid back, so posts are granted in
+# arrival order without any of them polling. The last key is the platform's metrics
+# hash, and the one before it the sorted set of wake-up times of waiting callers.
+# ARGV holds (capacity, refill per second) for each bucket, then the key TTL.
+RESERVE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local ttl = tonumber(ARGV[#ARGV])
+local wait = 0
+for index = 1, #KEYS - 2 do
+    local key = KEYS[index]
+    local capacity = tonumber(ARGV[index * 2 - 1])
+    local rate = tonumber(ARGV[index * 2])
+    local state = redis.call('HMGET', key, 'level', 'updated')
+    local level = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - updated) * rate) - 1
+    if level < 0 then
+        wait = math.max(wait, -level / rate)
+    end
+    redis.call('HSET', key, 'level', tostring(level), 'updated', tostring(now))
+    redis.call('EXPIRE', key, ttl)
+end
+local queue, metrics = KEYS[#KEYS - 1], KEYS[#KEYS]
+redis.call('HINCRBY', metrics, 'acquired', 1)
+redis.call('ZREMRANGEBYSCORE', queue, '-inf', now)
+if wait > 0 then
+    redis.call('ZADD', queue, now + wait, redis.call('HINCRBY', metrics, 'waited', 1))
+    redis.call('HINCRBYFLOAT', metrics, 'wait_seconds_total', tostring(wait))
+    redis.call('EXPIRE', queue, math.ceil(wait) + 60)
+end
+return tostring(wait)
+"""
+
+# Returns the counters of a platform's metrics hash and how many callers are still waiting
+METRICS_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local metrics = redis.call('HMGET', KEYS[2], 'acquired', 'waited', 'wait_seconds_total')
+return {redis.call('ZCARD', KEYS[1]), metrics[1] or '0', metrics[2] or '0', metrics[3] or '0'}
+"""
+
+
+class SocialRateLimiter(abc.ABC):
+    """
+    Token buckets budgeting requests to each platform and to each connected account
+
+    Platforms limit the requests of the app as a whole and of every account posting,
+    so a request draws from the platform's bucket and from its account's bucket. Each
+    bucket refills continuously at its per-minute budget and holds at most burst_seconds
+    worth of it, or one request. Callers are told exactly how long to wait for capacity
+    and sleep for it, rather than sending the request and being throttled.
+
+    Callers waiting at the moment (queue depth), requests granted, requests that had
+    to wait and the total seconds waited are recorded per platform.
+    """
+
+    name: str
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None, burst_seconds: Optional[float] = None):
+        """
+        Initializes the limiter
+
+        Args:
+            limits (dict): For each platform, 'requests_per_minute' for the app and
+                'account_requests_per_minute' for each account; a missing or zero budget
+                is not limited. Defaults to settings.SOCIAL_RATE_LIMITS
+            burst_seconds (float): Seconds of budget that can be spent at once, defaults to settings.SOCIAL_RATE_LIMIT_BURST_SECONDS
+        """
+        self.limits = limits if limits is not None else settings.SOCIAL_RATE_LIMITS
+        self.burst_seconds = burst_seconds or settings.SOCIAL_RATE_LIMIT_BURST_SECONDS
+
+    def buckets(self, platform: str, account: str) -> List[Tuple[str, float, float]]:
+        """Returns (name, capacity, refill per second) of each bucket a request draws from"""
+        limits = self.limits.get(platform, {})
+        return [
+            (bucket, max(1.0, per_minute / 60 * self.burst_seconds), per_minute / 60)
+            for bucket, per_minute in (
+                (platform, limits.get('requests_per_minute')),
+                (f"{platform}:{account}", limits.get('account_requests_per_minute')),
+            )
+            if per_minute
+        ]
+
+    @abc.abstractmethod
+    def reserve(self, platform: str, account: str) -> float:
+        """
+        Reserves capacity for one request and records it in the metrics
+
+        Args:
+            platform (str): Platform the request is sent to
+            account (str): Account the request is made for
+
+        Returns:
+            float: Seconds to wait before sending the request
+        """
+
+    async def acquire(self, platform: str, account: str) -> float:
+        """
+        Reserves capacity for one request and waits for it without blocking the event loop
+
+        Args:
+            platform (str): Platform the request is sent to
+            account (str): Account the request is made for
+
+        Returns:
+            float: Seconds waited
+        """
+        delay = self.reserve(platform, account)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    @abc.abstractmethod
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the metrics of every platform with limits
+
+        Returns:
+            dict: For each platform, 'queue_depth', 'acquired', 'waited', 'wait_seconds_total'
+            and 'average_wait_seconds' over the requests that waited
+        """
+
+    @staticmethod
+    def format_metrics(queue_depth: int, acquired: int, waited: int, wait_seconds_total: float) -> Dict[str, Any]:
+        return {
+            'queue_depth': queue_depth,
+            'acquired': acquired,
+            'waited': waited,
+            'wait_seconds_total': round(wait_seconds_total, 3),
+            'average_wait_seconds': round(wait_seconds_total / waited, 3) if waited else 0.0,
+        }
+
+
+class RedisSocialRateLimiter(SocialRateLimiter):
+    """
+    Rate limiter shared by all workers
+
+    The buckets and metrics live in Redis and are updated by one script using the Redis
+    clock, so every worker draws from the same budgets. A waiting caller is recorded
+    with its wake-up time rather than counted in and out, so the queue depth stays right
+    when a worker dies while waiting.
+    """
+
+    name = 'redis'
+    prefix = 'social-rate-limit'
+
+    def __init__(self, limits=None, burst_seconds=None, url: Optional[str] = None, client=None):
+        """
+        Initializes the limiter
+
+        Args:
+            limits (dict): Per-minute budgets of each platform and its accounts
+            burst_seconds (float): Seconds of budget that can be spent at once
+            url (str): Redis URL, defaults to settings.REDIS_URL
+            client (redis.Redis): Client to reuse, created from url when omitted
+        """
+        import redis
+
+        super().__init__(limits, burst_seconds)
+        self.client = client or redis.Redis.from_url(url or settings.REDIS_URL)
+        self.reserve_script = self.client.register_script(RESERVE_SCRIPT)
+        self.metrics_script = self.client.register_script(METRICS_SCRIPT)
+
+    def metric_keys(self, platform: str) -> List[str]:
+        return [f"{self.prefix}:queue:{platform}", f"{self.prefix}:metrics:{platform}"]
+
+    def reserve(self, platform, account):
+        buckets = self.buckets(platform, account)
+        arguments = [value for _, capacity, rate in buckets for value in (capacity, rate)]
+        # A bucket left alone long enough to refill completely can simply expire
+        ttl = max([math.ceil(capacity / rate) for _, capacity, rate in buckets], default=0) + 60
+        keys = [f"{self.prefix}:{name}" for name, *_ in buckets] + self.metric_keys(platform)
+        return float(self.reserve_script(keys=keys, args=arguments + [ttl]))
+
+    async def acquire(self, platform, account):
+        # The script is a network round trip, which must not stall the event loop
+        delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve, platform, account)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def get_metrics(self):
+        metrics = {}
+        for platform in self.limits:
+            queue_depth, acquired, waited, wait_seconds_total = self.metrics_script(keys=self.metric_keys(platform))
+            metrics[platform] = self.format_metrics(int(queue_depth), int(acquired), int(waited), float(wait_seconds_total))
+        return metrics
+
+
+class InMemorySocialRateLimiter(SocialRateLimiter):
+    """Per-process rate limiter for development, tests and single-worker deployments"""
+
+    name = 'memory'
+
+    def __init__(self, limits=None, burst_seconds=None):
+        super().__init__(limits, burst_seconds)
+        self._levels = {}
+        self._wake_times = defaultdict(list)
+        self._counters = defaultdict(lambda: {'acquired': 0, 'waited': 0, 'wait_seconds_total': 0.0})
+        self._lock = threading.Lock()
+
+    def reserve(self, platform, account):
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for name, capacity, rate in self.buckets(platform, account):
+                level, updated = self._levels.get(name, (capacity, now))
+                level = min(capacity, level + (now - updated) * rate) - 1
+                if level < 0:
+                    wait = max(wait, -level / rate)
+                self._levels[name] = (level, now)
+
+            counters = self._counters[platform]
+            counters['acquired'] += 1
+            if wait > 0:
+                counters['waited'] += 1
+                counters['wait_seconds_total'] += wait
+                bisect.insort(self._wake_times[platform], now + wait)
+        return wait
+
+    def get_metrics(self):
+        now = time.monotonic()
+        metrics = {}
+        with self._lock:
+            for platform in self.limits:
+                wake_times = self._wake_times[platform]
+                del wake_times[:bisect.bisect_right(wake_times, now)]
+                metrics[platform] = self.format_metrics(len(wake_times), **self._counters[platform])
+        return metrics
+
+
+SOCIAL_RATE_LIMITERS = {
+    RedisSocialRateLimiter.name: RedisSocialRateLimiter,
+    InMemorySocialRateLimiter.name: InMemorySocialRateLimiter,
+}
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_social_rate_limiter() -> Optional[SocialRateLimiter]:
+    """
+    Returns the process-wide rate limiter selected by settings.SOCIAL_RATE_LIMITER_BACKEND
+
+    Returns:
+        SocialRateLimiter: The shared limiter, or None when rate limiting is disabled
+    """
+    global _rate_limiter
+    if not settings.SOCIAL_RATE_LIMITER_BACKEND:
+        return None
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            try:
+                limiter_class = SOCIAL_RATE_LIMITERS[settings.SOCIAL_RATE_LIMITER_BACKEND]
+            except KeyError:
+                raise ValueError(f"Unknown social rate limiter backend: {settings.SOCIAL_RATE_LIMITER_BACKEND}")
+            _rate_limiter = limiter_class()
+        return _rate_limiter
@@ -7,6 +7,9 @@ import logging
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Size of each ranged GET when streaming objects
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB
+
 # Initialize S3 client
 s3_client = boto3.client(
     's3',
@@ -87,6 +90,77 @@ def download_file(file_name):
         logger.error(f"Unexpected error during file download: {str(e)}")
         raise
 
+def file_name_from_url(file_url):
+    """
+    Returns the S3 key of a file given its bucket URL, or the value unchanged if it is already a key.
+
+    Args:
+        file_url (str): URL returned by upload_file, or an S3 key
+
+    Returns:
+        str: Name of the file in S3
+    """
+    prefix = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/"
+    return file_url[len(prefix):] if file_url.startswith(prefix) else file_url
+
+def iter_file_chunks(file_name, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Streams a file from the configured S3 bucket as a sequence of ranged GETs.
+
+    Only one chunk is held in memory at a time, regardless of the object size.
+
+    Args:
+        file_name (str): Name of the file in S3, or its bucket URL
+        chunk_size (int): Number of bytes requested per ranged GET
+
+    Yields:
+        bytes: Consecutive chunks of the file content
+
+    Raises:
+        ClientError: If there's an error with the S3 client or the file doesn't exist
+    """
+    file_name = file_name_from_url(file_name)
+    try:
+        size = s3_client.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_name)['ContentLength']
+        for start in range(0, size, chunk_size):
+            end = min(start + chunk_size, size) - 1
+            response = s3_client.get_object(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Key=file_name,
+                Range=f"bytes={start}-{end}"
+            )
+            yield response['Body'].read()
+
+    except ClientError as e:
+        if e.response['Error']['Code'] == "404":
+            logger.error(f"The file {file_name} does not exist in the S3 bucket.")
+        else:
+            logger.error(f"Error streaming file from S3: {str(e)}")
+        raise
+
+def get_file_etag(file_name):
+    """
+    Returns the ETag of a file in the configured S3 bucket, or None if it does not exist.
+
+    Args:
+        file_name (str): Name of the file in S3, or its bucket URL
+
+    Returns:
+        str: The ETag of the current version of the file, or None
+
+    Raises:
+        ClientError: If there's an error with the S3 client
+    """
+    try:
+        response = s3_client.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_name_from_url(file_name))
+        return response['ETag']
+
+    except ClientError as e:
+        if e.response['Error']['Code'] == "404":
+            return None
+        logger.error(f"Error reading file metadata from S3: {str(e)}")
+        raise
+
 def delete_file(file_name):
     """
     Deletes a file from the configured S3 bucket.
@@ -0,0 +1,226 @@
+import hashlib
+import logging
+import math
+import re
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .extractive_summary import summarize
+from .llm_client import LLMClient, chat_completion_text, get_llm_client
+
+# Global constants
+CHARS_PER_TOKEN = 4  # Rough average for English text
+CONDENSATION_PROMPT_VERSION = 1  # Bump whenever the prompts below change so cached briefs are rebuilt
+MIN_CHUNK_SUMMARY_TOKENS = 120
+MAX_EXTRACTIVE_SENTENCES = 40
+STRATEGIES = ('extractive', 'llm')
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+SYSTEM_MESSAGE = "You condense podcast transcripts into accurate, factual notes for marketing copywriters."
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in a text
+
+    Args:
+        text (str): The text
+
+    Returns:
+        int: Approximate token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cuts a text to a token budget, at the last sentence end that fits when there is one
+
+    Args:
+        text (str): The text
+        max_tokens (int): Token budget
+
+    Returns:
+        str: The text, shortened if needed
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    sentence_end = max(cut.rfind('. '), cut.rfind('? '), cut.rfind('! '))
+    return cut[:sentence_end + 1] if sentence_end > max_chars // 2 else cut.rsplit(' ', 1)[0]
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits a text into chunks under a token budget, breaking between sentences where possible
+
+    Args:
+        text (str): The text
+        max_tokens (int): Token budget of each chunk
+
+    Returns:
+        list: The chunks, in order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    pieces = []
+    for sentence in SENTENCE_PATTERN.split(text.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        # Unpunctuated transcripts have no sentence breaks, so fall back to word boundaries
+        words, length = [], 0
+        for word in sentence.split():
+            if words and length + 1 + len(word) > max_chars:
+                pieces.append(' '.join(words))
+                words, length = [], 0
+            length += len(word) + (1 if words else 0)
+            words.append(word)
+        if words:
+            pieces.append(' '.join(words))
+
+    chunks, current, length = [], [], 0
+    for piece in pieces:
+        if current and length + 1 + len(piece) > max_chars:
+            chunks.append(' '.join(current))
+            current, length = [], 0
+        length += len(piece) + (1 if current else 0)
+        current.append(piece)
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+class TranscriptCondenser:
+    """
+    Condenses a full transcript into an episode brief under a token budget
+
+    With the 'extractive' strategy, the brief is made of the transcript's most salient
+    sentences, selected locally at no API cost. With the 'llm' strategy, the transcript
+    is split into chunks that are summarized concurrently (map), and the chunk summaries
+    are merged into one brief (reduce), in several rounds if they do not fit in a single
+    request. Briefs are cached by a digest of the transcript content, so every platform
+    and variant generated for the same transcript version reuses one brief.
+    """
+
+    def __init__(self, llm_client: Optional[LLMClient] = None, model: Optional[str] = None,
+                 brief_tokens: Optional[int] = None, chunk_tokens: Optional[int] = None,
+                 strategy: Optional[str] = None):
+        """
+        Initializes the condenser
+
+        Args:
+            llm_client (LLMClient): Completion client, defaults to the shared client of this process
+            model (str): Chat model, defaults to settings.TRANSCRIPT_CONDENSATION_MODEL
+            brief_tokens (int): Token budget of the brief, defaults to settings.TRANSCRIPT_BRIEF_MAX_TOKENS
+            chunk_tokens (int): Token budget of each request's input, defaults to settings.TRANSCRIPT_CHUNK_TOKENS
+            strategy (str): 'extractive' or 'llm', defaults to settings.TRANSCRIPT_BRIEF_STRATEGY
+        """
+        self.strategy = strategy or settings.TRANSCRIPT_BRIEF_STRATEGY
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown transcript brief strategy: {self.strategy}")
+        self.llm_client = llm_client or (get_llm_client() if self.strategy == 'llm' else None)
+        self.model = model or settings.TRANSCRIPT_CONDENSATION_MODEL
+        self.brief_tokens = brief_tokens or settings.TRANSCRIPT_BRIEF_MAX_TOKENS
+        self.chunk_tokens = chunk_tokens or settings.TRANSCRIPT_CHUNK_TOKENS
+
+    def cache_key(self, content: str) -> str:
+        """Returns the brief cache key for a transcript's content and this condenser's configuration"""
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if self.strategy == 'extractive':
+            return f"episode-brief:{digest}:extractive:{self.brief_tokens}"
+        return f"episode-brief:{digest}:{self.model}:{self.brief_tokens}:{CONDENSATION_PROMPT_VERSION}"
+
+    def get_brief(self, content: Optional[str]) -> str:
+        """
+        Returns the cached brief of a transcript, condensing it on a miss
+
+        Args:
+            content (str): Full transcript text
+
+        Returns:
+            str: The brief, or an empty string for an empty transcript
+        """
+        content = (content or '').strip()
+        if not content:
+            return ''
+        if estimate_tokens(content) <= self.brief_tokens:
+            return content
+
+        key = self.cache_key(content)
+        brief = cache.get(key)
+        if brief is None:
+            brief = self.condense(content)
+            cache.set(key, brief, settings.TRANSCRIPT_BRIEF_CACHE_TIMEOUT)
+        return brief
+
+    def condense(self, content: str) -> str:
+        """
+        Condenses a transcript without consulting the cache
+
+        Args:
+            content (str): Full transcript text
+
+        Returns:
+            str: The brief, within the token budget
+        """
+        if self.strategy == 'extractive':
+            return summarize(content, MAX_EXTRACTIVE_SENTENCES, max_chars=self.brief_tokens * CHARS_PER_TOKEN)
+
+        chunks = chunk_text(content, self.chunk_tokens)
+        if len(chunks) == 1:
+            return self._summarize([self._brief_messages(chunks[0])], self.brief_tokens)[0]
+
+        # Size chunk summaries so that all of them fit in one reduce request when possible
+        summary_tokens = max(MIN_CHUNK_SUMMARY_TOKENS, self.chunk_tokens // len(chunks))
+        summaries = self._summarize(
+            [self._chunk_messages(chunk, index, len(chunks)) for index, chunk in enumerate(chunks)],
+            summary_tokens,
+        )
+        logger.info(f"Summarized {len(chunks)} transcript chunks")
+
+        while sum(estimate_tokens(summary) for summary in summaries) > self.chunk_tokens:
+            groups = chunk_text('\n\n'.join(summaries), self.chunk_tokens)
+            if len(groups) >= len(summaries):
+                break
+            summaries = self._summarize([self._merge_messages(group) for group in groups], summary_tokens)
+
+        return self._summarize([self._brief_messages('\n\n'.join(summaries))], self.brief_tokens)[0]
+
+    def _summarize(self, conversations, max_tokens):
+        results = self.llm_client.chat_completions(self.model, conversations, max_tokens=max_tokens, temperature=0.3)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return [truncate_to_tokens(chat_completion_text(result), max_tokens) for result in results]
+
+    def _messages(self, instruction, text):
+        return [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": f"{instruction}\n\n{text}"},
+        ]
+
+    def _chunk_messages(self, chunk, index, total):
+        return self._messages(
+            f"Summarize part {index + 1} of {total} of a podcast transcript. Keep the topics discussed, "
+            "names of guests and products, concrete facts and any memorable quotes.",
+            chunk,
+        )
+
+    def _merge_messages(self, summaries):
+        return self._messages(
+            "Merge these consecutive summaries of a podcast episode into one shorter summary, "
+            "keeping the most important topics, names, facts and quotes.",
+            summaries,
+        )
+
+    def _brief_messages(self, text):
+        return self._messages(
+            f"Write a brief of this podcast episode in at most {self.brief_tokens * 3 // 4} words for "
+            "marketing copywriters: what it is about, who appears, the key takeaways and one or two "
+            "quotable lines.",
+            text,
+        )
@@ -1,22 +1,128 @@
 import os
-from google.cloud import speech, storage
+import io
+import json
+import hashlib
+import logging
+import tempfile
+import uuid
 from celery import shared_task
-from typing import Dict, Any
+from django.conf import settings
+from typing import Dict, Any, Iterator, Optional, Tuple
 
-# Assuming StorageService is implemented elsewhere
-from .storage import StorageService
+from .storage import (
+    STREAM_CHUNK_SIZE, download_file, file_name_from_url, get_file_etag, iter_file_chunks, upload_file
+)
+from .audio_normalization import AudioNormalizer, OffsetMap
+from .recognizers import RecognizerBackend, get_recognizer
+from .transcription_pipeline import ChunkedTranscriptionPipeline
+from .transcription_status import ProgressReporter, get_status_store
 
 # Global constants
 SAMPLE_RATE_HERTZ = 16000
 LANGUAGE_CODE = "en-US"
+NORMALIZED_AUDIO_PREFIX = "normalized-audio/"
+SPOOL_MAX_BYTES = 32 * 1024 * 1024  # Normalized audio spills to disk beyond this size
+NORMALIZATION_PROGRESS = 10.0  # Share of the reported progress given to normalization
+
+logger = logging.getLogger(__name__)
+
+
+def get_configured_recognizer() -> RecognizerBackend:
+    """
+    Builds the recognizer backend selected in settings
+
+    Returns:
+        RecognizerBackend: Backend named by TRANSCRIPTION_RECOGNIZER
+    """
+    return get_recognizer(settings.TRANSCRIPTION_RECOGNIZER, **settings.TRANSCRIPTION_RECOGNIZER_OPTIONS)
+
+
+def get_configured_normalizer() -> AudioNormalizer:
+    """
+    Builds the audio normalizer configured in settings
+
+    Returns:
+        AudioNormalizer: Normalizer using the TRANSCRIPTION_*SILENCE* settings
+    """
+    return AudioNormalizer(
+        trim_silence=settings.TRANSCRIPTION_TRIM_SILENCE,
+        threshold_db=settings.TRANSCRIPTION_SILENCE_THRESHOLD_DB,
+        min_silence_seconds=settings.TRANSCRIPTION_MIN_SILENCE_SECONDS,
+    )
+
+
+def normalized_audio_name(file_name: str, etag: str, normalizer: AudioNormalizer) -> str:
+    """
+    Returns the storage name of the normalized artifact for a version of an audio file
+
+    Args:
+        file_name (str): Name of the source file in S3
+        etag (str): ETag of the source file, so replaced uploads are normalized again
+        normalizer (AudioNormalizer): Normalizer whose options shaped the artifact
+
+    Returns:
+        str: Name shared by the normalized WAV and its offset map, without extension
+    """
+    key = json.dumps({'source': file_name, 'etag': etag, 'options': normalizer.options}, sort_keys=True)
+    return NORMALIZED_AUDIO_PREFIX + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def load_normalized_audio(audio_file_url: str,
+                          normalizer: Optional[AudioNormalizer] = None) -> Tuple[Iterator[bytes], OffsetMap, float]:
+    """
+    Returns 16 kHz mono audio for a file, normalizing it only if no cached artifact exists
+
+    A fresh artifact is written to a spooled temporary file, uploaded next to the
+    source, and then streamed from the temporary file. The offset map is uploaded
+    last, so its presence marks a complete artifact.
+
+    Args:
+        audio_file_url (str): The URL of the audio file
+        normalizer (AudioNormalizer): Normalizer to use, defaults to the configured one
+
+    Returns:
+        tuple: An iterator of normalized WAV chunks, the offset map to the original
+            timeline and the duration of the normalized audio in seconds
+    """
+    normalizer = normalizer or get_configured_normalizer()
+    file_name = file_name_from_url(audio_file_url)
+    artifact_name = normalized_audio_name(file_name, get_file_etag(file_name), normalizer)
+
+    if get_file_etag(f"{artifact_name}.json") is not None:
+        logger.info(f"Using cached normalized audio for {file_name}")
+        metadata = json.loads(download_file(f"{artifact_name}.json"))
+        return iter_file_chunks(f"{artifact_name}.wav"), OffsetMap.from_dict(metadata['offset_map']), metadata['duration']
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        result = normalizer.normalize(iter_file_chunks(file_name), output)
+        output.seek(0)
+        upload_file(output, f"{artifact_name}.wav")
+        metadata = {'offset_map': result['offset_map'].to_dict(), 'duration': result['duration']}
+        upload_file(io.BytesIO(json.dumps(metadata).encode('utf-8')), f"{artifact_name}.json")
+        output.seek(0)
+    except Exception:
+        output.close()
+        raise
+
+    def read_output():
+        with output:
+            yield from iter(lambda: output.read(STREAM_CHUNK_SIZE), b'')
+
+    return read_output(), result['offset_map'], result['duration']
+
 
 class TranscriptionService:
     """Service class for handling podcast episode transcription"""
 
-    def __init__(self):
-        """Initializes the TranscriptionService with necessary clients and services"""
-        self.storage_service = StorageService()
-        self.speech_client = speech.SpeechClient()
+    def __init__(self, recognizer: Optional[RecognizerBackend] = None):
+        """
+        Initializes the TranscriptionService with necessary clients and services
+
+        Args:
+            recognizer (RecognizerBackend): Recognition engine, defaults to the configured backend
+        """
+        self.recognizer = recognizer or get_configured_recognizer()
 
     def transcribe_episode(self, episode_id: int, audio_file_url: str) -> str:
         """
@@ -33,8 +139,12 @@ class TranscriptionService:
         if not isinstance(episode_id, int) or not isinstance(audio_file_url, str):
             raise ValueError("Invalid input parameters")
 
+        # Publish the queued state before dispatching so it can never overwrite the task's own progress
+        task_id = str(uuid.uuid4())
+        get_status_store().publish(task_id, 'queued', 0.0, episode_id=episode_id)
+
         # Call transcribe_audio Celery task asynchronously
-        task = transcribe_audio.delay(audio_file_url, episode_id)
+        task = transcribe_audio.apply_async((audio_file_url, episode_id), task_id=task_id)
 
         # Return the task ID
         return task.id
@@ -49,74 +159,78 @@ class TranscriptionService:
         Returns:
             dict: Status information of the transcription task
         """
-        # Retrieve task status from Celery
-        task = transcribe_audio.AsyncResult(task_id)
+        # Progress is read from the status store the task publishes to, never from the result backend
+        event = get_status_store().get(task_id)
+        return event or {"task_id": task_id, "stage": "unknown", "sequence": 0}
+
+    def transcribe_audio_file(self, audio_file_url: str, episode_id: int, progress: ProgressReporter) -> Dict[str, Any]:
+        """
+        Transcribes an audio file with the recognizer of this service
+
+        Args:
+            audio_file_url (str): The URL of the audio file to transcribe
+            episode_id (int): The ID of the episode being transcribed
+            progress (ProgressReporter): Publishes the progress of the transcription
 
-        # Return status information
+        Returns:
+            dict: Transcription result containing text, confidence and word timestamps
+        """
+        try:
+            pipeline = ChunkedTranscriptionPipeline(
+                self.recognizer,
+                max_workers=settings.TRANSCRIPTION_MAX_WORKERS,
+                window_seconds=settings.TRANSCRIPTION_WINDOW_SECONDS,
+                overlap_seconds=settings.TRANSCRIPTION_OVERLAP_SECONDS,
+            )
+            progress.report('normalizing', 0.0, episode_id=episode_id)
+            audio_chunks, offset_map, duration = load_normalized_audio(audio_file_url)
+
+            def on_progress(recognized_seconds):
+                share = recognized_seconds / duration if duration else 1.0
+                progress.report('recognizing', NORMALIZATION_PROGRESS + (100.0 - NORMALIZATION_PROGRESS) * share,
+                                episode_id=episode_id)
+
+            progress.report('recognizing', NORMALIZATION_PROGRESS, episode_id=episode_id)
+            result = pipeline.transcribe_stream(audio_chunks, SAMPLE_RATE_HERTZ, on_progress=on_progress)
+        except Exception as e:
+            progress.report('failed', 0.0, episode_id=episode_id, error=str(e))
+            raise
+
+        logger.info(f"Transcription for episode {episode_id} completed: {result['duration']:.1f}s of audio")
+        progress.report('completed', 100.0, episode_id=episode_id, word_count=len(result['words']))
+
+        # Return transcription result
         return {
-            "task_id": task_id,
-            "status": task.status,
-            "result": task.result if task.successful() else None,
+            "episode_id": episode_id,
+            "transcript": result["transcript"],
+            "confidence": result["confidence"],
+            "timestamps": offset_map.remap_words(result["words"]),
         }
 
 
-@shared_task
-def transcribe_audio(audio_file_url: str, episode_id: int) -> Dict[str, Any]:
+@shared_task(bind=True)
+def transcribe_audio(self, audio_file_url: str, episode_id: int) -> Dict[str, Any]:
     """
     Celery task for asynchronous transcription of audio files
 
+    The audio is normalized to 16 kHz mono with long silences removed (or loaded from
+    the normalization cache), then split into overlapping windows that are recognized
+    concurrently, so wall-clock time scales with the worker count and memory stays
+    bounded regardless of the episode length. Word times are mapped back onto the
+    original timeline. Progress, with an ETA, is published to the status store.
+
     Args:
+        self: The task instance (automatically injected by Celery)
         audio_file_url (str): The URL of the audio file to transcribe
         episode_id (int): The ID of the episode being transcribed
 
     Returns:
-        dict: Transcription result containing text and confidence
+        dict: Transcription result containing text, confidence and word timestamps
     """
-    # Retrieve audio file from StorageService
-    storage_service = StorageService()
-    audio_content = storage_service.get_file_content(audio_file_url)
-
-    # Configure Google Cloud Speech client
-    client = speech.SpeechClient()
-
-    # Perform long-running recognition on audio file
-    audio = speech.RecognitionAudio(content=audio_content)
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=SAMPLE_RATE_HERTZ,
-        language_code=LANGUAGE_CODE,
-    )
-
-    operation = client.long_running_recognize(config=config, audio=audio)
-
-    print(f"Waiting for operation to complete... for episode_id: {episode_id}")
-    response = operation.result(timeout=90)
-
-    # Process and format transcription results
-    transcript = ""
-    confidence = 0.0
-
-    for result in response.results:
-        transcript += result.alternatives[0].transcript + " "
-        confidence += result.alternatives[0].confidence
-
-    if response.results:
-        confidence /= len(response.results)
-
-    # Save transcription to database
-    # This step would typically involve interacting with a database model
-    # For now, we'll just print the result
-    print(f"Transcription for episode {episode_id} completed.")
-
-    # Return transcription result
-    return {
-        "episode_id": episode_id,
-        "transcript": transcript.strip(),
-        "confidence": confidence,
-    }
+    progress = ProgressReporter(self.request.id)
+    return TranscriptionService().transcribe_audio_file(audio_file_url, episode_id, progress)
 
 # Pending human tasks:
 # TODO: Set up Google Cloud Speech-to-Text API credentials and permissions
 # TODO: Implement error handling and retries for transcription tasks
-# TODO: Optimize audio file processing for large files
 # TODO: Implement support for multiple languages in transcription
\ No newline at end of file
@@ -0,0 +1,273 @@
+import io
+import logging
+import wave
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Global constants
+SAMPLE_RATE_HERTZ = 16000
+SAMPLE_WIDTH_BYTES = 2  # LINEAR16
+WINDOW_SECONDS = 55.0  # Stays below the one-minute limit of synchronous recognition
+OVERLAP_SECONDS = 2.0
+MAX_WORKERS = 8
+READ_FRAMES = 64 * 1024
+
+
+class ChunkReader(io.RawIOBase):
+    """Unseekable file-like view over an iterator of byte chunks"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b''
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_wav_stream(chunks: Iterable[bytes]) -> Tuple[Optional[wave.Wave_read], Iterator[bytes]]:
+    """
+    Opens a stream of chunks as a WAV file if it starts with a RIFF header
+
+    Args:
+        chunks (Iterable[bytes]): WAV file bytes or raw PCM, in order
+
+    Returns:
+        tuple: A wave reader positioned at the first frame, or None for headerless
+            audio, and an iterator over the unread chunks when there is no header
+    """
+    chunks = iter(chunks)
+    first = b''
+    while len(first) < 4:
+        chunk = next(chunks, None)
+        if chunk is None:
+            break
+        first += chunk
+
+    def replay():
+        yield first
+        yield from chunks
+
+    if first[:4] != b'RIFF':
+        return None, replay()
+    return wave.open(io.BufferedReader(ChunkReader(replay())), 'rb'), iter(())
+
+
+def read_pcm_stream(chunks: Iterable[bytes], sample_rate: int = SAMPLE_RATE_HERTZ) -> Tuple[Iterator[bytes], int]:
+    """
+    Extracts raw LINEAR16 mono frames from a stream of WAV or headerless PCM chunks
+
+    Only the WAV header is parsed up front; frames are yielded as they are read.
+
+    Args:
+        chunks (Iterable[bytes]): WAV file bytes or raw LINEAR16 PCM, in order
+        sample_rate (int): Sample rate assumed for headerless PCM
+
+    Returns:
+        tuple: An iterator of raw PCM chunks and their sample rate
+    """
+    wav_file, pcm_chunks = open_wav_stream(chunks)
+    if wav_file is None:
+        return pcm_chunks, sample_rate
+
+    if wav_file.getsampwidth() != SAMPLE_WIDTH_BYTES or wav_file.getnchannels() != 1:
+        raise ValueError("Chunked transcription requires 16-bit mono audio")
+
+    def frames():
+        with wav_file:
+            for frame_chunk in iter(lambda: wav_file.readframes(READ_FRAMES), b''):
+                yield frame_chunk
+
+    return frames(), wav_file.getframerate()
+
+
+def iter_windows(pcm_chunks: Iterable[bytes], sample_rate: int = SAMPLE_RATE_HERTZ,
+                 window_seconds: float = WINDOW_SECONDS,
+                 overlap_seconds: float = OVERLAP_SECONDS) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+    """
+    Cuts a stream of PCM into overlapping recognition windows
+
+    At most one window plus one read chunk is buffered at a time. Each window owns
+    the span between the midpoints of its overlaps with its neighbours, so every
+    instant of audio is owned by exactly one window.
+
+    Args:
+        pcm_chunks (Iterable[bytes]): Raw LINEAR16 mono PCM, in order
+        sample_rate (int): Sample rate of the audio
+        window_seconds (float): Length of each window
+        overlap_seconds (float): Overlap shared by consecutive windows
+
+    Yields:
+        tuple: A window dict with 'index', 'start', 'end', 'keep_start' and 'keep_end'
+            in seconds, and the PCM bytes of that window
+    """
+    if overlap_seconds < 0 or overlap_seconds >= window_seconds:
+        raise ValueError("Overlap must be non-negative and shorter than the window")
+
+    bytes_per_second = sample_rate * SAMPLE_WIDTH_BYTES
+    window_bytes = int(window_seconds * sample_rate) * SAMPLE_WIDTH_BYTES
+    step_bytes = int((window_seconds - overlap_seconds) * sample_rate) * SAMPLE_WIDTH_BYTES
+    overlap_bytes = window_bytes - step_bytes
+
+    buffer = bytearray()
+    offset = 0  # Byte offset of buffer[0] within the PCM stream
+    index = 0
+
+    def make_window(size, last):
+        start = offset / bytes_per_second
+        return {
+            'index': index,
+            'start': start,
+            'end': (offset + size) / bytes_per_second,
+            'keep_start': 0.0 if index == 0 else start + overlap_bytes / 2 / bytes_per_second,
+            'keep_end': float('inf') if last else (offset + step_bytes + overlap_bytes / 2) / bytes_per_second,
+        }
+
+    for chunk in pcm_chunks:
+        buffer += chunk
+        # Emit only once a sample beyond the window exists, so the final window is known to be last
+        while len(buffer) >= window_bytes + SAMPLE_WIDTH_BYTES:
+            yield make_window(window_bytes, False), bytes(buffer[:window_bytes])
+            del buffer[:step_bytes]
+            offset += step_bytes
+            index += 1
+
+    # Drop a trailing odd byte rather than splitting a sample
+    size = len(buffer) - len(buffer) % SAMPLE_WIDTH_BYTES
+    if size:
+        yield make_window(size, True), bytes(buffer[:size])
+
+
+def stitch_windows(windows: List[Dict[str, Any]], window_words: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merges per-window word lists into one timeline, dropping words duplicated by the overlaps
+
+    Args:
+        windows (list): Windows as yielded by iter_windows
+        window_words (list): Word lists per window, with times already shifted to absolute seconds
+
+    Returns:
+        list: Words ordered by start time
+    """
+    words = []
+    for window, candidates in zip(windows, window_words):
+        for word in candidates:
+            midpoint = (word['start_time'] + word['end_time']) / 2
+            if window['keep_start'] <= midpoint < window['keep_end']:
+                words.append(word)
+    words.sort(key=lambda word: word['start_time'])
+    return words
+
+
+class ChunkedTranscriptionPipeline:
+    """Transcribes long audio as overlapping windows on a bounded worker pool"""
+
+    def __init__(self, recognizer, max_workers: int = MAX_WORKERS,
+                 window_seconds: float = WINDOW_SECONDS, overlap_seconds: float = OVERLAP_SECONDS):
+        """
+        Initializes the pipeline
+
+        Args:
+            recognizer: Object exposing recognize(audio_content, sample_rate) that returns
+                word dicts with 'word', 'start_time', 'end_time' and 'confidence' relative
+                to the start of the audio it was given
+            max_workers (int): Maximum number of windows recognized concurrently
+            window_seconds (float): Length of each window
+            overlap_seconds (float): Overlap shared by consecutive windows
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.recognizer = recognizer
+        self.max_workers = max_workers
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+
+    def transcribe(self, audio_content: bytes, sample_rate: int = SAMPLE_RATE_HERTZ) -> Dict[str, Any]:
+        """
+        Transcribes in-memory audio content
+
+        Args:
+            audio_content (bytes): WAV file bytes or raw LINEAR16 mono PCM
+            sample_rate (int): Sample rate assumed for headerless PCM
+
+        Returns:
+            dict: 'transcript', 'confidence', 'words' and 'duration' of the audio
+        """
+        return self.transcribe_stream([audio_content], sample_rate)
+
+    def transcribe_stream(self, chunks: Iterable[bytes], sample_rate: int = SAMPLE_RATE_HERTZ,
+                          on_progress: Optional[Callable[[float], None]] = None) -> Dict[str, Any]:
+        """
+        Transcribes a stream of audio chunks by recognizing its windows concurrently
+
+        Windows are cut as the stream is read and no more than max_workers windows are
+        in flight, so peak memory depends on the window size and worker count, not on
+        the length of the audio.
+
+        Args:
+            chunks (Iterable[bytes]): WAV file bytes or raw LINEAR16 mono PCM, in order
+            sample_rate (int): Sample rate assumed for headerless PCM
+            on_progress (Callable[[float], None]): Called with the seconds of audio
+                recognized so far each time a window completes
+
+        Returns:
+            dict: 'transcript', 'confidence', 'words' and 'duration' of the audio
+        """
+        pcm_chunks, sample_rate = read_pcm_stream(chunks, sample_rate)
+
+        windows = []
+        window_words = {}
+        pending = {}
+        recognized_seconds = 0.0
+
+        def recognize_window(window, pcm):
+            words = self.recognizer.recognize(pcm, sample_rate)
+            return [
+                dict(word, start_time=word['start_time'] + window['start'], end_time=word['end_time'] + window['start'])
+                for word in words
+            ]
+
+        def collect(futures):
+            nonlocal recognized_seconds
+            for future in futures:
+                index = pending.pop(future)
+                window_words[index] = future.result()
+                window = windows[index]
+                recognized_seconds += min(window['end'], window['keep_end']) - max(window['start'], window['keep_start'])
+                if on_progress:
+                    on_progress(recognized_seconds)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for window, pcm in iter_windows(pcm_chunks, sample_rate, self.window_seconds, self.overlap_seconds):
+                if len(pending) >= self.max_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                windows.append(window)
+                pending[executor.submit(recognize_window, window, pcm)] = window['index']
+            collect(list(pending))
+
+        if not windows:
+            return {'transcript': '', 'confidence': 0.0, 'words': [], 'duration': 0.0}
+
+        logger.info(f"Transcribed {windows[-1]['end']:.1f}s of audio in {len(windows)} windows with {self.max_workers} workers")
+        words = stitch_windows(windows, [window_words[window['index']] for window in windows])
+        confidence = sum(word.get('confidence', 0.0) for word in words) / len(words) if words else 0.0
+
+        return {
+            'transcript': ' '.join(word['word'] for word in words),
+            'confidence': confidence,
+            'words': words,
+            'duration': windows[-1]['end'],
+        }
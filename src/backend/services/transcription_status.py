@@ -0,0 +1,275 @@
+import abc
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from django.conf import settings
+
+# Global constants
+STATUS_TTL_SECONDS = 24 * 60 * 60
+LONG_POLL_SECONDS = 25.0
+STREAM_MAX_SECONDS = 60 * 60  # Clients reconnect with Last-Event-ID after a stream ends
+STREAM_MAX_IDLE_POLLS = 12  # Keep-alives in a row after which a silent task is given up on
+TERMINAL_STAGES = ('completed', 'failed')
+
+
+def make_event(task_id: str, sequence: int, stage: str, percent: float,
+               eta_seconds: Optional[float] = None, **details) -> Dict[str, Any]:
+    """
+    Builds a progress event
+
+    Args:
+        task_id (str): The ID of the transcription task
+        sequence (int): Position of the event in the task's event stream, starting at 1
+        stage (str): Current stage, e.g. 'queued', 'normalizing', 'recognizing', 'completed' or 'failed'
+        percent (float): Overall progress from 0 to 100
+        eta_seconds (float): Estimated seconds until completion, if known
+        **details: Additional JSON-serializable fields
+
+    Returns:
+        dict: The event
+    """
+    return dict(
+        details,
+        task_id=task_id,
+        sequence=sequence,
+        stage=stage,
+        percent=round(min(max(percent, 0.0), 100.0), 1),
+        eta_seconds=round(eta_seconds, 1) if eta_seconds is not None else None,
+        updated_at=time.time(),
+    )
+
+
+class TranscriptionStatusStore(abc.ABC):
+    """
+    Keeps the latest progress event of each transcription task
+
+    Tasks publish events as they progress; readers either fetch the latest event or
+    wait for one newer than the sequence number they last saw.
+    """
+
+    name: str
+
+    @abc.abstractmethod
+    def publish(self, task_id: str, stage: str, percent: float,
+                eta_seconds: Optional[float] = None, **details) -> Dict[str, Any]:
+        """
+        Records the latest progress of a task and wakes up its waiters
+
+        Args:
+            task_id (str): The ID of the transcription task
+            stage (str): Current stage of the task
+            percent (float): Overall progress from 0 to 100
+            eta_seconds (float): Estimated seconds until the task completes, if known
+            **details: Extra fields stored with the event
+
+        Returns:
+            dict: The published event
+        """
+
+    @abc.abstractmethod
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the latest event of a task, or None if there is none
+        """
+
+    @abc.abstractmethod
+    def wait(self, task_id: str, since: int = 0, timeout: float = LONG_POLL_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        Blocks until an event newer than since is available or the timeout expires
+
+        Args:
+            task_id (str): The ID of the transcription task
+            since (int): Sequence number of the last event the caller has seen
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            dict: The latest event, which is unchanged if the wait timed out, or None if there is none
+        """
+
+    def stream(self, task_id: str, since: int = 0, timeout: float = LONG_POLL_SECONDS,
+               max_seconds: float = STREAM_MAX_SECONDS,
+               max_idle_polls: int = STREAM_MAX_IDLE_POLLS) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yields each new event until the task reaches a terminal stage
+
+        None is yielded whenever timeout seconds pass without an event, so callers can
+        send keep-alives. The stream also ends when the task's state is gone, after
+        max_idle_polls keep-alives in a row, as for a task whose worker died, and after
+        max_seconds, so no stream holds a connection forever.
+
+        Args:
+            task_id (str): The ID of the transcription task
+            since (int): Sequence number of the last event the caller has seen
+            timeout (float): Seconds between keep-alives
+            max_seconds (float): Longest the stream lasts
+            max_idle_polls (int): Keep-alives in a row after which the stream ends
+
+        Yields:
+            dict: Events in order, or None on a keep-alive
+        """
+        deadline = time.monotonic() + max_seconds
+        idle_polls = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = self.wait(task_id, since, min(timeout, remaining))
+            if event is None:
+                return
+            if event['sequence'] <= since:
+                idle_polls += 1
+                if idle_polls >= max_idle_polls:
+                    return
+                yield None
+                continue
+            idle_polls = 0
+            since = event['sequence']
+            yield event
+            if event['stage'] in TERMINAL_STAGES:
+                return
+
+
+class RedisStatusStore(TranscriptionStatusStore):
+    """Status store shared by all workers, waking waiters through Redis pub/sub"""
+
+    name = 'redis'
+
+    def __init__(self, url: Optional[str] = None, ttl: int = STATUS_TTL_SECONDS, client=None):
+        """
+        Initializes the store
+
+        Args:
+            url (str): Redis URL, defaults to settings.REDIS_URL
+            ttl (int): Seconds an event is kept after the last update
+            client (redis.Redis): Client to reuse, created from url when omitted
+        """
+        import redis
+
+        self.client = client or redis.Redis.from_url(url or settings.REDIS_URL)
+        self.ttl = ttl
+
+    @staticmethod
+    def _keys(task_id):
+        return f"transcription-status:{task_id}", f"transcription-status:{task_id}:sequence"
+
+    def publish(self, task_id, stage, percent, eta_seconds=None, **details):
+        key, sequence_key = self._keys(task_id)
+        sequence = self.client.incr(sequence_key)
+        event = make_event(task_id, sequence, stage, percent, eta_seconds, **details)
+        payload = json.dumps(event)
+        with self.client.pipeline() as pipe:
+            pipe.set(key, payload, ex=self.ttl)
+            pipe.expire(sequence_key, self.ttl)
+            pipe.publish(key, payload)
+            pipe.execute()
+        return event
+
+    def get(self, task_id):
+        payload = self.client.get(self._keys(task_id)[0])
+        return json.loads(payload) if payload else None
+
+    def wait(self, task_id, since=0, timeout=LONG_POLL_SECONDS):
+        key = self._keys(task_id)[0]
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            # Subscribe before reading so an event published in between is not missed
+            pubsub.subscribe(key)
+            event = self.get(task_id)
+            deadline = time.monotonic() + timeout
+            while event is None or event['sequence'] <= since:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = pubsub.get_message(timeout=remaining)
+                if message is not None:
+                    event = json.loads(message['data'])
+            return event
+        finally:
+            pubsub.close()
+
+
+class InMemoryStatusStore(TranscriptionStatusStore):
+    """Per-process status store for development and tests"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._events = {}
+        self._condition = threading.Condition()
+
+    def publish(self, task_id, stage, percent, eta_seconds=None, **details):
+        with self._condition:
+            previous = self._events.get(task_id)
+            event = make_event(task_id, previous['sequence'] + 1 if previous else 1, stage, percent, eta_seconds, **details)
+            self._events[task_id] = event
+            self._condition.notify_all()
+        return event
+
+    def get(self, task_id):
+        with self._condition:
+            return self._events.get(task_id)
+
+    def wait(self, task_id, since=0, timeout=LONG_POLL_SECONDS):
+        def newer():
+            event = self._events.get(task_id)
+            return event is not None and event['sequence'] > since
+
+        with self._condition:
+            self._condition.wait_for(newer, timeout)
+            return self._events.get(task_id)
+
+
+STATUS_STORES = {
+    RedisStatusStore.name: RedisStatusStore,
+    InMemoryStatusStore.name: InMemoryStatusStore,
+}
+
+_status_store = None
+_status_store_lock = threading.Lock()
+
+
+def get_status_store() -> TranscriptionStatusStore:
+    """
+    Returns the process-wide status store selected by settings.TRANSCRIPTION_STATUS_STORE
+
+    Returns:
+        TranscriptionStatusStore: The shared store
+    """
+    global _status_store
+    with _status_store_lock:
+        if _status_store is None:
+            try:
+                store_class = STATUS_STORES[settings.TRANSCRIPTION_STATUS_STORE]
+            except KeyError:
+                raise ValueError(f"Unknown transcription status store: {settings.TRANSCRIPTION_STATUS_STORE}")
+            _status_store = store_class()
+        return _status_store
+
+
+class ProgressReporter:
+    """Publishes the progress of one task, estimating the time remaining from the elapsed time"""
+
+    def __init__(self, task_id: str, store: Optional[TranscriptionStatusStore] = None):
+        self.task_id = task_id
+        self.store = store or get_status_store()
+        self.started_at = time.monotonic()
+
+    def report(self, stage: str, percent: float, **details) -> Dict[str, Any]:
+        """
+        Publishes an event, with an ETA once some progress has been made
+
+        Args:
+            stage (str): Current stage
+            percent (float): Overall progress from 0 to 100
+            **details: Additional JSON-serializable fields
+
+        Returns:
+            dict: The published event
+        """
+        elapsed = time.monotonic() - self.started_at
+        eta_seconds = elapsed * (100.0 - percent) / percent if 0 < percent < 100 else None
+        if stage in TERMINAL_STAGES:
+            eta_seconds = 0.0
+        return self.store.publish(self.task_id, stage, percent, eta_seconds, **details)
@@ -1,65 +1,170 @@
 import logging
+from asgiref.sync import async_to_sync
 from celery import shared_task
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-
-from src.backend.apps.episodes.models import Episode
-from src.backend.apps.marketing.models import MarketingContent
-from src.backend.apps.social_media.models import SocialMediaPost
-from src.backend.services.content_generation import generate_content
-from src.backend.services.social_media_integration import schedule_social_media_post, check_post_status
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.episodes.models import Episode
+from apps.marketing.models import ContentGenerationBatch, MarketingContent
+from apps.social_media.models import SocialMediaPost
+from services.batch_generation import BatchContentGenerationService
+from services.content_generation import ContentGenerationService
+from services.llm_client import LLMError
+from services.post_dispatcher import ScheduledPostDispatcher
+from services.social_media_integration import SocialMediaIntegrationService
 
 logger = logging.getLogger(__name__)
 
+# Global constants
+DEFAULT_PLATFORMS = ['twitter', 'facebook', 'linkedin']
+
 @shared_task(bind=True, max_retries=3)
-def generate_marketing_content(self, episode_id):
+def generate_marketing_content(self, episode_id, platforms=None):
     """
     Asynchronous task to generate marketing content for a given episode.
 
     Args:
         self: The task instance (automatically injected by Celery).
         episode_id (int): The ID of the Episode for which to generate content.
+        platforms (list): Social media platforms to generate content for, defaults to DEFAULT_PLATFORMS.
 
     Returns:
-        dict: Generated marketing content.
+        dict: Generated marketing content for each platform.
     """
     try:
         # Retrieve the Episode instance using the provided episode_id
         episode = Episode.objects.get(id=episode_id)
 
-        # Call the content generation service to create marketing content
-        generated_content = generate_content(episode)
-
-        # Create and save MarketingContent instances for each generated content
-        marketing_contents = []
-        for content_type, content in generated_content.items():
-            marketing_content = MarketingContent.objects.create(
-                episode=episode,
-                content_type=content_type,
-                content=content
-            )
-            marketing_contents.append(marketing_content)
+        # One completion covers every platform, and the rows are inserted together
+        service = ContentGenerationService(settings.OPENAI_API_KEY, settings.CONTENT_GENERATION_MODEL)
+        marketing_contents = service.generate_and_save_contents(episode, platforms or DEFAULT_PLATFORMS)
 
         # Log the successful generation of marketing content
         logger.info(f"Successfully generated marketing content for episode {episode_id}")
 
         # Return the generated content
-        return {content.content_type: content.content for content in marketing_contents}
+        return {platform: content.content for platform, content in marketing_contents.items()}
 
     except ObjectDoesNotExist:
         logger.error(f"Episode with id {episode_id} not found")
         raise self.retry(countdown=60 * 5, max_retries=3)
     except Exception as e:
         logger.error(f"Error generating marketing content for episode {episode_id}: {str(e)}")
+        # A rate-limited call can be retried as soon as the API allows it
+        countdown = e.retry_after if isinstance(e, LLMError) and e.retry_after else 60 * 5
+        raise self.retry(exc=e, countdown=countdown, max_retries=3)
+
+def start_content_generation_batch(user, episode_ids, platforms=None, batch_size=None):
+    """
+    Creates a ContentGenerationBatch and submits the task generating it.
+
+    Args:
+        user (User): The user starting the batch, the only one allowed to follow it.
+        episode_ids (list): Episode IDs of the back catalog.
+        platforms (list): Social media platforms to generate content for, defaults to DEFAULT_PLATFORMS.
+        batch_size (int): Maximum number of requests per batch job,
+            defaults to settings.CONTENT_GENERATION_BATCH_SIZE.
+
+    Returns:
+        ContentGenerationBatch: The created batch.
+    """
+    batch_size = batch_size or settings.CONTENT_GENERATION_BATCH_SIZE
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    with transaction.atomic():
+        batch = ContentGenerationBatch.objects.create(
+            user=user,
+            episode_ids=list(episode_ids),
+            platforms=list(platforms or DEFAULT_PLATFORMS),
+            batch_size=batch_size,
+        )
+        transaction.on_commit(lambda: generate_back_catalog_content.delay(batch.id))
+
+    logger.info(f"Started content generation batch {batch.id} for {len(batch.episode_ids)} episodes")
+    return batch
+
+@shared_task(bind=True, max_retries=3)
+def generate_back_catalog_content(self, batch_id):
+    """
+    Asynchronous task to generate marketing content for a back catalog through batch jobs.
+
+    Submits the batch jobs, then hands over to poll_content_generation_batch, so no worker
+    waits while the jobs run. A retried task resumes the jobs already submitted.
+
+    Args:
+        self: The task instance (automatically injected by Celery).
+        batch_id (int): The ID of the ContentGenerationBatch to run.
+
+    Returns:
+        dict: The progress of the batch once its jobs are submitted.
+    """
+    try:
+        batch = ContentGenerationBatch.objects.get(id=batch_id)
+        service = BatchContentGenerationService(settings.OPENAI_API_KEY, settings.CONTENT_GENERATION_MODEL)
+        service.start(batch)
+
+        if batch.jobs:
+            poll_content_generation_batch.apply_async((batch_id,), countdown=settings.CONTENT_GENERATION_BATCH_POLL_SECONDS)
+        logger.info(f"Content generation batch {batch_id} submitted in {batch.jobs_total} jobs")
+        return batch.get_progress()
+
+    except ObjectDoesNotExist:
+        logger.error(f"Content generation batch {batch_id} not found")
+        raise
+    except Exception as e:
+        logger.error(f"Error running content generation batch {batch_id}: {str(e)}")
+        raise self.retry(exc=e, countdown=60 * 5, max_retries=3)
+
+@shared_task(bind=True, max_retries=3)
+def poll_content_generation_batch(self, batch_id):
+    """
+    Asynchronous task to check the batch jobs of a back catalog once.
+
+    Jobs that finished are ingested, and progress is recorded in the batch row. While
+    jobs are still running, the task queues itself again after
+    settings.CONTENT_GENERATION_BATCH_POLL_SECONDS.
+
+    Args:
+        self: The task instance (automatically injected by Celery).
+        batch_id (int): The ID of the ContentGenerationBatch to check.
+
+    Returns:
+        dict: The progress of the batch.
+    """
+    try:
+        batch = ContentGenerationBatch.objects.get(id=batch_id)
+        service = BatchContentGenerationService(settings.OPENAI_API_KEY, settings.CONTENT_GENERATION_MODEL)
+
+        if service.poll(batch):
+            poll_content_generation_batch.apply_async((batch_id,), countdown=settings.CONTENT_GENERATION_BATCH_POLL_SECONDS)
+        else:
+            logger.info(f"Content generation batch {batch_id} completed: {batch.succeeded} succeeded, "
+                        f"{batch.skipped} skipped, {batch.failed} failed")
+        return batch.get_progress()
+
+    except ObjectDoesNotExist:
+        logger.error(f"Content generation batch {batch_id} not found")
+        raise
+    except Exception as e:
+        logger.error(f"Error polling content generation batch {batch_id}: {str(e)}")
         raise self.retry(exc=e, countdown=60 * 5, max_retries=3)
 
 @shared_task(bind=True, max_retries=3)
-def schedule_social_media_posts(self, marketing_content_id):
+def schedule_social_media_posts(self, marketing_content_id, scheduled_time, media_url=None):
     """
-    Asynchronous task to schedule social media posts for generated marketing content.
+    Asynchronous task to schedule a social media post for generated marketing content.
+
+    The post is published at its scheduled time by the scheduled post dispatchers.
 
     Args:
         self: The task instance (automatically injected by Celery).
         marketing_content_id (int): The ID of the MarketingContent to schedule.
+        scheduled_time (str): ISO 8601 time at which the post should be published.
+        media_url (str): URL of the media to be attached to the post.
 
     Returns:
         dict: Scheduled social media post details.
@@ -68,30 +173,31 @@ def schedule_social_media_posts(self, marketing_content_id):
         # Retrieve the MarketingContent instance using the provided marketing_content_id
         marketing_content = MarketingContent.objects.get(id=marketing_content_id)
 
-        # Call the social media integration service to schedule posts
-        scheduled_posts = schedule_social_media_post(marketing_content)
+        publish_at = parse_datetime(scheduled_time)
+        if publish_at is None:
+            raise ValueError(f"Invalid scheduled time: {scheduled_time}")
+        if timezone.is_naive(publish_at):
+            publish_at = timezone.make_aware(publish_at)
 
-        # Create and save SocialMediaPost instances for each scheduled post
-        social_media_posts = []
-        for platform, post_details in scheduled_posts.items():
-            social_media_post = SocialMediaPost.objects.create(
-                marketing_content=marketing_content,
-                platform=platform,
-                post_id=post_details['post_id'],
-                scheduled_time=post_details['scheduled_time'],
-                status='scheduled'
-            )
-            social_media_posts.append(social_media_post)
+        # Call the social media integration service to schedule the post
+        service = SocialMediaIntegrationService()
+        scheduled_post = async_to_sync(service.schedule_post)(
+            marketing_content.platform, marketing_content.content, media_url, marketing_content.episode_id, publish_at
+        )
 
-        # Log the successful scheduling of social media posts
-        logger.info(f"Successfully scheduled social media posts for marketing content {marketing_content_id}")
+        # Log the successful scheduling of the social media post
+        logger.info(f"Successfully scheduled social media post for marketing content {marketing_content_id}")
 
         # Return the scheduled post details
-        return {post.platform: {'post_id': post.post_id, 'scheduled_time': post.scheduled_time} for post in social_media_posts}
+        return {marketing_content.platform: {'post_id': scheduled_post['id'], 'scheduled_time': publish_at.isoformat()}}
 
     except ObjectDoesNotExist:
         logger.error(f"MarketingContent with id {marketing_content_id} not found")
         raise self.retry(countdown=60 * 5, max_retries=3)
+    except ValueError as e:
+        # An unsupported platform or a time in the past will not get better with retries
+        logger.error(f"Cannot schedule marketing content {marketing_content_id}: {str(e)}")
+        raise
     except Exception as e:
         logger.error(f"Error scheduling social media posts for marketing content {marketing_content_id}: {str(e)}")
         raise self.retry(exc=e, countdown=60 * 5, max_retries=3)
@@ -101,6 +207,10 @@ def update_social_media_post_status(self, social_media_post_id):
     """
     Asynchronous task to update the status of a scheduled social media post.
 
+    The dispatchers record the outcome of every post they publish. A post whose
+    dispatcher stopped while publishing it is marked failed here, like the dispatchers
+    do for stale claims, since it may or may not have been published.
+
     Args:
         self: The task instance (automatically injected by Celery).
         social_media_post_id (int): The ID of the SocialMediaPost to update.
@@ -112,18 +222,15 @@ def update_social_media_post_status(self, social_media_post_id):
         # Retrieve the SocialMediaPost instance using the provided social_media_post_id
         social_media_post = SocialMediaPost.objects.get(id=social_media_post_id)
 
-        # Call the social media integration service to check the post status
-        updated_status = check_post_status(social_media_post.platform, social_media_post.post_id)
-
-        # Update the SocialMediaPost instance with the new status
-        social_media_post.status = updated_status
-        social_media_post.save()
+        # Fail the post if its claim went stale, then read the status the dispatchers recorded
+        ScheduledPostDispatcher().fail_stale_claims(post_ids=[social_media_post.id])
+        social_media_post.refresh_from_db()
 
         # Log the status update of the social media post
         logger.info(f"Successfully updated status for social media post {social_media_post_id}")
 
         # Return the updated post status
-        return {'post_id': social_media_post.post_id, 'status': updated_status}
+        return {'post_id': social_media_post.post_id, 'status': social_media_post.status}
 
     except ObjectDoesNotExist:
         logger.error(f"SocialMediaPost with id {social_media_post_id} not found")
@@ -134,5 +241,4 @@ def update_social_media_post_status(self, social_media_post_id):
 
 # TODO: Implement error handling and retrying logic for each task
 # TODO: Set up monitoring and alerting for long-running or failing tasks
-# TODO: Optimize task performance and resource usage
-# TODO: Implement rate limiting for social media API calls
\ No newline at end of file
+# TODO: Optimize task performance and resource usage
\ No newline at end of file
@@ -1,24 +1,27 @@
 import logging
 from celery import shared_task
 from django.db import transaction
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
 # Assuming these imports are correct based on the specification
 from src.backend.tasks.celery import app
+from src.backend.apps.authentication.models import User
 from src.backend.apps.episodes.models import Episode
-from src.backend.apps.transcripts.models import Transcript
+from src.backend.apps.transcripts.models import Transcript, TranscriptionBatch
 from src.backend.services.transcription import transcription_service
 
 logger = logging.getLogger(__name__)
 
 @app.task(bind=True, max_retries=3)
-def transcribe_episode(self, episode_id):
+def transcribe_episode(self, episode_id, batch_id=None):
     """
     Celery task to transcribe a podcast episode.
 
     Args:
         self: The task instance (automatically injected by Celery).
         episode_id (int): The ID of the episode to transcribe.
+        batch_id (int): The TranscriptionBatch this episode belongs to, if any.
 
     Returns:
         bool: True if transcription was successful, False otherwise.
@@ -30,6 +33,7 @@ def transcribe_episode(self, episode_id):
         # Check if a Transcript already exists for the episode
         if Transcript.objects.filter(episode=episode).exists():
             logger.warning(f"Transcript already exists for episode {episode_id}. Skipping transcription.")
+            record_batch_result(batch_id, episode_id, 'skipped')
             return False
 
         # Call the transcription service to generate the transcript
@@ -48,44 +52,133 @@ def transcribe_episode(self, episode_id):
 
         # Log the successful transcription
         logger.info(f"Successfully transcribed episode {episode_id}")
+        record_batch_result(batch_id, episode_id, 'succeeded')
         return True
 
     except ObjectDoesNotExist:
         logger.error(f"Episode with id {episode_id} not found")
+        record_batch_result(batch_id, episode_id, 'failed')
         return False
     except Exception as e:
         logger.error(f"Error transcribing episode {episode_id}: {str(e)}")
+        if self.request.retries >= self.max_retries:
+            # Out of retries: free the batch slot before Celery records the failure
+            record_batch_result(batch_id, episode_id, 'failed')
+            raise
         # Retry the task with exponential backoff
         retry_count = self.request.retries
         retry_delay = 60 * 2 ** retry_count  # 2 minutes, 4 minutes, 8 minutes
         raise self.retry(exc=e, countdown=retry_delay, max_retries=3)
 
-@app.task
-def batch_transcribe_episodes(episode_ids):
+
+def start_transcription_batch(user, episode_ids, max_concurrency=None):
     """
-    Celery task to transcribe multiple podcast episodes in batch.
+    Creates a TranscriptionBatch and submits its first episodes.
+
+    At most max_concurrency transcriptions of the batch run at a time; each finishing
+    task submits the next pending episode, so a large back catalog never floods the queue.
 
     Args:
+        user (User): The user starting the batch, the only one allowed to follow it.
         episode_ids (list): A list of episode IDs to transcribe.
+        max_concurrency (int): Maximum number of simultaneous transcriptions,
+            defaults to settings.TRANSCRIPTION_BATCH_MAX_CONCURRENCY.
 
     Returns:
-        dict: A dictionary with episode_ids as keys and transcription success status as values.
+        TranscriptionBatch: The created batch.
+    """
+    max_concurrency = max_concurrency or settings.TRANSCRIPTION_BATCH_MAX_CONCURRENCY
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    with transaction.atomic():
+        batch = TranscriptionBatch.objects.create(
+            user=user,
+            episode_ids=list(episode_ids),
+            max_concurrency=max_concurrency,
+        )
+        _dispatch_pending(batch)
+        batch.save()
+
+    logger.info(f"Started transcription batch {batch.id} for {batch.total} episodes")
+    return batch
+
+
+def record_batch_result(batch_id, episode_id, outcome):
+    """
+    Records the outcome of one episode of a batch and submits the next pending episodes.
+
+    The batch row is locked while its counters are updated, so concurrent workers
+    never lose an update or submit the same episode twice.
+
+    Args:
+        batch_id (int): The TranscriptionBatch ID, or None for standalone tasks.
+        episode_id (int): The episode that finished.
+        outcome (str): One of 'succeeded', 'skipped' or 'failed'.
     """
-    results = {}
+    if batch_id is None:
+        return
+
+    with transaction.atomic():
+        try:
+            batch = TranscriptionBatch.objects.select_for_update().get(id=batch_id)
+        except TranscriptionBatch.DoesNotExist:
+            logger.error(f"Transcription batch {batch_id} not found")
+            return
+
+        batch.in_flight = max(batch.in_flight - 1, 0)
+        setattr(batch, outcome, getattr(batch, outcome) + 1)
+        if outcome == 'failed':
+            batch.failed_episode_ids = batch.failed_episode_ids + [episode_id]
+        _dispatch_pending(batch)
+        batch.save()
+
+    if batch.status == 'completed':
+        logger.info(
+            f"Transcription batch {batch_id} completed: {batch.succeeded} succeeded, "
+            f"{batch.skipped} skipped, {batch.failed} failed"
+        )
+
+
+def _dispatch_pending(batch):
+    """
+    Fills the free concurrency slots of a locked batch from its pending episodes.
+
+    Tasks are submitted once the surrounding transaction commits so that workers
+    always see the updated counters.
+    """
+    free_slots = max(batch.max_concurrency - batch.in_flight, 0)
+    episode_ids = batch.episode_ids[batch.dispatched:batch.dispatched + free_slots]
+    batch.dispatched += len(episode_ids)
+    batch.in_flight += len(episode_ids)
+    if batch.in_flight == 0 and batch.dispatched >= batch.total:
+        batch.status = 'completed'
+
+    batch_id = batch.id
     for episode_id in episode_ids:
-        # Call the transcribe_episode task for each episode
-        success = transcribe_episode.delay(episode_id)
-        results[episode_id] = success
+        transaction.on_commit(lambda episode_id=episode_id: transcribe_episode.delay(episode_id, batch_id=batch_id))
+
 
-    # Log the batch transcription process completion
-    logger.info(f"Batch transcription completed for episodes: {episode_ids}")
-    return results
+@app.task
+def batch_transcribe_episodes(user_id, episode_ids, max_concurrency=None):
+    """
+    Celery task to transcribe multiple podcast episodes in batch.
+
+    Args:
+        user_id (int): The ID of the user starting the batch.
+        episode_ids (list): A list of episode IDs to transcribe.
+        max_concurrency (int): Maximum number of simultaneous transcriptions.
+
+    Returns:
+        dict: The ID and initial progress of the created TranscriptionBatch.
+    """
+    batch = start_transcription_batch(User.objects.get(id=user_id), episode_ids, max_concurrency)
+    return batch.get_progress()
 
 # Commented list of human tasks
 """
 Human tasks:
 1. Implement error handling and notification system for failed transcriptions (Required)
 2. Set up monitoring and alerting for transcription task performance (Required)
-3. Optimize batch transcription process for large numbers of episodes (Optional)
-4. Implement a mechanism to handle different audio formats and quality levels (Required)
+3. Implement a mechanism to handle different audio formats and quality levels (Required)
 """
\ No newline at end of file
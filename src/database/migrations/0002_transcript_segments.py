@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcript',
+            name='content_stale',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='TranscriptSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('start_time', models.FloatField()),
+                ('end_time', models.FloatField()),
+                ('content', models.TextField(blank=True)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('transcript', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='database.Transcript')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='transcriptsegment',
+            constraint=models.UniqueConstraint(fields=('transcript', 'position'), name='unique_transcript_segment_position'),
+        ),
+    ]
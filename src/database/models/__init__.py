@@ -8,12 +8,13 @@ from .user import User
 from .podcast import Podcast
 from .episode import Episode
 from .transcript import Transcript
+from .transcript_segment import TranscriptSegment
 from .marketing_content import MarketingContent
 from .social_media_post import SocialMediaPost
 from .analytics import Analytics
 
 # Define __all__ to explicitly specify which names are exported from this package
-__all__ = ["User", "Podcast", "Episode", "Transcript", "MarketingContent", "SocialMediaPost", "Analytics"]
+__all__ = ["User", "Podcast", "Episode", "Transcript", "TranscriptSegment", "MarketingContent", "SocialMediaPost", "Analytics"]
 
 # TODO: Ensure that all imported model classes are correctly implemented in their respective files
 # TODO: Verify that the database connection and ORM setup is properly configured
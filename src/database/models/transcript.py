@@ -1,5 +1,7 @@
 from datetime import datetime
 from src.database.models.base import BaseModel
+from src.api.apps.transcripts.text_edits import distribute_content
+from src.database.models.transcript_segment import TranscriptSegment
 
 class Transcript(BaseModel):
     table_name = 'transcripts'
@@ -60,20 +62,62 @@ class Transcript(BaseModel):
         """
         Updates the content of the transcript
 
+        If the transcript is segmented, only the segments whose text changed are written
+        and the full content is flagged as stale instead of being rewritten.
+
         Args:
             new_content (str): The new content for the transcript
 
         Returns:
             bool: True if the update was successful, False otherwise
         """
-        # Set the new content for the transcript
-        self.content = new_content
+        segments = TranscriptSegment.get_by_transcript_id(self.id)
+        if not segments:
+            # Set the new content for the transcript
+            self.content = new_content
+
+            # Update the updated_at timestamp
+            self.updated_at = datetime.utcnow()
 
-        # Update the updated_at timestamp
-        self.updated_at = datetime.utcnow()
+            # Call the save method to persist the changes
+            return self.save()
 
-        # Call the save method to persist the changes
-        return self.save()
+        new_texts = distribute_content([segment.content for segment in segments], new_content)
+        changes = [
+            (segment.id, text, segment.version)
+            for segment, text in zip(segments, new_texts)
+            if text != ' '.join(segment.content.split())
+        ]
+        if not changes:
+            return True
+
+        updated_at = datetime.utcnow()
+        connection = self.get_db_connection()
+
+        try:
+            # The segments and the stale flag are written in one transaction
+            with connection.cursor() as cursor:
+                if TranscriptSegment.update_contents(cursor, changes) != len(changes):
+                    # Another editor changed one of the segments in the meantime
+                    connection.rollback()
+                    return False
+                cursor.execute(
+                    f"UPDATE {self.table_name} SET content_stale = TRUE, updated_at = %s WHERE id = %s",
+                    (updated_at, self.id)
+                )
+                if cursor.rowcount != 1:
+                    connection.rollback()
+                    return False
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        self.content = new_content
+        self.updated_at = updated_at
+        return True
 
 # Human tasks (commented list)
 """
@@ -0,0 +1,85 @@
+from datetime import datetime
+from typing import List, Tuple
+
+from psycopg2.extras import execute_values
+
+from src.database.models.base import BaseModel
+
+class TranscriptSegment(BaseModel):
+    table_name = 'transcript_segments'
+    fields = ['id', 'transcript_id', 'position', 'start_time', 'end_time', 'content', 'version', 'updated_at']
+
+    def __init__(self, id: int, transcript_id: int, position: int, start_time: float, end_time: float,
+                 content: str, version: int, updated_at: datetime):
+        """
+        Initializes a new instance of the TranscriptSegment model
+
+        Args:
+            id (int): The unique identifier for the segment
+            transcript_id (int): The ID of the transcript the segment belongs to
+            position (int): The index of the segment within the transcript
+            start_time (float): Start of the segment in seconds
+            end_time (float): End of the segment in seconds
+            content (str): The text of the segment
+            version (int): Incremented on every edit of the segment
+            updated_at (datetime): The timestamp when the segment was last updated
+        """
+        super().__init__(
+            id=id,
+            transcript_id=transcript_id,
+            position=position,
+            start_time=start_time,
+            end_time=end_time,
+            content=content,
+            version=version,
+            updated_at=updated_at
+        )
+
+    @classmethod
+    def get_by_transcript_id(cls, transcript_id: int) -> List['TranscriptSegment']:
+        """
+        Retrieves the segments of a transcript in order
+
+        Args:
+            transcript_id (int): The ID of the transcript
+
+        Returns:
+            List[TranscriptSegment]: The segments ordered by position
+        """
+        connection = cls.get_db_connection()
+
+        try:
+            query = f"SELECT {', '.join(cls.fields)} FROM {cls.table_name} WHERE transcript_id = %s ORDER BY position"
+            with connection.cursor() as cursor:
+                cursor.execute(query, (transcript_id,))
+                return [cls(**dict(zip(cls.fields, row))) for row in cursor.fetchall()]
+        finally:
+            connection.close()
+
+    @classmethod
+    def update_contents(cls, cursor, changes: List[Tuple[int, str, int]]) -> int:
+        """
+        Updates the text of several segments in a single statement, within the caller's transaction
+
+        A segment is only updated if it is still at the version the change was based on.
+        Nothing is committed, so the caller can roll back when some segments were not updated.
+
+        Args:
+            cursor (psycopg2.extensions.cursor): Cursor of the transaction to run the update in
+            changes (List[Tuple[int, str, int]]): (segment id, new content, expected version) triples
+
+        Returns:
+            int: The number of segments updated
+        """
+        if not changes:
+            return 0
+
+        query = (
+            f"UPDATE {cls.table_name} AS segment "
+            f"SET content = change.content, version = segment.version + 1, updated_at = NOW() "
+            f"FROM (VALUES %s) AS change (id, content, version) "
+            f"WHERE segment.id = change.id AND segment.version = change.version "
+            f"RETURNING segment.id"
+        )
+        # Rows are counted from RETURNING, as rowcount only covers the last page sent
+        return len(execute_values(cursor, query, changes, fetch=True))